@@ -0,0 +1,386 @@
+from asm_generator import ASMGenerator
+from tac_ir import Op, Const, coerce
+
+FLOAT_ARITHMETIC = {Op.ADD: 'addsd', Op.SUB: 'subsd', Op.MUL: 'mulsd', Op.DIV: 'divsd'}
+
+# rax, rcx and rdx are the scratch registers; the runtime routines preserve the rest
+ALLOCATABLE_REGISTERS = ('rbx', 'rsi', 'rdi', 'rbp', 'r8', 'r9', 'r10', 'r11', 'r12', 'r13', 'r14', 'r15')
+
+OUTPUT_BUFFER_SIZE = 4096
+
+# Range of the sign-extended 32-bit immediates most instructions take
+IMMEDIATE_MIN, IMMEDIATE_MAX = -2 ** 31, 2 ** 31 - 1
+
+# Runtime routines for x86-64 Linux. print appends to an output buffer that
+# is written out when full, before a read and at exit.
+RUNTIME = {
+    'print_int': [
+        "print_int:                  ; appends rax as a signed decimal and a newline to the output",
+        "    push rbx",
+        "    push rdx",
+        "    push rsi",
+        "    push rdi",
+        "    lea rdi, [print_buf + 31]",
+        "    mov byte [rdi], 10",
+        "    mov rsi, rax",
+        "    mov ebx, 10",
+        "    test rax, rax",
+        "    jns .digit",
+        "    neg rax",
+        ".digit:",
+        "    xor edx, edx",
+        "    div rbx",
+        "    add dl, '0'",
+        "    dec rdi",
+        "    mov [rdi], dl",
+        "    test rax, rax",
+        "    jnz .digit",
+        "    test rsi, rsi",
+        "    jns .write",
+        "    dec rdi",
+        "    mov byte [rdi], '-'",
+        ".write:",
+        "    mov rsi, rdi",
+        "    lea rdx, [print_buf + 32]",
+        "    sub rdx, rdi",
+        "    call write_output",
+        "    pop rdi",
+        "    pop rsi",
+        "    pop rdx",
+        "    pop rbx",
+        "    ret",
+    ],
+    'print_float': [
+        "print_float:                ; appends xmm0 with three decimals and a newline to the output",
+        "    push rax",
+        "    push rbx",
+        "    push rcx",
+        "    push rdx",
+        "    push rsi",
+        "    push rdi",
+        "    push rbp",
+        "    lea rdi, [print_buf + 31]",
+        "    mov byte [rdi], 10",
+        "    cvttsd2si rbx, xmm0         ; integer part, truncated toward zero",
+        "    cvtsi2sd xmm1, rbx",
+        "    subsd xmm0, xmm1",
+        "    mulsd xmm0, [float_thousand]",
+        "    cvttsd2si rax, xmm0         ; thousandths, with the sign of the value",
+        "    mov rsi, rax",
+        "    or rsi, rbx                 ; sign bit set when the value is negative",
+        "    mov ebp, 10",
+        "    test rax, rax",
+        "    jns .fraction",
+        "    neg rax",
+        ".fraction:",
+        "    mov ecx, 3",
+        ".fraction_digit:",
+        "    xor edx, edx",
+        "    div rbp",
+        "    add dl, '0'",
+        "    dec rdi",
+        "    mov [rdi], dl",
+        "    loop .fraction_digit",
+        "    dec rdi",
+        "    mov byte [rdi], '.'",
+        "    mov rax, rbx",
+        "    test rax, rax",
+        "    jns .integer",
+        "    neg rax",
+        ".integer:",
+        "    xor edx, edx",
+        "    div rbp",
+        "    add dl, '0'",
+        "    dec rdi",
+        "    mov [rdi], dl",
+        "    test rax, rax",
+        "    jnz .integer",
+        "    test rsi, rsi",
+        "    jns .write",
+        "    dec rdi",
+        "    mov byte [rdi], '-'",
+        ".write:",
+        "    mov rsi, rdi",
+        "    lea rdx, [print_buf + 32]",
+        "    sub rdx, rdi",
+        "    call write_output",
+        "    pop rbp",
+        "    pop rdi",
+        "    pop rsi",
+        "    pop rdx",
+        "    pop rcx",
+        "    pop rbx",
+        "    pop rax",
+        "    ret",
+    ],
+    'print_str': [
+        "print_str:                  ; appends the NUL-terminated string at rcx and a newline to the output",
+        "    push rdx",
+        "    push rsi",
+        "    mov rsi, rcx",
+        "    mov rdx, rcx",
+        ".length:",
+        "    cmp byte [rdx], 0",
+        "    je .write",
+        "    inc rdx",
+        "    jmp .length",
+        ".write:",
+        "    sub rdx, rcx",
+        "    call write_output",
+        "    lea rsi, [newline]",
+        "    mov edx, 1",
+        "    call write_output",
+        "    pop rsi",
+        "    pop rdx",
+        "    ret",
+    ],
+    'write_output': [
+        "write_output:               ; appends rdx bytes at rsi to the output buffer",
+        "    push rax",
+        "    push rcx",
+        "    push rsi",
+        "    push rdi",
+        "    mov rax, [out_len]",
+        "    lea rcx, [rax + rdx]",
+        f"    cmp rcx, {OUTPUT_BUFFER_SIZE}",
+        "    jbe .copy",
+        "    call flush_output",
+        "    xor eax, eax",
+        f"    cmp rdx, {OUTPUT_BUFFER_SIZE}",
+        "    jbe .copy",
+        "    call write_all              ; too large for the buffer",
+        "    jmp .done",
+        ".copy:",
+        "    lea rdi, [out_buf]",
+        "    add rdi, rax",
+        "    add rax, rdx",
+        "    mov [out_len], rax",
+        "    mov rcx, rdx",
+        "    rep movsb",
+        ".done:",
+        "    pop rdi",
+        "    pop rsi",
+        "    pop rcx",
+        "    pop rax",
+        "    ret",
+    ],
+    'flush_output': [
+        "flush_output:               ; writes the buffered output to stdout and empties the buffer",
+        "    push rdx",
+        "    push rsi",
+        "    mov rdx, [out_len]",
+        "    lea rsi, [out_buf]",
+        "    call write_all",
+        "    mov qword [out_len], 0",
+        "    pop rsi",
+        "    pop rdx",
+        "    ret",
+    ],
+    'write_all': [
+        "write_all:                  ; writes rdx bytes at rsi to stdout, retrying partial writes",
+        "    push rax",
+        "    push rcx",
+        "    push rdx",
+        "    push rsi",
+        "    push rdi",
+        "    push r11",
+        ".next:",
+        "    test rdx, rdx",
+        "    jz .done",
+        "    mov eax, 1                  ; sys_write",
+        "    mov edi, 1                  ; stdout",
+        "    syscall",
+        "    test rax, rax",
+        "    jle .done                   ; write error: the rest is dropped",
+        "    add rsi, rax",
+        "    sub rdx, rax",
+        "    jmp .next",
+        ".done:",
+        "    pop r11",
+        "    pop rdi",
+        "    pop rsi",
+        "    pop rdx",
+        "    pop rcx",
+        "    pop rax",
+        "    ret",
+    ],
+    'read_line': [
+        "read_line:                  ; reads a line of stdin into rcx, at most rdx bytes, NUL-terminated",
+        "    call flush_output           ; show pending output before waiting for input",
+        "    push rax",
+        "    push rcx",
+        "    push rdx",
+        "    push rsi",
+        "    push rdi",
+        "    push rbp",
+        "    push r11",
+        "    mov rsi, rcx",
+        "    lea rbp, [rcx + rdx]",
+        ".next:",
+        "    cmp rsi, rbp",
+        "    jae .done",
+        "    xor eax, eax                ; sys_read",
+        "    xor edi, edi                ; stdin",
+        "    mov edx, 1                  ; one byte at a time, so later reads get the next lines",
+        "    syscall",
+        "    cmp rax, 1",
+        "    jne .done",
+        "    cmp byte [rsi], 10",
+        "    je .done",
+        "    inc rsi",
+        "    jmp .next",
+        ".done:",
+        "    mov byte [rsi], 0",
+        "    pop r11",
+        "    pop rbp",
+        "    pop rdi",
+        "    pop rsi",
+        "    pop rdx",
+        "    pop rcx",
+        "    pop rax",
+        "    ret",
+    ],
+    'read_int': [
+        "read_int:                   ; reads a line of stdin and returns its integer in rax",
+        "    push rbx",
+        "    push rcx",
+        "    push rdx",
+        "    push rsi",
+        "    lea rcx, [input_buf]",
+        "    mov edx, 32",
+        "    call read_line",
+        "    lea rsi, [input_buf]",
+        "    xor eax, eax",
+        "    xor ebx, ebx",
+        "    cmp byte [rsi], '-'",
+        "    jne .digit",
+        "    inc ebx",
+        "    inc rsi",
+        ".digit:",
+        "    movzx ecx, byte [rsi]",
+        "    sub ecx, '0'",
+        "    cmp ecx, 9",
+        "    ja .done",
+        "    imul rax, rax, 10",
+        "    add rax, rcx",
+        "    inc rsi",
+        "    jmp .digit",
+        ".done:",
+        "    test ebx, ebx",
+        "    jz .return",
+        "    neg rax",
+        ".return:",
+        "    pop rsi",
+        "    pop rdx",
+        "    pop rcx",
+        "    pop rbx",
+        "    ret",
+    ],
+    'division_fault': [
+        "division_fault:             ; writes the buffered output, then faults like the division would",
+        "    call flush_output",
+        "    xor ecx, ecx",
+        "    idiv rcx",
+    ],
+}
+
+RUNTIME_DATA = {
+    'print_int': [('bss', "    print_buf: resb 32")],
+    'print_float': [('bss', "    print_buf: resb 32"), ('data', "    float_thousand: dq 1000.0")],
+    'print_str': [('data', "    newline: db 10")],
+    'write_output': [],
+    'flush_output': [('data', "    out_len: dq 0"), ('bss', f"    out_buf: resb {OUTPUT_BUFFER_SIZE}")],
+    'write_all': [],
+    'read_line': [],
+    'read_int': [('bss', "    input_buf: resb 33")],
+    'division_fault': [],
+}
+
+RUNTIME_DEPENDENCIES = {
+    'print_int': ('write_output',),
+    'print_float': ('write_output',),
+    'print_str': ('write_output',),
+    'write_output': ('flush_output', 'write_all'),
+    'flush_output': ('write_all',),
+    'read_line': ('flush_output',),
+    'read_int': ('read_line',),
+    'division_fault': ('flush_output',),
+}
+
+
+def is_immediate(value):
+    """Whether an integer fits the sign-extended 32-bit immediate of most instructions."""
+    return IMMEDIATE_MIN <= value <= IMMEDIATE_MAX
+
+
+class ASM64Generator(ASMGenerator):
+    """Translates TAC to NASM for x86-64 Linux.
+
+    Instruction selection is that of ASMGenerator over 64-bit registers
+    and qword slots, with double-precision floats, so integers wrap at 64
+    bits and floats print like the TAC VM's. System calls go through
+    `syscall`, and printing fills an output buffer instead of making one
+    system call per value.
+    """
+    PREAMBLE = ("bits 64", "default rel", "")
+    REGISTERS = ALLOCATABLE_REGISTERS
+    ACCUMULATOR, SCRATCH, SCRATCH2 = 'rax', 'rcx', 'rdx'
+    WORD = 'qword'
+    SLOT = 'dq'
+    SIGN_EXTEND = 'cqo'
+    FLOAT_CONSTANT = '__float64__'
+    MOVE_FLOAT, COMPARE_FLOAT = 'movsd', 'comisd'
+    INT_TO_FLOAT, FLOAT_TO_INT = 'cvtsi2sd', 'cvttsd2si'
+    FLOAT_ARITHMETIC = FLOAT_ARITHMETIC
+    RUNTIME = RUNTIME
+    RUNTIME_DATA = RUNTIME_DATA
+    RUNTIME_DEPENDENCIES = RUNTIME_DEPENDENCIES
+
+    def exit_code(self):
+        code = []
+        if 'flush_output' in self.routines:
+            code.append("    call flush_output")
+        code.extend([
+            "    mov eax, 60",    # sys_exit
+            "    xor edi, edi",   # return 0
+            "    syscall"
+        ])
+        return code
+
+    def operand(self, arg):
+        """As in ASMGenerator; a constant too wide for an immediate is loaded into rcx first."""
+        if (isinstance(arg, Const) and not isinstance(arg.value, (str, float))
+                and not is_immediate(int(arg.value))):
+            self.asm_code.append(f"    mov {self.SCRATCH}, {int(arg.value)}")
+            return self.SCRATCH
+        return super().operand(arg)
+
+    def load_int(self, register, arg):
+        # mov takes a full 64-bit immediate when its destination is a register
+        if isinstance(arg, Const) and not isinstance(arg.value, (str, float)):
+            self.asm_code.append(f"    mov {register}, {int(arg.value)}")
+        else:
+            super().load_int(register, arg)
+
+    def process_assignment(self, quad):
+        dest = quad.result
+        if isinstance(quad.arg1, Const) and dest not in self.registers:
+            value = coerce(quad.arg1.value, self.type_of(dest))
+            # A store to memory only takes a 32-bit immediate, so doubles and wide integers go through rax
+            if isinstance(value, float) or (not isinstance(value, str) and not is_immediate(int(value))):
+                self.asm_code.extend([
+                    f"    mov {self.ACCUMULATOR}, {super().operand(Const(value))}",
+                    f"    mov [{dest}], {self.ACCUMULATOR}"
+                ])
+                return
+        super().process_assignment(quad)
+
+    def divide(self, divisor, right):
+        if not (isinstance(right, Const) and right.value):
+            # The buffered output has to be written before the division faults
+            if divisor.startswith(self.WORD):
+                self.asm_code.append(f"    cmp {divisor}, 0")
+            else:
+                self.asm_code.append(f"    test {divisor}, {divisor}")
+            self.asm_code.append(f"    jz {self.use_routine('division_fault')}")
+        super().divide(divisor, right)
@@ -1,42 +1,372 @@
+import logging
+from collections import Counter
+
+from peephole import peephole
+from regalloc import ALLOCATABLE_REGISTERS, allocate_registers
+from tac_ir import (ARITHMETIC_OPS, BRANCH_COMPARISONS, COMPARISON_OPS, DEFINING_OPS, Const, Op, coerce,
+                    const_type, infer_types, truth)
+
+logger = logging.getLogger(__name__)
+
+# Condition codes for signed integers and for floats (comiss sets the
+# flags like an unsigned compare)
+INT_CONDITIONS = {Op.LT: 'l', Op.LE: 'le', Op.GT: 'g', Op.GE: 'ge', Op.EQ: 'e', Op.NE: 'ne'}
+FLOAT_CONDITIONS = {Op.LT: 'b', Op.LE: 'be', Op.GT: 'a', Op.GE: 'ae', Op.EQ: 'e', Op.NE: 'ne'}
+
+INT_ARITHMETIC = {Op.ADD: 'add', Op.SUB: 'sub', Op.MUL: 'imul'}
+FLOAT_ARITHMETIC = {Op.ADD: 'addss', Op.SUB: 'subss', Op.MUL: 'mulss', Op.DIV: 'divss'}
+
+STRING_BUFFER_SIZE = 256
+
+# Runtime routines, appended after the exit code only when the program uses them
+RUNTIME = {
+    'print_int': [
+        "print_int:                  ; prints eax as a signed decimal and a newline",
+        "    pushad",
+        "    mov edi, print_buf + 31",
+        "    mov byte [edi], 10",
+        "    mov esi, eax",
+        "    mov ebx, 10",
+        "    test eax, eax",
+        "    jns .digit",
+        "    neg eax",
+        ".digit:",
+        "    xor edx, edx",
+        "    div ebx",
+        "    add dl, '0'",
+        "    dec edi",
+        "    mov [edi], dl",
+        "    test eax, eax",
+        "    jnz .digit",
+        "    test esi, esi",
+        "    jns .write",
+        "    dec edi",
+        "    mov byte [edi], '-'",
+        ".write:",
+        "    mov ecx, edi",
+        "    mov edx, print_buf + 32",
+        "    sub edx, edi",
+        "    mov eax, 4",
+        "    mov ebx, 1",
+        "    int 80h",
+        "    popad",
+        "    ret",
+    ],
+    'print_float': [
+        "print_float:                ; prints xmm0 with three decimals and a newline",
+        "    pushad",
+        "    mov edi, print_buf + 31",
+        "    mov byte [edi], 10",
+        "    cvttss2si ebx, xmm0         ; integer part, truncated toward zero",
+        "    cvtsi2ss xmm1, ebx",
+        "    subss xmm0, xmm1",
+        "    mulss xmm0, [float_thousand]",
+        "    cvttss2si eax, xmm0         ; thousandths, with the sign of the value",
+        "    mov esi, eax",
+        "    or esi, ebx                 ; sign bit set when the value is negative",
+        "    mov ebp, 10",
+        "    test eax, eax",
+        "    jns .fraction",
+        "    neg eax",
+        ".fraction:",
+        "    mov ecx, 3",
+        ".fraction_digit:",
+        "    xor edx, edx",
+        "    div ebp",
+        "    add dl, '0'",
+        "    dec edi",
+        "    mov [edi], dl",
+        "    loop .fraction_digit",
+        "    dec edi",
+        "    mov byte [edi], '.'",
+        "    mov eax, ebx",
+        "    test eax, eax",
+        "    jns .integer",
+        "    neg eax",
+        ".integer:",
+        "    xor edx, edx",
+        "    div ebp",
+        "    add dl, '0'",
+        "    dec edi",
+        "    mov [edi], dl",
+        "    test eax, eax",
+        "    jnz .integer",
+        "    test esi, esi",
+        "    jns .write",
+        "    dec edi",
+        "    mov byte [edi], '-'",
+        ".write:",
+        "    mov ecx, edi",
+        "    mov edx, print_buf + 32",
+        "    sub edx, edi",
+        "    mov eax, 4",
+        "    mov ebx, 1",
+        "    int 80h",
+        "    popad",
+        "    ret",
+    ],
+    'print_str': [
+        "print_str:                  ; prints the NUL-terminated string at ecx and a newline",
+        "    pushad",
+        "    mov edx, ecx",
+        ".length:",
+        "    cmp byte [edx], 0",
+        "    je .write",
+        "    inc edx",
+        "    jmp .length",
+        ".write:",
+        "    sub edx, ecx",
+        "    mov eax, 4",
+        "    mov ebx, 1",
+        "    int 80h",
+        "    mov eax, 4",
+        "    mov ebx, 1",
+        "    mov ecx, newline",
+        "    mov edx, 1",
+        "    int 80h",
+        "    popad",
+        "    ret",
+    ],
+    'read_line': [
+        "read_line:                  ; reads a line of stdin into ecx, at most edx bytes, NUL-terminated",
+        "    pushad",
+        "    mov esi, ecx",
+        "    lea ebp, [ecx + edx]",
+        ".next:",
+        "    cmp esi, ebp",
+        "    jae .done",
+        "    mov eax, 3",
+        "    mov ebx, 0",
+        "    mov ecx, esi",
+        "    mov edx, 1                  ; one byte at a time, so later reads get the next lines",
+        "    int 80h",
+        "    cmp eax, 1",
+        "    jne .done",
+        "    cmp byte [esi], 10",
+        "    je .done",
+        "    inc esi",
+        "    jmp .next",
+        ".done:",
+        "    mov byte [esi], 0",
+        "    popad",
+        "    ret",
+    ],
+    'read_int': [
+        "read_int:                   ; reads a line of stdin and returns its integer in eax",
+        "    push ebx",
+        "    push esi",
+        "    mov ecx, input_buf",
+        "    mov edx, 32",
+        "    call read_line",
+        "    mov esi, input_buf",
+        "    xor eax, eax",
+        "    xor ebx, ebx",
+        "    cmp byte [esi], '-'",
+        "    jne .digit",
+        "    inc ebx",
+        "    inc esi",
+        ".digit:",
+        "    movzx ecx, byte [esi]",
+        "    sub ecx, '0'",
+        "    cmp ecx, 9",
+        "    ja .done",
+        "    imul eax, eax, 10",
+        "    add eax, ecx",
+        "    inc esi",
+        "    jmp .digit",
+        ".done:",
+        "    test ebx, ebx",
+        "    jz .return",
+        "    neg eax",
+        ".return:",
+        "    pop esi",
+        "    pop ebx",
+        "    ret",
+    ],
+}
+
+# Data each routine needs, as (section, line)
+RUNTIME_DATA = {
+    'print_int': [('bss', "    print_buf: resb 32")],
+    'print_float': [('bss', "    print_buf: resb 32"), ('data', "    float_thousand: dd 1000.0")],
+    'print_str': [('data', "    newline: db 10")],
+    'read_line': [],
+    'read_int': [('bss', "    input_buf: resb 33")],
+}
+
+# Routines each routine calls
+RUNTIME_DEPENDENCIES = {'read_int': ('read_line',)}
+
+
+def nasm_string(text):
+    """NASM operand list for text followed by a NUL byte."""
+    parts = []
+    run = ''
+    for char in text:
+        if char.isprintable() and char not in "'\\" and ord(char) < 128:
+            run += char
+            continue
+        if run:
+            parts.append(f"'{run}'")
+            run = ''
+        parts.extend(str(byte) for byte in char.encode('utf-8'))
+    if run:
+        parts.append(f"'{run}'")
+    parts.append('0')
+    return ', '.join(parts)
+
+
 class ASMGenerator:
-    def __init__(self):
+    """Translates TAC to NASM.
+
+    With allocate_registers, integer, boolean and string names live in
+    registers where the linear-scan allocator finds room; eax, ecx and edx
+    stay free as scratch registers. With optimize_peephole the program's
+    instructions go through the peephole rules, which record what they
+    removed in peephole_stats.
+
+    The class attributes describe the target (register names, operand and
+    float sizes, runtime routines), so other targets subclass it.
+    """
+    PREAMBLE = ()
+    REGISTERS = ALLOCATABLE_REGISTERS
+    ACCUMULATOR, SCRATCH, SCRATCH2 = 'eax', 'ecx', 'edx'
+    WORD = 'dword'
+    SLOT = 'dd'
+    SIGN_EXTEND = 'cdq'
+    FLOAT_CONSTANT = '__float32__'
+    MOVE_FLOAT, COMPARE_FLOAT = 'movss', 'comiss'
+    INT_TO_FLOAT, FLOAT_TO_INT = 'cvtsi2ss', 'cvttss2si'
+    FLOAT_ARITHMETIC = FLOAT_ARITHMETIC
+    RUNTIME = RUNTIME
+    RUNTIME_DATA = RUNTIME_DATA
+    RUNTIME_DEPENDENCIES = RUNTIME_DEPENDENCIES
+
+    def __init__(self, allocate_registers=True, optimize_peephole=True):
+        self.allocate_registers = allocate_registers
+        self.optimize_peephole = optimize_peephole
+        self.peephole_stats = Counter()
+        self.registers = {}
         self.asm_code = []
         self.data_section = []
+        self.bss_section = []
         self.variables = set()
+        self.strings = {}
         self.string_count = 0
+        self.float_constants = {}
         self.temp_vars = set()
+        self.types = {}
+        self.routines = []
 
     def add_variable(self, name):
         if name not in self.variables:
             self.variables.add(name)
-            self.data_section.append(f"    {name}: dd 0")
+            if name not in self.registers:
+                self.data_section.append(f"    {name}: {self.SLOT} 0")
+            if self.types.get(name) == 'str':
+                # Every string variable owns a buffer for input()
+                self.bss_section.append(f"    buf_{name}: resb {STRING_BUFFER_SIZE}")
 
     def add_string(self, text):
-        label = f"str_{self.string_count}"
-        self.string_count += 1
-        self.data_section.extend([
-            f"    {label}: db '{text}', 10",
-            f"    len_{label}: equ $-{label}"
-        ])
+        """Label of a NUL-terminated copy of text, shared by equal literals."""
+        label = self.strings.get(text)
+        if label is None:
+            label = f"str_{self.string_count}"
+            self.string_count += 1
+            self.strings[text] = label
+            self.data_section.append(f"    {label}: db {nasm_string(text)}")
         return label
 
-    def generate_asm(self, tac_lines):
-        # Seção de dados
-        self.asm_code = ["section .data"]
-        
-        # Processa variáveis e strings
-        for line in tac_lines:
-            if "print" in line:
-                text = line.split("print")[1].strip()
-                if text and not text.startswith('t'):
-                    self.add_string(text)
-            elif "=" in line:
-                var = line.split("=")[0].strip()
-                self.add_variable(var)
-        
-        self.asm_code.extend(self.data_section)
-        
+    def add_float(self, value):
+        label = self.float_constants.get(value)
+        if label is None:
+            label = f"flt_{len(self.float_constants)}"
+            self.float_constants[value] = label
+            self.data_section.append(f"    {label}: {self.SLOT} {self.FLOAT_CONSTANT}({float(value)!r})")
+        return label
+
+    def use_routine(self, name):
+        if name not in self.routines:
+            self.routines.append(name)
+            for dependency in self.RUNTIME_DEPENDENCIES.get(name, ()):
+                self.use_routine(dependency)
+            for section, line in self.RUNTIME_DATA[name]:
+                target = self.data_section if section == 'data' else self.bss_section
+                if line not in target:
+                    target.append(line)
+        return name
+
+    def type_of(self, operand):
+        if isinstance(operand, Const):
+            return const_type(operand.value)
+        return self.types.get(operand, 'int')
+
+    def location(self, name):
+        """The register or memory operand that holds a variable or temporary."""
+        return self.registers.get(name) or f"[{name}]"
+
+    def operand(self, arg):
+        """Integer source operand: an immediate, a string address, a register or a memory slot."""
+        if isinstance(arg, Const):
+            value = arg.value
+            if isinstance(value, str):
+                return self.add_string(value)
+            if isinstance(value, float):
+                return f"{self.FLOAT_CONSTANT}({value!r})"
+            return str(int(value))
+        return self.location(arg)
+
+    def generate_asm(self, tac):
+        self.types = infer_types(tac)
+        if self.allocate_registers:
+            self.registers = allocate_registers(tac, self.types, self.REGISTERS)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Register allocation: %s",
+                             ", ".join(f"{name}={register}" for name, register in self.registers.items()))
+        self.dispatch = {
+            Op.ASSIGN: self.process_assignment,
+            Op.NOT: self.process_not,
+            Op.IF_NOT: self.process_conditional,
+            Op.GOTO: self.process_goto,
+            Op.LABEL: self.process_label,
+            Op.PARAM: self.process_param,
+            Op.PRINT: self.process_print,
+            Op.INPUT: self.process_input,
+        }
+        for op in ARITHMETIC_OPS:
+            self.dispatch[op] = self.process_arithmetic
+        for op in COMPARISON_OPS:
+            self.dispatch[op] = self.process_comparison
+        for op in BRANCH_COMPARISONS:
+            self.dispatch[op] = self.process_branch
+
+        # Seção de dados: variáveis e temporários fora de registradores, na ordem em que aparecem
+        for quad in tac:
+            if quad.op in DEFINING_OPS:
+                self.add_variable(quad.result)
+
         # Seção de texto
+        text = []
+        self.asm_code = text
+        for quad in tac:
+            text.append(f"    ; {quad}")
+            self.dispatch[quad.op](quad)
+        if self.optimize_peephole:
+            text, self.peephole_stats = peephole(text)
+
+        # Código de saída
+        text.append("")
+        text.extend(self.exit_code())
+        for name in self.routines:
+            text.append("")
+            text.extend(self.RUNTIME[name])
+
+        self.asm_code = list(self.PREAMBLE)
+        self.asm_code.append("section .data")
+        self.asm_code.extend(self.data_section)
+        if self.bss_section:
+            self.asm_code.extend(["", "section .bss"])
+            self.asm_code.extend(self.bss_section)
         self.asm_code.extend([
             "",
             "section .text",
@@ -44,131 +374,236 @@ class ASMGenerator:
             "",
             "_start:"
         ])
+        self.asm_code.extend(text)
 
-        # Processa instruções
-        for line in tac_lines:
-            self.asm_code.append(f"    ; {line}")
-            
-            if "=" in line:
-                self.process_assignment(line)
-            elif "print" in line:
-                self.process_print(line)
-            elif "input" in line:
-                self.process_input(line)
-            elif "goto" in line:
-                label = line.split()[-1]
-                self.asm_code.append(f"    jmp {label}")
-            elif "label" in line:
-                label = line.split()[-1]
-                self.asm_code.append(f"{label}:")
-            elif "if not" in line:
-                self.process_conditional(line)
-        
-        # Código de saída
-        self.asm_code.extend([
-            "",
+        logger.debug("Generated %d assembly lines, %d variables (%d in registers), %d strings",
+                     len(self.asm_code), len(self.variables), len(self.registers), self.string_count)
+        return "\n".join(self.asm_code)
+
+    def exit_code(self):
+        return [
             "    mov eax, 1",    # sys_exit
             "    mov ebx, 0",    # return 0
             "    int 80h"
-        ])
+        ]
 
-        return "\n".join(self.asm_code)
+    def load_float(self, register, arg):
+        """Load arg into an xmm register as a float of the target's precision."""
+        if isinstance(arg, Const):
+            if isinstance(arg.value, float):
+                self.asm_code.append(f"    {self.MOVE_FLOAT} {register}, [{self.add_float(arg.value)}]")
+            else:
+                self.asm_code.append(f"    {self.MOVE_FLOAT} {register}, [{self.add_float(float(arg.value))}]")
+        elif self.type_of(arg) == 'float':
+            self.asm_code.append(f"    {self.MOVE_FLOAT} {register}, [{arg}]")
+        elif arg in self.registers:
+            self.asm_code.append(f"    {self.INT_TO_FLOAT} {register}, {self.registers[arg]}")
+        else:
+            self.asm_code.append(f"    {self.INT_TO_FLOAT} {register}, {self.WORD} [{arg}]")
+
+    def load_int(self, register, arg):
+        if not isinstance(arg, Const) and self.type_of(arg) == 'float':
+            self.asm_code.append(f"    {self.FLOAT_TO_INT} {register}, {self.WORD} [{arg}]")
+        else:
+            source = self.operand(arg)
+            if source != register:
+                self.asm_code.append(f"    mov {register}, {source}")
+
+    def process_assignment(self, quad):
+        dest = quad.result
+        src = quad.arg1
+        dest_type = self.type_of(dest)
+        location = self.location(dest)
+        if isinstance(src, Const):
+            value = coerce(src.value, dest_type)
+            size = '' if dest in self.registers else f"{self.WORD} "
+            self.asm_code.append(f"    mov {size}{location}, {self.operand(Const(value))}")
+        elif dest_type == 'float':
+            self.load_float('xmm0', src)
+            self.asm_code.append(f"    {self.MOVE_FLOAT} {location}, xmm0")
+        elif dest in self.registers or (src in self.registers and self.type_of(src) != 'float'):
+            # At most one side is in memory, so no scratch register is needed
+            self.load_int(location, src)
+        else:
+            self.load_int(self.ACCUMULATOR, src)
+            self.asm_code.append(f"    mov {location}, {self.ACCUMULATOR}")
+
+    def process_arithmetic(self, quad):
+        dest = quad.result
+        left, right = quad.arg1, quad.arg2
+        result_type = self.type_of(dest)
+        location = self.location(dest)
+        if result_type == 'str':
+            raise ValueError("Concatenação de strings não é suportada pelo gerador Assembly")
+        if result_type == 'float':
+            self.load_float('xmm0', left)
+            self.load_float('xmm1', right)
+            self.asm_code.extend([
+                f"    {self.FLOAT_ARITHMETIC[quad.op]} xmm0, xmm1",
+                f"    {self.MOVE_FLOAT} {location}, xmm0"
+            ])
+            return
+        if quad.op is Op.DIV:
+            self.load_int(self.ACCUMULATOR, left)
+            self.asm_code.append(f"    {self.SIGN_EXTEND}")
+            if isinstance(right, Const) or self.type_of(right) == 'float':
+                self.load_int(self.SCRATCH, right)
+                divisor = self.SCRATCH
+            elif right in self.registers:
+                divisor = self.registers[right]
+            else:
+                divisor = f"{self.WORD} [{right}]"
+            self.divide(divisor, right)
+            self.asm_code.append(f"    mov {location}, {self.ACCUMULATOR}")
+            return
+        if self.type_of(right) == 'float':
+            self.load_int(self.SCRATCH, right)
+            source = self.SCRATCH
+        else:
+            source = self.operand(right)
+        # Compute straight into the destination register unless it holds the right operand
+        target = location if dest in self.registers and source != location else self.ACCUMULATOR
+        self.load_int(target, left)
+        if quad.op is Op.MUL and isinstance(right, Const) and source != self.SCRATCH:
+            # Two-operand imul has no immediate form
+            self.asm_code.append(f"    imul {target}, {target}, {source}")
+        else:
+            self.asm_code.append(f"    {INT_ARITHMETIC[quad.op]} {target}, {source}")
+        if target != location:
+            self.asm_code.append(f"    mov {location}, {target}")
+
+    def divide(self, divisor, right):
+        """Divide the sign-extended accumulator by divisor, the operand holding the TAC value right.
+
+        The quotient goes to the accumulator.
+        """
+        self.asm_code.append(f"    idiv {divisor}")
 
-    def process_assignment(self, line):
-        parts = line.split(" = ")
-        dest = parts[0].strip()
-        src = parts[1].split("#")[0].strip()
-        
-        if ">" in src:
-            ops = src.split(">")
+    def set_flag(self, condition, dest):
+        """Store 1 in dest when condition holds after a compare, 0 otherwise."""
+        if dest in self.registers:
             self.asm_code.extend([
-                f"    mov eax, [{ops[0].strip()}]",
-                "    cmp eax, 0",     # Compara com zero
-                "    setg al",        # Define AL=1 se maior que zero
-                "    movzx eax, al",  # Estende AL para EAX
-                f"    mov [{dest}], eax"
+                f"    set{condition} al",
+                f"    movzx {self.registers[dest]}, al",
             ])
-        elif "==" in src:
-            ops = src.split("==")
+        else:
             self.asm_code.extend([
-                f"    mov eax, [{ops[0].strip()}]",
-                f"    cmp eax, {ops[1].strip()}",
-                "    sete al",
-                "    movzx eax, al",
-                f"    mov [{dest}], eax"
+                f"    set{condition} al",
+                f"    movzx {self.ACCUMULATOR}, al",
+                f"    mov [{dest}], {self.ACCUMULATOR}"
             ])
-        elif src.isdigit():
-            self.asm_code.append(f"    mov dword [{dest}], {src}")
-        elif "-" in src:
-            ops = src.split("-")
+
+    def process_comparison(self, quad):
+        conditions = self.compare(quad.arg1, quad.arg2)
+        self.set_flag(conditions[quad.op], quad.result)
+
+    def compare(self, left, right):
+        """Emit the compare of left with right; returns the condition codes to use."""
+        if 'float' in (self.type_of(left), self.type_of(right)):
+            self.load_float('xmm0', left)
+            self.load_float('xmm1', right)
+            self.asm_code.append(f"    {self.COMPARE_FLOAT} xmm0, xmm1")
+            return FLOAT_CONDITIONS
+        source = self.operand(right)
+        if left in self.registers:
+            self.asm_code.append(f"    cmp {self.registers[left]}, {source}")
+        elif isinstance(left, str) and not source.startswith('['):
+            self.asm_code.append(f"    cmp {self.WORD} [{left}], {source}")
+        else:
+            self.load_int(self.ACCUMULATOR, left)
+            self.asm_code.append(f"    cmp {self.ACCUMULATOR}, {source}")
+        return INT_CONDITIONS
+
+    def process_branch(self, quad):
+        op = BRANCH_COMPARISONS[quad.op]
+        conditions = self.compare(quad.arg1, quad.arg2)
+        self.asm_code.append(f"    j{conditions[op]} {quad.result}")
+
+    def compare_float_with_zero(self, arg):
+        """Compare a float with 0.0, so that 'e' holds when it is zero.
+
+        Testing the bits or the truncated integer would make -0.0 true and
+        0.5 false, unlike the TAC.
+        """
+        self.load_float('xmm0', arg)
+        self.asm_code.extend([
+            "    xorps xmm1, xmm1",
+            f"    {self.COMPARE_FLOAT} xmm0, xmm1",
+        ])
+
+    def process_not(self, quad):
+        if self.type_of(quad.arg1) == 'float':
+            self.compare_float_with_zero(quad.arg1)
+        else:
+            self.load_int(self.ACCUMULATOR, quad.arg1)
+            self.asm_code.append(f"    test {self.ACCUMULATOR}, {self.ACCUMULATOR}")
+        self.set_flag('e', quad.result)
+
+    def process_conditional(self, quad):
+        condition = quad.arg1
+        label = quad.result
+        if isinstance(condition, Const):
+            if not truth(condition.value):
+                self.asm_code.append(f"    jmp {label}")
+            return
+        if self.type_of(condition) == 'float':
+            self.compare_float_with_zero(condition)
+        elif condition in self.registers:
+            register = self.registers[condition]
+            self.asm_code.append(f"    test {register}, {register}")
+        else:
             self.asm_code.extend([
-                f"    mov eax, [{ops[0].strip()}]",
-                "    dec eax",        # Decrementa 1
-                f"    mov [{dest}], eax"
+                f"    mov {self.ACCUMULATOR}, [{condition}]",
+                f"    test {self.ACCUMULATOR}, {self.ACCUMULATOR}",   # Testa se é zero
             ])
-        elif "*" in src:
-            ops = src.split(" * ")
+        self.asm_code.append(f"    jz {label}")      # Pula se for zero
+
+    def process_goto(self, quad):
+        self.asm_code.append(f"    jmp {quad.result}")
+
+    def process_label(self, quad):
+        self.asm_code.append(f"{quad.result}:")
+
+    def process_param(self, quad):
+        # The argument is read by the call that follows
+        pass
+
+    def process_print(self, quad):
+        arg = quad.arg1
+        arg_type = self.type_of(arg)
+        if arg_type == 'str':
             self.asm_code.extend([
-                f"    mov eax, [{ops[0].strip()}]",
-                f"    imul eax, [{ops[1].strip()}]",
-                f"    mov [{dest}], eax"
+                f"    mov {self.SCRATCH}, {self.operand(arg)}",
+                f"    call {self.use_routine('print_str')}"
             ])
-        elif src.replace('.', '', 1).isdigit():  # Check for float
-            self.asm_code.append(f"    mov dword [{dest}], __float32__({src})")
+        elif arg_type == 'float':
+            self.load_float('xmm0', arg)
+            self.asm_code.append(f"    call {self.use_routine('print_float')}")
         else:
             self.asm_code.extend([
-                f"    mov eax, [{src}]",
-                f"    mov [{dest}], eax"
+                f"    mov {self.ACCUMULATOR}, {self.operand(arg)}",
+                f"    call {self.use_routine('print_int')}"
             ])
 
-    def process_conditional(self, line):
-        if "if not" in line:
-            condition_start = line.index("if not") + 7
-            goto_index = line.index("goto")
-            condition = line[condition_start:goto_index].strip()
-            label = line.split("goto")[1].strip()
-            
-            # Verifica se é uma variável temporária simples (t0, t3, etc)
-            if condition.startswith('t'):
-                self.asm_code.extend([
-                    f"    mov eax, [{condition}]",
-                    "    test eax, eax",  # Testa se é zero
-                    f"    jz {label}"     # Pula se for zero
-                ])
-            # Verifica se é uma comparação
-            elif ">" in condition:
-                left, right = condition.split(">")
-                self.asm_code.extend([
-                    f"    mov eax, [{left.strip()}]",
-                    "    cmp eax, 0",     # Compara com zero
-                    f"    jle {label}"    # Pula se menor ou igual
-                ])
-            elif "==" in condition:
-                left, right = condition.split("==")
-                self.asm_code.extend([
-                    f"    mov eax, [{left.strip()}]",
-                    f"    cmp eax, {right.strip()}",  # Compara valores
-                    f"    jne {label}"    # Pula se não igual
-                ])
-
-    def process_print(self, line):
-        msg = line.split("print")[1].strip()
-        if msg:
-            label = f"str_{self.string_count-1}"
+    def process_input(self, quad):
+        var = quad.result
+        var_type = self.type_of(var)
+        location = self.location(var)
+        if var_type == 'str':
+            size = '' if var in self.registers else f"{self.WORD} "
             self.asm_code.extend([
-                "    mov eax, 4",         # sys_write
-                "    mov ebx, 1",         # stdout
-                f"    mov ecx, {label}",  # mensagem
-                f"    mov edx, len_{label}", # tamanho
-                "    int 80h"
+                f"    mov {self.SCRATCH}, buf_{var}",
+                f"    mov {self.SCRATCH2}, {STRING_BUFFER_SIZE - 1}",
+                f"    call {self.use_routine('read_line')}",
+                f"    mov {size}{location}, buf_{var}"
             ])
-
-    def process_input(self, line):
-        var = line.split()[1]
-        self.asm_code.extend([
-            "    mov eax, 3",    # sys_read
-            "    mov ebx, 0",    # stdin
-            f"    mov ecx, {var}",
-            "    mov edx, 4",    # tamanho
-            "    int 80h"
-        ])
\ No newline at end of file
+            return
+        self.asm_code.append(f"    call {self.use_routine('read_int')}")
+        if var_type == 'float':
+            # Float input reads an integer and converts it
+            self.asm_code.extend([
+                f"    {self.INT_TO_FLOAT} xmm0, {self.ACCUMULATOR}",
+                f"    {self.MOVE_FLOAT} {location}, xmm0"
+            ])
+        else:
+            self.asm_code.append(f"    mov {location}, {self.ACCUMULATOR}")
@@ -0,0 +1,161 @@
+import argparse
+import fnmatch
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from rd_parser import PARSER_NAMES, make_parser
+from tac_generator import TARGETS, compile_source, write_tac
+
+# Per-process state, built once by init_worker so every file (or server.py
+# request) compiled in a worker reuses the same parser and cache handle
+_parser = None
+_cache = None
+_optimize = True
+_target = 'x86'
+
+
+def init_worker(cache_dir=None, cache_size=None, optimize=True, target='x86', parser='rd'):
+    """Set up this process; cache_size is in bytes, DEFAULT_MAX_BYTES when None."""
+    global _parser, _cache, _optimize, _target
+    _optimize = optimize
+    _target = target
+    _parser = make_parser(parser)
+    _cache = None
+    if cache_dir:
+        from compile_cache import DEFAULT_MAX_BYTES, CompilationCache
+        _cache = CompilationCache(cache_dir, DEFAULT_MAX_BYTES if cache_size is None else cache_size)
+
+
+def compile_in_worker(source, optimize=None, target=None):
+    """compile_source() with the parser and cache of this worker.
+
+    optimize and target default to those given to init_worker.
+    """
+    return compile_source(source, parser=_parser, cache=_cache,
+                          optimize=_optimize if optimize is None else optimize,
+                          target=target or _target)
+
+
+def compile_file(task):
+    """Compile one (source, tac_path, asm_path) task; returns (source, errors, cached)."""
+    source_path, tac_path, asm_path = task
+    try:
+        with open(source_path, 'r', encoding='utf-8') as file:
+            result = compile_in_worker(file)
+        if result.errors:
+            return source_path, result.errors, result.cached
+        os.makedirs(os.path.dirname(tac_path) or '.', exist_ok=True)
+        write_tac(result.tac, tac_path)
+        with open(asm_path, 'w') as file:
+            file.write(result.asm)
+        return source_path, [], result.cached
+    except Exception as e:
+        return source_path, [f"Erro durante a execução: {str(e)}"], False
+
+
+def collect_sources(inputs, pattern):
+    """Expand files and directories (searched recursively) into (path, relative name) pairs."""
+    patterns = pattern.split(',')
+    sources = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, dirs, files in os.walk(item):
+                dirs.sort()
+                for name in sorted(files):
+                    if any(fnmatch.fnmatch(name, p) for p in patterns):
+                        path = os.path.join(root, name)
+                        sources.append((path, os.path.relpath(path, item)))
+        else:
+            sources.append((item, os.path.basename(item)))
+    return sources
+
+
+def plan_outputs(sources, output_dir):
+    """Give every source its own .tac/.asm paths, next to it or under output_dir.
+
+    Raises ValueError, listing them, if sources would share outputs, such as
+    a.txt and a.lpms, or x/p.lpms and y/p.lpms given as files with output_dir.
+    """
+    tasks = []
+    owners = {}
+    for path, relative in sources:
+        if output_dir:
+            stem = os.path.join(output_dir, os.path.splitext(relative)[0])
+        else:
+            stem = os.path.splitext(path)[0]
+        owners.setdefault(os.path.normcase(os.path.abspath(stem)), []).append(path)
+        tasks.append((path, stem + '.tac', stem + '.asm'))
+    clashes = [paths for paths in owners.values() if len(paths) > 1]
+    if clashes:
+        raise ValueError("arquivos com as mesmas saídas .tac/.asm: "
+                         + "; ".join(", ".join(paths) for paths in clashes))
+    return tasks
+
+
+def run_batch(tasks, jobs=None, cache_dir=None, cache_size=None, optimize=True, target='x86',
+              parser='rd'):
+    """Compile all tasks, on a process pool unless jobs == 1; returns the results in order."""
+    if jobs == 1:
+        init_worker(cache_dir, cache_size, optimize, target, parser)
+        return [compile_file(task) for task in tasks]
+    jobs = jobs or os.cpu_count() or 1
+    # Hand tasks out in batches so small files do not pay one round trip each
+    chunksize = max(1, len(tasks) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker,
+                             initargs=(cache_dir, cache_size, optimize, target, parser)) as executor:
+        return list(executor.map(compile_file, tasks, chunksize=chunksize))
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(
+        description="Compila vários programas LPMS em paralelo, gerando um .tac e um .asm por arquivo")
+    arg_parser.add_argument('inputs', nargs='+', metavar='entrada',
+                            help="arquivos ou diretórios (percorridos recursivamente)")
+    arg_parser.add_argument('-o', '--output-dir', metavar='DIR',
+                            help="diretório de saída (padrão: ao lado de cada arquivo de entrada)")
+    arg_parser.add_argument('-j', '--jobs', type=int, default=None,
+                            help="número de processos (padrão: número de CPUs)")
+    arg_parser.add_argument('--pattern', default='*.lpms,*.txt',
+                            help="padrões dos arquivos procurados nos diretórios (padrão: *.lpms,*.txt)")
+    arg_parser.add_argument('-O', dest='opt_level', type=int, choices=(0, 1), default=1,
+                            help="nível de otimização do TAC (0 desativa; padrão: 1)")
+    arg_parser.add_argument('--target', choices=sorted(TARGETS), default='x86',
+                            help="arquitetura do Assembly: x86 ou x64 (padrão: x86)")
+    arg_parser.add_argument('--parser', choices=PARSER_NAMES, default='rd',
+                            help="parser usado: rd ou ply (padrão: rd)")
+    arg_parser.add_argument('--cache-dir', metavar='DIR', help="usa o cache de compilação em DIR")
+    arg_parser.add_argument('--cache-size', type=int, default=256, metavar='MB',
+                            help="tamanho máximo do cache (padrão: 256 MB)")
+    args = arg_parser.parse_args()
+
+    try:
+        tasks = plan_outputs(collect_sources(args.inputs, args.pattern), args.output_dir)
+    except ValueError as e:
+        print(f"Erro: {e}")
+        sys.exit(1)
+    if not tasks:
+        print("Nenhum arquivo de entrada encontrado.")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    results = run_batch(tasks, args.jobs, args.cache_dir, args.cache_size * 1024 * 1024,
+                        args.opt_level > 0, args.target, args.parser)
+    elapsed = time.perf_counter() - start
+
+    failed = [(path, errors) for path, errors, cached in results if errors]
+    cached = sum(1 for path, errors, was_cached in results if was_cached)
+    for path, errors in failed:
+        for error in errors:
+            print(f"{path}: {error}")
+
+    print(f"\n{len(results)} arquivos compilados em {elapsed:.2f} s "
+          f"({len(results) / elapsed:.1f} arquivos/s), {len(failed)} com erros"
+          + (f", {cached} do cache" if args.cache_dir else ""))
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,495 @@
+import argparse
+import ctypes
+import gc
+import json
+import os
+import random
+import shutil
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+
+from asm_generator import ASMGenerator
+from batch import collect_sources
+from lexer import Scanner
+from optimizer import optimize
+from parser import Parser
+from peephole import count_instructions
+from rd_parser import RDParser
+from tac_generator import TACGenerator
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+PTRACE_TRACEME = 0
+PTRACE_SINGLESTEP = 9
+# Runs longer than this many instructions are abandoned
+RETIRED_LIMIT = 100_000_000
+
+# Compiler stages timed by measure_stages, in pipeline order
+STAGES = ('scanner', 'parser', 'tac', 'optimizer', 'asm')
+
+
+def time_process(code, runs, cwd):
+    """Run `python -c code` several times and return the wall times."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code], cwd=cwd, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def measure_cold_start(runs=5):
+    """Time a fresh interpreter that imports parser.py and builds the parser.
+
+    Each run starts in an empty directory so files written to the working
+    directory show up in the result.
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as cwd:
+        baseline = time_process('pass', runs, cwd)
+        results.append({'mode': 'interpreter', 'best_s': min(baseline),
+                        'median_s': statistics.median(baseline), 'stray_files': []})
+        for production in (False, True):
+            code = (f"import sys; sys.path.insert(0, {HERE!r}); "
+                    f"from parser import Parser; Parser(production={production}).build()")
+            times = time_process(code, runs, cwd)
+            results.append({
+                'mode': 'production' if production else 'debug',
+                'best_s': min(times),
+                'median_s': statistics.median(times),
+                'stray_files': sorted(os.listdir(cwd)),
+            })
+    return results
+
+
+def statements_program(count):
+    """A program whose single block holds `count` assignment statements."""
+    return "Program Scaling {\n    int x;\n" + "    x = x + 1;\n" * count + "}\n"
+
+
+def measure_statement_scaling(sizes):
+    """Parse blocks of growing length and report the cost per statement."""
+    parser = Parser(production=True)
+    results = []
+    for count in sizes:
+        source = statements_program(count)
+        start = time.perf_counter()
+        ast, errors = parser.parse(source)
+        elapsed = time.perf_counter() - start
+        if errors:
+            raise RuntimeError(f"erro ao analisar {count} comandos: {errors[0]}")
+        results.append({'statements': count, 'parse_s': elapsed,
+                        'us_per_statement': elapsed / count * 1e6})
+    return results
+
+
+class ProgramGenerator:
+    """Random but valid LPMS programs for benchmarking the compiler stages.
+
+    statements is the total number of statements, nested ones included;
+    depth bounds the nesting of if/while blocks; declarations is the number
+    of variables and constants declared; expression_depth bounds the
+    nesting of the fully parenthesized expressions. The same seed always
+    gives the same program.
+    """
+
+    def __init__(self, statements=5000, depth=3, declarations=50, expression_depth=3, seed=0):
+        self.statements = statements
+        self.depth = depth
+        # At least one variable of every type
+        self.declarations = max(declarations, 7)
+        self.expression_depth = expression_depth
+        self.random = random.Random(seed)
+        self.lines = []
+        self.remaining = 0
+        self.variables = {'int': [], 'float': [], 'bool': [], 'str': []}
+        self.constants = []
+
+    def generate(self):
+        self.lines = ["Program Synthetic {"]
+        self.declare()
+        self.remaining = self.statements
+        while self.remaining > 0:
+            self.statement(1, in_loop=False)
+        self.lines.append("}")
+        return '\n'.join(self.lines) + '\n'
+
+    def declare(self):
+        # Half integers, the rest spread over the other types and constants
+        kinds = ['int', 'int', 'int', 'int', 'float', 'bool', 'str', 'const']
+        for i in range(self.declarations):
+            kind = kinds[i % len(kinds)]
+            if kind == 'const':
+                name = f"c{i}"
+                self.constants.append(name)
+                self.lines.append(f"    const {name} = {self.random.randint(1, 100)};")
+            else:
+                name = f"{kind[0]}{i}"
+                self.variables[kind].append(name)
+                self.lines.append(f"    {kind} {name};")
+
+    def emit(self, level, text):
+        self.lines.append('    ' * level + text)
+
+    def statement(self, level, in_loop):
+        self.remaining -= 1
+        roll = self.random.random()
+        if level <= self.depth and self.remaining > 0 and roll < 0.25:
+            condition = self.condition(self.expression_depth)
+            keyword = self.random.choice(('if', 'if', 'while'))
+            self.emit(level, f"{keyword} ({condition}) {{")
+            self.block(level + 1, in_loop or keyword == 'while')
+            if keyword == 'if' and self.random.random() < 0.5:
+                self.emit(level, "} else {")
+                self.block(level + 1, in_loop)
+            self.emit(level, "}")
+        elif in_loop and roll < 0.28:
+            self.emit(level, "break;")
+        elif roll < 0.38:
+            values = [self.numeric(self.expression_depth) for _ in range(self.random.randint(1, 3))]
+            if self.random.random() < 0.5:
+                values.insert(0, f'"linha {self.statements - self.remaining}"')
+            self.emit(level, f"print({', '.join(values)});")
+        elif roll < 0.42:
+            self.emit(level, f"input({self.random.choice(self.variables['int'])});")
+        else:
+            self.assignment(level)
+
+    def block(self, level, in_loop):
+        for _ in range(self.random.randint(1, 5)):
+            if self.remaining <= 0:
+                break
+            self.statement(level, in_loop)
+
+    def assignment(self, level):
+        kind = self.random.choice(('int', 'int', 'int', 'float', 'bool', 'str'))
+        name = self.random.choice(self.variables[kind])
+        if kind == 'str':
+            value = f'"texto {self.random.randint(0, 999)}"'
+        elif kind == 'bool':
+            value = self.condition(self.expression_depth)
+        else:
+            value = self.numeric(self.expression_depth, floats=kind == 'float')
+        self.emit(level, f"{name} = {value};")
+
+    def numeric(self, depth, floats=False):
+        if depth <= 0 or self.random.random() < 0.3:
+            roll = self.random.random()
+            if roll < 0.3:
+                return str(self.random.randint(1, 1000))
+            if roll < 0.4 and floats:
+                return f"{self.random.randint(0, 99)}.{self.random.randint(0, 99)}"
+            if roll < 0.5 and self.constants:
+                return self.random.choice(self.constants)
+            pool = self.variables['float'] if floats and roll < 0.7 else self.variables['int']
+            return self.random.choice(pool)
+        op = self.random.choice('+-*/')
+        return f"({self.numeric(depth - 1, floats)} {op} {self.numeric(depth - 1, floats)})"
+
+    def condition(self, depth):
+        comparison = self.random.choice(('<', '<=', '>', '>=', '==', '!='))
+        text = f"({self.numeric(depth - 1)} {comparison} {self.numeric(depth - 1)})"
+        if self.random.random() < 0.15:
+            return f"!{text}"
+        return text
+
+
+def time_stage(function, runs):
+    """Wall times of runs calls of function, then the peak memory traced during one more call."""
+    times = []
+    for _ in range(runs):
+        gc.collect()
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        function()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return result, {'best_s': min(times), 'median_s': statistics.median(times), 'peak_bytes': peak}
+
+
+def measure_stages(source, runs=5):
+    """Time and memory-profile each compiler stage on source.
+
+    Each stage gets the output of the previous one, computed beforehand, so
+    only its own work is measured; RDParser.parse scans the source itself,
+    so the parser figure includes the scanner. Returns (program sizes, one
+    row per stage).
+    """
+    parser = RDParser()
+
+    def parse():
+        ast, errors = parser.parse(source)
+        if errors:
+            raise RuntimeError(f"programa sintético inválido: {errors[0]}")
+        return ast
+
+    def generate_tac():
+        generator = TACGenerator()
+        generator.generate(ast)
+        return generator.tac
+
+    stages = {}
+    tokens, stages['scanner'] = time_stage(lambda: Scanner(source).tokenize(), runs)
+    ast, stages['parser'] = time_stage(parse, runs)
+    tac, stages['tac'] = time_stage(generate_tac, runs)
+    optimized, stages['optimizer'] = time_stage(lambda: optimize(tac), runs)
+    asm_code, stages['asm'] = time_stage(lambda: ASMGenerator().generate_asm(optimized), runs)
+    sizes = {'bytes': len(source), 'lines': source.count('\n'), 'tokens': len(tokens),
+             'tac': len(tac), 'optimized_tac': len(optimized), 'asm_lines': asm_code.count('\n') + 1}
+    return sizes, [dict(stage=name, **stages[name]) for name in STAGES]
+
+
+def calibrate(runs=5):
+    """Best time of a fixed pure-Python workload, a yardstick for the speed of the machine."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        total = 0
+        for i in range(300_000):
+            total += i % 7
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def compare_with_baseline(stages, baseline, threshold, speed=1.0):
+    """(stage, metric, baseline value, new value) for every metric more than threshold above the baseline.
+
+    Baseline times are first multiplied by speed, the ratio of the current
+    calibration time to the baseline's, so a slower machine or a busier
+    moment is not taken for a regression.
+    """
+    previous = {row['stage']: row for row in baseline}
+    regressions = []
+    for row in stages:
+        old = previous.get(row['stage'])
+        if old is None:
+            continue
+        for metric, scale in (('best_s', speed), ('peak_bytes', 1.0)):
+            expected = old[metric] * scale
+            if expected and row[metric] > expected * (1 + threshold):
+                regressions.append((row['stage'], metric, expected, row[metric]))
+    return regressions
+
+
+def build_executable(asm_code, directory, name):
+    """Assemble and link a 32-bit program with nasm and ld; returns the executable path."""
+    asm_path = os.path.join(directory, name + '.asm')
+    object_path = os.path.join(directory, name + '.o')
+    executable = os.path.join(directory, name)
+    with open(asm_path, 'w') as file:
+        file.write(asm_code)
+    subprocess.run(['nasm', '-f', 'elf32', asm_path, '-o', object_path], check=True)
+    subprocess.run(['ld', '-m', 'elf_i386', object_path, '-o', executable], check=True)
+    return executable
+
+
+def retired_instructions(executable, stdin_path=None, limit=RETIRED_LIMIT):
+    """User-mode instructions retired by one run, counted by single-stepping it with ptrace.
+
+    Returns None when the run exceeds limit instructions.
+    """
+    libc = ctypes.CDLL(None, use_errno=True)
+    libc.ptrace.restype = ctypes.c_long
+    libc.ptrace.argtypes = [ctypes.c_long, ctypes.c_long, ctypes.c_void_p, ctypes.c_void_p]
+    pid = os.fork()
+    if pid == 0:
+        try:
+            libc.ptrace(PTRACE_TRACEME, 0, None, None)
+            os.dup2(os.open(stdin_path or os.devnull, os.O_RDONLY), 0)
+            os.dup2(os.open(os.devnull, os.O_WRONLY), 1)
+            os.execv(executable, [executable])
+        finally:
+            os._exit(127)
+    steps = 0
+    _, status = os.waitpid(pid, 0)    # stopped at exec
+    while os.WIFSTOPPED(status):
+        if steps >= limit:
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+            return None
+        # Forward real signals (a division fault, say) so the program can die of them
+        stop_signal = os.WSTOPSIG(status)
+        libc.ptrace(PTRACE_SINGLESTEP, pid, None,
+                    None if stop_signal == signal.SIGTRAP else stop_signal)
+        _, status = os.waitpid(pid, 0)
+        steps += 1
+    return steps
+
+
+def measure_peephole(inputs, stdin_path=None):
+    """Compile every program with and without the peephole pass and compare the assembly.
+
+    Counts the instructions in .text and, where nasm, ld and ptrace are
+    available, the instructions each program retires when run on
+    stdin_path.
+    """
+    parser = Parser(production=True)
+    run_programs = bool(shutil.which('nasm') and shutil.which('ld')
+                        and sys.platform.startswith('linux'))
+    rows = []
+    rules = Counter()
+    with tempfile.TemporaryDirectory() as workdir:
+        for path, name in collect_sources(inputs, '*.lpms,*.txt'):
+            with open(path, 'r', encoding='utf-8') as file:
+                ast, errors = parser.parse(file)
+            if errors:
+                continue
+            generator = TACGenerator()
+            generator.generate(ast)
+            tac = optimize(generator.tac)
+            row = {'file': path}
+            for stage, enabled in (('before', False), ('after', True)):
+                asm_generator = ASMGenerator(optimize_peephole=enabled)
+                asm_code = asm_generator.generate_asm(tac)
+                rules.update(asm_generator.peephole_stats)
+                row[f'{stage}_bytes'] = len(asm_code)
+                row[f'{stage}_instructions'] = count_instructions(asm_code.split('\n'))
+                if run_programs:
+                    executable = build_executable(asm_code, workdir, stage)
+                    row[f'{stage}_retired'] = retired_instructions(executable, stdin_path)
+            rows.append(row)
+    return {'programs': rows, 'rules': dict(rules), 'retired_measured': run_programs}
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmarks do compilador LPMS")
+    arg_parser.add_argument('--runs', type=int, default=5, help="repetições por medição")
+    arg_parser.add_argument('--json', metavar='ARQUIVO', help="grava os resultados em JSON")
+    arg_parser.add_argument('--cold-start', action='store_true',
+                            help="mede apenas a inicialização a frio")
+    arg_parser.add_argument('--scaling', action='store_true',
+                            help="mede apenas a escala do parser com o número de comandos")
+    arg_parser.add_argument('--sizes', default='1000,10000,100000',
+                            help="tamanhos dos blocos para --scaling (ex.: 1000,1000000)")
+    arg_parser.add_argument('--max-growth', type=float, default=2.0,
+                            help="razão máxima aceita entre o custo por comando do maior "
+                                 "e do menor bloco")
+    arg_parser.add_argument('--peephole', nargs='+', metavar='CAMINHO',
+                            help="compara o Assembly com e sem o otimizador peephole nos "
+                                 "programas dados (arquivos ou diretórios)")
+    arg_parser.add_argument('--stdin', metavar='ARQUIVO',
+                            help="entrada padrão dos programas executados por --peephole")
+    arg_parser.add_argument('--synthetic', action='store_true',
+                            help="mede apenas cada etapa do compilador em um programa sintético")
+    arg_parser.add_argument('--statements', type=int, default=5000,
+                            help="número de comandos do programa sintético (padrão: 5000)")
+    arg_parser.add_argument('--depth', type=int, default=3,
+                            help="aninhamento máximo de if/while (padrão: 3)")
+    arg_parser.add_argument('--declarations', type=int, default=50,
+                            help="número de variáveis e constantes declaradas (padrão: 50)")
+    arg_parser.add_argument('--expression-depth', type=int, default=3,
+                            help="aninhamento máximo das expressões (padrão: 3)")
+    arg_parser.add_argument('--seed', type=int, default=0, help="semente do gerador (padrão: 0)")
+    arg_parser.add_argument('--save-program', metavar='ARQUIVO',
+                            help="grava o programa sintético gerado")
+    arg_parser.add_argument('--baseline', metavar='ARQUIVO',
+                            help="JSON de uma execução anterior (--json); falha se alguma etapa "
+                                 "ficar mais lenta ou usar mais memória que o limite")
+    arg_parser.add_argument('--threshold', type=float, default=0.25,
+                            help="piora máxima aceita em relação à linha de base (padrão: 0.25, "
+                                 "isto é, 25%%)")
+    args = arg_parser.parse_args()
+    run_all = not (args.cold_start or args.scaling or args.peephole or args.synthetic)
+
+    results = {}
+    failed = False
+
+    if run_all or args.cold_start:
+        results['cold_start'] = measure_cold_start(args.runs)
+        print("Inicialização a frio de parser.py:")
+        for row in results['cold_start']:
+            print(f"  {row['mode']:<12} melhor {row['best_s'] * 1000:8.1f} ms"
+                  f"   mediana {row['median_s'] * 1000:8.1f} ms"
+                  f"   arquivos gravados: {', '.join(row['stray_files']) or '-'}")
+
+    if run_all or args.scaling:
+        sizes = [int(size) for size in args.sizes.split(',')]
+        results['statement_scaling'] = measure_statement_scaling(sizes)
+        print("Escala do parser com o número de comandos em um bloco:")
+        for row in results['statement_scaling']:
+            print(f"  {row['statements']:>9} comandos  {row['parse_s']:8.3f} s"
+                  f"   {row['us_per_statement']:6.1f} us/comando")
+        rows = results['statement_scaling']
+        growth = rows[-1]['us_per_statement'] / rows[0]['us_per_statement']
+        print(f"  crescimento do custo por comando: {growth:.2f}x")
+        if growth > args.max_growth:
+            print(f"  FALHA: crescimento acima de {args.max_growth:.2f}x (escala não linear)")
+            failed = True
+
+    if args.peephole:
+        results['peephole'] = measure_peephole(args.peephole, args.stdin)
+        rows = results['peephole']['programs']
+        print(f"Otimizador peephole em {len(rows)} programas:")
+        columns = [('instructions', "instruções no .text"), ('bytes', "tamanho do Assembly")]
+        if results['peephole']['retired_measured']:
+            columns.append(('retired', "instruções executadas"))
+        else:
+            print("  (nasm/ld indisponíveis: instruções executadas não medidas)")
+        for key, title in columns:
+            measured = [row for row in rows if row.get(f'before_{key}') is not None
+                        and row.get(f'after_{key}') is not None]
+            before = sum(row[f'before_{key}'] for row in measured)
+            after = sum(row[f'after_{key}'] for row in measured)
+            reduction = (1 - after / before) * 100 if before else 0.0
+            print(f"  {title:<24} {before:>12} -> {after:>12}   (-{reduction:.1f}%)")
+        for rule, removed in sorted(results['peephole']['rules'].items()):
+            print(f"  {rule:<32} {removed:>8} instruções removidas")
+
+    if run_all or args.synthetic:
+        config = {'statements': args.statements, 'depth': args.depth, 'declarations': args.declarations,
+                  'expression_depth': args.expression_depth, 'seed': args.seed}
+        source = ProgramGenerator(**config).generate()
+        if args.save_program:
+            with open(args.save_program, 'w', encoding='utf-8') as file:
+                file.write(source)
+        calibration = calibrate(args.runs)
+        sizes, stages = measure_stages(source, args.runs)
+        calibration = min(calibration, calibrate(args.runs))
+        results['synthetic'] = {'config': config, 'calibration_s': calibration,
+                                'sizes': sizes, 'stages': stages}
+        print(f"Etapas do compilador em um programa sintético de {sizes['lines']} linhas, "
+              f"{sizes['tokens']} tokens e {sizes['tac']} instruções TAC:")
+        for row in stages:
+            print(f"  {row['stage']:<10} melhor {row['best_s'] * 1000:9.2f} ms"
+                  f"   mediana {row['median_s'] * 1000:9.2f} ms"
+                  f"   pico de memória {row['peak_bytes'] / 1024:10.1f} KiB")
+
+        if args.baseline:
+            with open(args.baseline, 'r', encoding='utf-8') as file:
+                baseline = json.load(file).get('synthetic')
+            if baseline is None or baseline['config'] != config:
+                print("  FALHA: a linha de base não tem um programa sintético com a mesma configuração")
+                failed = True
+            else:
+                speed = calibration / baseline['calibration_s']
+                regressions = compare_with_baseline(stages, baseline['stages'], args.threshold, speed)
+                for stage, metric, old, new in regressions:
+                    print(f"  FALHA: {stage} {metric} {old:.6g} -> {new:.6g} "
+                          f"(+{(new / old - 1) * 100:.1f}%, limite {args.threshold * 100:.0f}%)")
+                if regressions:
+                    failed = True
+                else:
+                    print(f"  nenhuma etapa piorou mais de {args.threshold * 100:.0f}% em relação à linha de base")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=2)
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+from tac_ir import DEFINING_OPS, JUMP_OPS, Op
+
+
+class BasicBlock:
+    """A maximal run of TAC with one entry (its first quad) and one exit (its last)."""
+    __slots__ = ('index', 'quads', 'successors', 'predecessors')
+
+    def __init__(self, index, quads):
+        self.index = index
+        self.quads = quads
+        self.successors = []
+        self.predecessors = []
+
+    @property
+    def label(self):
+        first = self.quads[0]
+        return first.result if first.op is Op.LABEL else None
+
+    def __repr__(self):
+        return f"BasicBlock({self.index}, {len(self.quads)} quads)"
+
+
+def uses(quad):
+    """Names read by quad. Labels live in `result`, so only the arguments count."""
+    return [arg for arg in (quad.arg1, quad.arg2) if isinstance(arg, str)]
+
+
+def definition(quad):
+    """The name written by quad, or None."""
+    return quad.result if quad.op in DEFINING_OPS else None
+
+
+def build_cfg(code):
+    """Split code into basic blocks linked by their possible transfers of control.
+
+    A block starts at a label or right after a jump. blocks[0] is the
+    entry; falling off the last block ends the program.
+    """
+    blocks = []
+    current = []
+    for quad in code:
+        if quad.op is Op.LABEL and current:
+            blocks.append(BasicBlock(len(blocks), current))
+            current = []
+        current.append(quad)
+        if quad.op in JUMP_OPS:
+            blocks.append(BasicBlock(len(blocks), current))
+            current = []
+    if current:
+        blocks.append(BasicBlock(len(blocks), current))
+
+    by_label = {block.label: block for block in blocks if block.label is not None}
+    for block in blocks:
+        last = block.quads[-1]
+        following = blocks[block.index + 1] if block.index + 1 < len(blocks) else None
+        if last.op in JUMP_OPS:
+            if last.op is not Op.GOTO and following is not None:
+                block.successors.append(following)
+            target = by_label[last.result]
+            if target not in block.successors:
+                block.successors.append(target)
+        elif following is not None:
+            block.successors.append(following)
+        for successor in block.successors:
+            successor.predecessors.append(block)
+    return blocks
+
+
+def flatten(blocks):
+    return [quad for block in blocks for quad in block.quads]
+
+
+def reachable(blocks):
+    """Blocks reachable from the entry, in their original order."""
+    if not blocks:
+        return []
+    seen = {blocks[0].index}
+    stack = [blocks[0]]
+    while stack:
+        for successor in stack.pop().successors:
+            if successor.index not in seen:
+                seen.add(successor.index)
+                stack.append(successor)
+    return [block for block in blocks if block.index in seen]
+
+
+def solve_dataflow(blocks, gen, kill, backward=False):
+    """Solve a union ("may") gen/kill data-flow problem with a worklist.
+
+    blocks come from build_cfg; gen and kill hold one set per block.
+    Returns (ins, outs), the facts at the entry and exit of every block.
+    Backward problems flow from successors to predecessors.
+    """
+    ins = [set() for _ in blocks]
+    outs = [set() for _ in blocks]
+    # The worklist pops from the end: start from the exit for backward problems
+    worklist = list(blocks) if backward else list(reversed(blocks))
+    queued = {block.index for block in blocks}
+    while worklist:
+        block = worklist.pop()
+        queued.discard(block.index)
+        i = block.index
+        if backward:
+            joined = set().union(*(ins[s.index] for s in block.successors))
+            outs[i] = joined
+            result = gen[i] | (joined - kill[i])
+            changed = result != ins[i]
+            ins[i] = result
+            dependents = block.predecessors
+        else:
+            joined = set().union(*(outs[p.index] for p in block.predecessors))
+            ins[i] = joined
+            result = gen[i] | (joined - kill[i])
+            changed = result != outs[i]
+            outs[i] = result
+            dependents = block.successors
+        if changed:
+            for dependent in dependents:
+                if dependent.index not in queued:
+                    queued.add(dependent.index)
+                    worklist.append(dependent)
+    return ins, outs
+
+
+def liveness(blocks):
+    """Live variables: returns (live_in, live_out), one set of names per block."""
+    gen = []
+    kill = []
+    for block in blocks:
+        used = set()
+        defined = set()
+        for quad in block.quads:
+            used.update(name for name in uses(quad) if name not in defined)
+            name = definition(quad)
+            if name is not None:
+                defined.add(name)
+        gen.append(used)
+        kill.append(defined)
+    return solve_dataflow(blocks, gen, kill, backward=True)
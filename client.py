@@ -0,0 +1,103 @@
+import argparse
+import json
+import os
+import socket
+import sys
+
+# Kept free of compiler imports, so it starts in the time of a bare interpreter
+
+
+def request_all(socket_path, requests):
+    """Send requests to the server at socket_path; returns the responses keyed by id."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(socket_path)
+        for request in requests:
+            connection.sendall((json.dumps(request) + "\n").encode('utf-8'))
+        connection.shutdown(socket.SHUT_WR)
+        responses = {}
+        with connection.makefile('r', encoding='utf-8') as stream:
+            for line in stream:
+                response = json.loads(line)
+                responses[response.get('id')] = response
+    return responses
+
+
+def output_paths(path, output_dir, single):
+    """Where the TAC and assembly of path go, mirroring tac_generator.py and batch.py."""
+    if single and output_dir is None:
+        return 'intermediate.tac', 'output.asm'
+    stem = os.path.splitext(path)[0]
+    if output_dir:
+        stem = os.path.join(output_dir, os.path.basename(stem))
+    return stem + '.tac', stem + '.asm'
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(
+        description="Compila programas LPMS por meio de um servidor de compilação (server.py)")
+    arg_parser.add_argument('inputs', nargs='*', metavar='arquivo_entrada')
+    arg_parser.add_argument('--socket', metavar='CAMINHO', required=True,
+                            help="socket Unix do servidor")
+    arg_parser.add_argument('-o', '--output-dir', metavar='DIR',
+                            help="diretório de saída (padrão: intermediate.tac e output.asm para um "
+                                 "arquivo, ou ao lado de cada arquivo de entrada)")
+    arg_parser.add_argument('-O', dest='opt_level', type=int, choices=(0, 1), default=1,
+                            help="nível de otimização do TAC (0 desativa; padrão: 1)")
+    arg_parser.add_argument('--target', default='x86',
+                            help="arquitetura do Assembly: x86 ou x64 (padrão: x86)")
+    arg_parser.add_argument('--ast', action='store_true',
+                            help="grava também a AST em JSON lines (.ast.jsonl)")
+    arg_parser.add_argument('--ping', action='store_true', help="verifica se o servidor responde")
+    arg_parser.add_argument('--shutdown', action='store_true', help="encerra o servidor")
+    args = arg_parser.parse_args()
+
+    try:
+        if args.ping or args.shutdown:
+            command = 'shutdown' if args.shutdown else 'ping'
+            response = request_all(args.socket, [{'id': 0, 'command': command}]).get(0, {})
+            print("Servidor encerrado" if args.shutdown else "Servidor respondendo")
+            sys.exit(0 if response.get('ok') else 1)
+        if not args.inputs:
+            arg_parser.error("informe ao menos um arquivo de entrada")
+
+        outputs = ['tac', 'asm'] + (['ast'] if args.ast else [])
+        requests = []
+        for index, path in enumerate(args.inputs):
+            try:
+                with open(path, 'r', encoding='utf-8') as file:
+                    source = file.read()
+            except FileNotFoundError:
+                print(f"Erro: Arquivo '{path}' não encontrado")
+                sys.exit(1)
+            requests.append({'id': index, 'source': source, 'optimize': args.opt_level > 0,
+                             'target': args.target, 'outputs': outputs})
+        responses = request_all(args.socket, requests)
+    except OSError as e:
+        print(f"Erro: não foi possível falar com o servidor em '{args.socket}': {e}")
+        sys.exit(1)
+
+    failed = False
+    for index, path in enumerate(args.inputs):
+        response = responses.get(index)
+        if response is None or not response['ok']:
+            failed = True
+            errors = response['errors'] if response else ["sem resposta do servidor"]
+            for error in errors:
+                print(f"{path}: {error}")
+            continue
+        tac_path, asm_path = output_paths(path, args.output_dir, len(args.inputs) == 1)
+        os.makedirs(os.path.dirname(tac_path) or '.', exist_ok=True)
+        with open(tac_path, 'w') as file:
+            file.writelines(f"{line}\n" for line in response['tac'])
+        with open(asm_path, 'w') as file:
+            file.write(response['asm'])
+        if args.ast:
+            with open(os.path.splitext(asm_path)[0] + '.ast.jsonl', 'w') as file:
+                file.write(response['ast'])
+        print(f"{path}: {tac_path}, {asm_path}" + (" (cache)" if response.get('cached') else ""))
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+import hashlib
+import io
+import os
+import pickle
+import tempfile
+
+from parser import read_ast_jsonl, write_ast_jsonl
+
+# Bump when the cache entry layout changes
+CACHE_FORMAT = 1
+
+# Every file whose content can change the compiler output
+COMPILER_FILES = ('lexer.py', 'parser.py', 'parsetab.py', 'rd_parser.py', 'tac_ir.py',
+                  'tac_generator.py', 'cfg.py', 'optimizer.py', 'regalloc.py', 'peephole.py',
+                  'asm_generator.py', 'asm64_generator.py')
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# Eviction frees space down to this fraction of max_bytes, so a full cache
+# is not scanned again on every put
+EVICTION_TARGET = 0.9
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def compiler_fingerprint():
+    """Hash of the compiler sources, so entries die with the compiler that made them."""
+    digest = hashlib.sha256(f"format {CACHE_FORMAT}".encode())
+    for name in COMPILER_FILES:
+        with open(os.path.join(HERE, name), 'rb') as file:
+            digest.update(file.read())
+    return digest.hexdigest()
+
+
+class CompilationCache:
+    """Content-addressed on-disk cache of AST, TAC and assembly.
+
+    Entries are keyed by the source hash, the compiler fingerprint and the
+    compile options. The directory is kept under max_bytes by evicting the
+    least recently used entries; a hit refreshes the entry's mtime. The
+    size of the directory is scanned once, then kept up to date by put();
+    writes from other processes sharing the directory are only counted at
+    the next scan, which happens when the running total exceeds max_bytes.
+    """
+
+    SUFFIX = '.entry'
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.fingerprint = compiler_fingerprint()
+        self.hits = 0
+        self.misses = 0
+        # Bytes used by the entries, counted on the first put()
+        self.total_bytes = None
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, source, options=None):
+        """Key for a source string or a seekable text/binary file object."""
+        digest = hashlib.sha256(self.fingerprint.encode())
+        digest.update(repr(sorted((options or {}).items())).encode())
+        if isinstance(source, str):
+            digest.update(source.encode('utf-8'))
+        else:
+            start = source.tell()
+            while True:
+                chunk = source.read(1 << 16)
+                if not chunk:
+                    break
+                digest.update(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+            source.seek(start)
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + self.SUFFIX)
+
+    def get(self, key):
+        """Return (ast_loader, tac, asm, errors) for key, or None on a miss."""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as file:
+                entry = pickle.load(file)
+            os.utime(path)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        ast_jsonl = entry['ast']
+        ast_loader = (lambda: read_ast_jsonl(io.StringIO(ast_jsonl))) if ast_jsonl else (lambda: None)
+        return ast_loader, entry['tac'], entry['asm'], entry['errors']
+
+    def put(self, key, ast, tac, asm_code, errors):
+        if self.total_bytes is None:
+            self.total_bytes = self._scan()[1]
+        buffer = io.StringIO()
+        if ast is not None:
+            write_ast_jsonl(ast, buffer)
+        data = pickle.dumps({'ast': buffer.getvalue(), 'tac': tac, 'asm': asm_code,
+                             'errors': errors}, protocol=pickle.HIGHEST_PROTOCOL)
+        # Write to a temporary file first so concurrent readers never see
+        # a partial entry
+        path = self._path(key)
+        try:
+            replaced = os.path.getsize(path)
+        except OSError:
+            replaced = 0
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                file.write(data)
+            os.replace(temp_path, path)
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        self.total_bytes += len(data) - replaced
+        if self.total_bytes > self.max_bytes:
+            self.evict()
+
+    def _scan(self):
+        """Return ([(mtime, size, path)] of the entries, their total size)."""
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as scan:
+            for entry in scan:
+                if not entry.name.endswith(self.SUFFIX):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    # Removed by another process meanwhile
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        return entries, total
+
+    def evict(self):
+        """Once the cache exceeds max_bytes, remove least recently used entries down to EVICTION_TARGET of it."""
+        entries, total = self._scan()
+        self.total_bytes = total
+        if total <= self.max_bytes:
+            return
+        target = self.max_bytes * EVICTION_TARGET
+        entries.sort()
+        for mtime, size, path in entries:
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            if total <= target:
+                break
+        self.total_bytes = total
+
+    def clear(self):
+        with os.scandir(self.directory) as scan:
+            for entry in scan:
+                if entry.name.endswith(self.SUFFIX):
+                    os.remove(entry.path)
+        self.total_bytes = 0
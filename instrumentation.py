@@ -0,0 +1,174 @@
+import contextlib
+import cProfile
+import io
+import pstats
+import time
+import tracemalloc
+
+from lexer import Scanner
+from optimizer import optimize as optimize_tac
+from peephole import count_instructions
+from rd_parser import RDParser
+from tac_generator import TARGETS, CompileResult, TACGenerator
+
+# What the count of each phase measures
+COUNT_UNITS = {
+    'scan': 'tokens',
+    'parse': 'nós da AST',
+    'tac': 'instruções TAC',
+    'optimize': 'instruções TAC',
+    'asm': 'instruções Assembly',
+}
+
+
+class PhaseStats:
+    """Measurements of one compiler phase.
+
+    seconds is the wall time, peak_bytes the highest memory traced by
+    tracemalloc above what was allocated when the phase started (None when
+    memory is not traced), count the size of what the phase produced, and
+    profile the cProfile.Profile of the phase when profiling.
+    """
+    __slots__ = ('name', 'seconds', 'peak_bytes', 'count', 'profile')
+
+    def __init__(self, name):
+        self.name = name
+        self.seconds = 0.0
+        self.peak_bytes = None
+        self.count = None
+        self.profile = None
+
+    def as_dict(self):
+        return {'phase': self.name, 'seconds': self.seconds, 'peak_bytes': self.peak_bytes,
+                'count': self.count}
+
+
+class CompileStats:
+    """Per-phase measurements of one compilation, filled by instrumented_compile().
+
+    Tracing memory slows the phases down, so the times are best compared
+    between runs made with the same options.
+    """
+
+    def __init__(self, trace_memory=True, profile=False):
+        self.trace_memory = trace_memory
+        self.profile = profile
+        self.phases = []
+
+    def __getitem__(self, name):
+        for phase in self.phases:
+            if phase.name == name:
+                return phase
+        raise KeyError(name)
+
+    @property
+    def total_seconds(self):
+        return sum(phase.seconds for phase in self.phases)
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """Measure the body of a with statement as the phase called name."""
+        stats = PhaseStats(name)
+        started_tracing = False
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            # reset_peak() is new in Python 3.9. Before it, the peak only
+            # covers this phase when tracing started here; otherwise the
+            # memory still held when the phase ends is reported
+            track_peak = started_tracing or hasattr(tracemalloc, 'reset_peak')
+            if not started_tracing and track_peak:
+                tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+        profiler = cProfile.Profile() if self.profile else None
+        start = time.perf_counter()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield stats
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                stats.profile = profiler
+            stats.seconds = time.perf_counter() - start
+            if self.trace_memory:
+                current, peak = tracemalloc.get_traced_memory()
+                stats.peak_bytes = (peak if track_peak else current) - baseline
+                if started_tracing:
+                    tracemalloc.stop()
+            self.phases.append(stats)
+
+    def as_dict(self):
+        return {'total_seconds': self.total_seconds, 'phases': [phase.as_dict() for phase in self.phases]}
+
+    def report(self):
+        """Table of the phases, for the terminal."""
+        lines = [f"{'Etapa':<10} {'Tempo (ms)':>11} {'Pico de memória (KiB)':>22}   Quantidade"]
+        for phase in self.phases:
+            memory = f"{phase.peak_bytes / 1024:.1f}" if phase.peak_bytes is not None else '-'
+            count = f"{phase.count} {COUNT_UNITS[phase.name]}" if phase.count is not None else '-'
+            lines.append(f"{phase.name:<10} {phase.seconds * 1000:>11.2f} {memory:>22}   {count}")
+        lines.append(f"{'total':<10} {self.total_seconds * 1000:>11.2f}")
+        return '\n'.join(lines)
+
+    def profile_report(self, limit=15, sort='cumulative'):
+        """The functions that took the most time in each profiled phase."""
+        sections = []
+        for phase in self.phases:
+            if phase.profile is None:
+                continue
+            buffer = io.StringIO()
+            pstats.Stats(phase.profile, stream=buffer).sort_stats(sort).print_stats(limit)
+            sections.append(f"=== {phase.name} ===\n{buffer.getvalue().strip()}")
+        return '\n\n'.join(sections)
+
+
+def count_nodes(ast):
+    count = 0
+    stack = [ast]
+    while stack:
+        node = stack.pop()
+        count += 1
+        stack.extend(child for child in node.children if child is not None)
+    return count
+
+
+def instrumented_compile(source, parser=None, optimize=True, target='x86', pass_stats=None,
+                         trace_memory=True, profile=False):
+    """compile_source() run one phase at a time, measuring each; returns (CompileResult, CompileStats).
+
+    The phases are scan, parse, tac, optimize (only with optimize) and asm;
+    those after a syntax error are not run. No compilation cache is used,
+    so every phase does its work.
+    """
+    stats = CompileStats(trace_memory, profile)
+    if parser is None:
+        parser = RDParser()
+    parser.build()
+
+    with stats.phase('scan') as phase:
+        scanner = Scanner(source)
+        phase.count = len(scanner.tokenize())
+    with stats.phase('parse') as phase:
+        ast, errors = parser.parse_scanner(scanner)
+        errors = list(errors)
+        if ast is not None:
+            phase.count = count_nodes(ast)
+    if errors:
+        return CompileResult(ast, [], None, errors), stats
+
+    with stats.phase('tac') as phase:
+        generator = TACGenerator()
+        generator.generate(ast)
+        tac = generator.tac
+        phase.count = len(tac)
+    if optimize:
+        with stats.phase('optimize') as phase:
+            tac = optimize_tac(tac, pass_stats)
+            phase.count = len(tac)
+    with stats.phase('asm') as phase:
+        asm_code = TARGETS[target](allocate_registers=optimize,
+                                   optimize_peephole=optimize).generate_asm(tac)
+        phase.count = count_instructions(asm_code.split('\n'))
+    return CompileResult(ast, tac, asm_code, errors), stats
@@ -1,97 +1,190 @@
+import codecs
 import re
 import sys
 
+CHUNK_SIZE = 1 << 16
+# Characters past a match that must be in the buffer before the match is final
+_LOOKAHEAD = 2
+
+class Token:
+    """A lexical token, shaped the way PLY's parser reads it."""
+    __slots__ = ('type', 'value', 'lexpos', 'lineno', 'column', 'lexer')
+
+    def __init__(self, type, value, lexpos, lineno, column):
+        self.type = type
+        self.value = value
+        self.lexpos = lexpos
+        self.lineno = lineno
+        self.column = column
+
+    def __repr__(self):
+        return f"Token({self.type}, {self.value!r}, {self.lineno}:{self.column})"
+
 class Scanner:
-    def __init__(self, source_code):
+    # Define token patterns
+    token_specs = [
+        ('COMMENT', r'//.*'),                                     # Comments
+        ('CONST', r'\bconst\b'),                                 # Const keyword
+        ('PROGRAM', r'\bProgram\b'),                             # Program keyword
+        ('TYPE', r'\b(int|float|str|bool)\b'),                   # Types
+        ('IF', r'\b(if)\b'),                                     # If keyword
+        ('ELSE', r'\b(else)\b'),                                 # Else keyword
+        ('WHILE', r'\b(while)\b'),                               # While keyword
+        ('BREAK', r'\b(break)\b'),                               # Break keyword
+        ('PRINT', r'\b(print)\b'),                               # Print keyword
+        ('INPUT', r'\b(input)\b'),                               # Input keyword
+        ('BOOL_VAL', r'\b(true|false|True|False)\b'),           # Boolean values
+        ('NUMBER', r'\d*\.?\d+'),                                # Integer or float numbers
+        ('STRING', r'"[^"]*"'),                                  # String literals
+        ('ID', r'[a-zA-Z][a-zA-Z0-9_]*'),                       # Identifiers
+        ('OP_COMP', r'==|!=|<=|>=|<|>'),                        # Comparison operators
+        ('OP_ARIT', r'\+|-|\*|/'),                              # Arithmetic operators
+        ('OP_LOG', r'!'),                                        # Logical operator (NOT)
+        ('ASSIGN', r'='),                                        # Assignment operator
+        ('LPAREN', r'\('),                                       # Left parenthesis
+        ('RPAREN', r'\)'),                                       # Right parenthesis
+        ('LBRACE', r'\{'),                                       # Left brace
+        ('RBRACE', r'\}'),                                       # Right brace
+        ('COMMA', r','),                                         # Comma
+        ('SEMICOLON', r';'),                                     # Semicolon
+        ('WHITESPACE', r'[ \t\n]+'),                            # Whitespace
+    ]
+    
+    # Create a single regex pattern, compiled once and shared by all scanners
+    regex_pattern = '|'.join(f'(?P<{name}>{pattern})' for name, pattern in token_specs)
+    regex = re.compile(regex_pattern)
+
+    def __init__(self, source_code='', chunk_size=CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self.reset(source_code)
+
+    def reset(self, source_code=''):
+        """Point the scanner at a new source, dropping all state from the last one."""
+        # source_code is either a string or a file object read in chunks
         self.source_code = source_code
         self.tokens = []
         self.current_pos = 0
-        
-        # Define token patterns
-        self.token_specs = [
-            ('COMMENT', r'//.*'),                                     # Comments
-            ('CONST', r'\bconst\b'),                                 # Const keyword
-            ('PROGRAM', r'\bProgram\b'),                             # Program keyword
-            ('TYPE', r'\b(int|float|str|bool)\b'),                   # Types
-            ('IF', r'\b(if)\b'),                                     # If keyword
-            ('ELSE', r'\b(else)\b'),                                 # Else keyword
-            ('WHILE', r'\b(while)\b'),                               # While keyword
-            ('BREAK', r'\b(break)\b'),                               # Break keyword
-            ('PRINT', r'\b(print)\b'),                               # Print keyword
-            ('INPUT', r'\b(input)\b'),                               # Input keyword
-            ('BOOL_VAL', r'\b(true|false|True|False)\b'),           # Boolean values
-            ('NUMBER', r'\d*\.?\d+'),                                # Integer or float numbers
-            ('STRING', r'"[^"]*"'),                                  # String literals
-            ('ID', r'[a-zA-Z][a-zA-Z0-9_]*'),                       # Identifiers
-            ('OP_COMP', r'==|!=|<=|>=|<|>'),                        # Comparison operators
-            ('OP_ARIT', r'\+|-|\*|/'),                              # Arithmetic operators
-            ('OP_LOG', r'!'),                                        # Logical operator (NOT)
-            ('ASSIGN', r'='),                                        # Assignment operator
-            ('LPAREN', r'\('),                                       # Left parenthesis
-            ('RPAREN', r'\)'),                                       # Right parenthesis
-            ('LBRACE', r'\{'),                                       # Left brace
-            ('RBRACE', r'\}'),                                       # Right brace
-            ('COMMA', r','),                                         # Comma
-            ('SEMICOLON', r';'),                                     # Semicolon
-            ('WHITESPACE', r'[ \t\n]+'),                            # Whitespace
-        ]
-        
-        # Create a single regex pattern
-        self.regex_pattern = '|'.join(f'(?P<{name}>{pattern})' for name, pattern in self.token_specs)
-        self.regex = re.compile(self.regex_pattern)
-    
+        self.token_stream = None
+        self.tokenized = False
+
     def tokenize(self):
-        for match in self.regex.finditer(self.source_code):
-            token_type = match.lastgroup
-            token_value = match.group()
-            position = match.start()
-            
-            if token_type in ['WHITESPACE', 'COMMENT']:
-                continue
-                
-            # special cases
-            if token_type == 'NUMBER':
-                if '.' in token_value:
-                    token_value = float(token_value)
-                else:
-                    token_value = int(token_value)
-            elif token_type == 'STRING':
-                token_value = token_value[1:-1]  # Remove quotes
-            elif token_type == 'BOOL_VAL':
-                token_value = token_value.lower() == 'true'
-            
-            self.tokens.append((token_type, token_value, position))
-        
+        """Scan the current source once and return the list of its tokens."""
+        if not self.tokenized:
+            self.tokens = list(self.iter_tokens())
+            self.tokenized = True
         return self.tokens
+
+    def iter_tokens(self):
+        """Yield tokens lazily. File sources are read in chunks of chunk_size."""
+        source = self.source_code
+        if isinstance(source, str):
+            return self._scan((source,))
+        return self._scan(self._read_chunks(source))
+
+    def _read_chunks(self, stream):
+        # Binary streams (including mmap objects) are decoded incrementally so
+        # a multi-byte character split across two reads is still decoded.
+        decoder = None
+        while True:
+            chunk = stream.read(self.chunk_size)
+            if not chunk:
+                break
+            if isinstance(chunk, bytes):
+                if decoder is None:
+                    decoder = codecs.getincrementaldecoder('utf-8')()
+                chunk = decoder.decode(chunk)
+            yield chunk
+        if decoder is not None:
+            tail = decoder.decode(b'', final=True)
+            if tail:
+                yield tail
+
+    def _scan(self, chunks):
+        regex = self.regex
+        chunks = iter(chunks)
+        buffer = ''
+        base = 0        # absolute offset of buffer[0]
+        pos = 0         # first index of buffer not consumed yet
+        counted = 0     # newlines before this index are already counted
+        # Line tracking is incremental: only the text between two consecutive
+        # tokens is scanned for newlines, so the whole pass stays linear.
+        lineno = 1
+        line_start = 0
+        eof = False
+        while not eof:
+            chunk = next(chunks, None)
+            if chunk is None:
+                eof = True
+            else:
+                # Keep one consumed character so \b still sees its left context.
+                keep = max(pos - 1, 0)
+                newlines = buffer.count('\n', counted, keep)
+                if newlines:
+                    lineno += newlines
+                    line_start = base + buffer.rfind('\n', counted, keep) + 1
+                buffer = buffer[keep:] + chunk
+                base += keep
+                pos -= keep
+                counted = 0
+
+            end = len(buffer)
+            while True:
+                match = regex.search(buffer, pos)
+                if match is None:
+                    break
+                start, stop = match.span()
+                # Near the end of a chunk a match may still grow (an ID or a
+                # number cut in half, '<' before '='), and a skipped '"' may
+                # open a string that closes in the next chunk: wait for more.
+                if not eof and (stop + _LOOKAHEAD > end or
+                                (start > pos and buffer.find('"', pos, start) != -1)):
+                    break
+                pos = stop
+
+                token_type = match.lastgroup
+                if token_type == 'WHITESPACE' or token_type == 'COMMENT':
+                    continue
+
+                newlines = buffer.count('\n', counted, start)
+                if newlines:
+                    lineno += newlines
+                    line_start = base + buffer.rfind('\n', counted, start) + 1
+                counted = start
+
+                token_value = match.group()
+                # special cases
+                if token_type == 'NUMBER':
+                    if '.' in token_value:
+                        token_value = float(token_value)
+                    else:
+                        token_value = int(token_value)
+                elif token_type == 'STRING':
+                    token_value = token_value[1:-1]  # Remove quotes
+                elif token_type == 'BOOL_VAL':
+                    token_value = token_value.lower() == 'true'
+
+                position = base + start
+                yield Token(token_type, token_value, position, lineno, position - line_start + 1)
     
     def input(self, text):
-        self.source_code = text
-        self.tokens = self.tokenize()
-        return self.tokens
+        self.reset(text)
+        return self.tokenize()
  
+    def rewind(self):
+        """Make token() start again from the first token; a tokenized source is not scanned again."""
+        self.token_stream = None
+
     def token(self):
         """Return the next token."""
-        if not hasattr(self, 'token_index'):
-            self.token_index = 0
-            self.current_tokens = self.tokenize()
-        
-        if self.token_index >= len(self.current_tokens):
-            return None
-            
-        token_info = self.current_tokens[self.token_index]
-        token = type('Token', (), {
-            'type': token_info[0],
-            'value': token_info[1],
-            'lexpos': token_info[2],
-            'lineno': self.source_code.count('\n', 0, token_info[2]) + 1
-        })
-    
-        self.token_index += 1
-        return token
+        if self.token_stream is None:
+            # Walk the token list if input() already built it, otherwise scan
+            # lazily without keeping the tokens around.
+            self.token_stream = iter(self.tokens) if self.tokenized else self.iter_tokens()
+        return next(self.token_stream, None)
 
 def write_tokens_to_terminal(tokens):
-    for token_type, token_value, position in tokens:
-        print(f"Token: {token_type}, Value: {repr(token_value)}")
+    for token in tokens:
+        print(f"Token: {token.type}, Value: {repr(token.value)}")
 
 def main():
     if len(sys.argv) < 2:
@@ -102,16 +195,10 @@ def main():
     input_file_name = sys.argv[1]
 
     try:
-        # Read from input file
+        # Stream tokens straight from the input file
         with open(input_file_name, "r", encoding="utf-8") as input_file:
-            source_code = input_file.read()
-
-        # Create scanner and get tokens
-        scanner = Scanner(source_code)
-        tokens = scanner.tokenize()
-
-        # Output tokens to terminal
-        write_tokens_to_terminal(tokens)
+            scanner = Scanner(input_file)
+            write_tokens_to_terminal(scanner.iter_tokens())
 
         print("\nAnálise léxica concluída.")
 
@@ -0,0 +1,204 @@
+import logging
+from collections import Counter
+
+from cfg import build_cfg, definition, flatten, liveness, reachable, uses
+from tac_ir import (ARITHMETIC_OPS, BRANCH_COMPARISONS, BRANCH_OPS, COMPARISON_OPS, DEFINING_OPS, JUMP_OPS,
+                    NEGATED_COMPARISONS, Const, Op, Quad, coerce, evaluate, infer_types, truth)
+
+logger = logging.getLogger(__name__)
+
+# Opcodes whose value can be computed once every argument is a constant
+FOLDABLE_OPS = ARITHMETIC_OPS | COMPARISON_OPS | {Op.NOT}
+
+
+def global_constants(code, types):
+    """Names defined exactly once, by a constant, before the first label or jump.
+
+    Jumps only lead to labels, all of them after that definition, so unless
+    an earlier instruction reads the name, its value holds everywhere it is
+    read in the program.
+    """
+    definitions = Counter(quad.result for quad in code if quad.op in DEFINING_OPS)
+    constants = {}
+    read = set()
+    for quad in code:
+        if quad.op is Op.LABEL or quad.op in JUMP_OPS:
+            break
+        if (quad.op is Op.ASSIGN and isinstance(quad.arg1, Const)
+                and definitions[quad.result] == 1 and quad.result not in read):
+            constants[quad.result] = Const(coerce(quad.arg1.value, types.get(quad.result)))
+        read.update(uses(quad))
+    return constants
+
+
+def fold_constants(code):
+    """Propagate known constants into their uses and fold constant expressions.
+
+    Global constants are substituted everywhere; other constant assignments
+    only until the next label, where control may arrive from elsewhere.
+    Conditional jumps on a constant become a goto or are dropped. Division
+    by zero and ill-typed operations are left for run time.
+    """
+    types = infer_types(code)
+    constants = global_constants(code, types)
+    known = dict(constants)
+    optimized = []
+
+    def value_of(arg):
+        if isinstance(arg, str):
+            return known.get(arg, arg)
+        return arg
+
+    for quad in code:
+        op = quad.op
+        if op is Op.LABEL:
+            known = dict(constants)
+            optimized.append(quad)
+            continue
+        arg1 = value_of(quad.arg1)
+        arg2 = value_of(quad.arg2)
+
+        if op in FOLDABLE_OPS and isinstance(arg1, Const) and (op is Op.NOT or isinstance(arg2, Const)):
+            try:
+                value = evaluate(op, arg1.value, arg2.value if arg2 is not None else None)
+            except (ArithmeticError, TypeError):
+                quad = Quad(op, quad.result, arg1, arg2, quad.vtype)
+            else:
+                quad = Quad(Op.ASSIGN, quad.result, Const(value), vtype=quad.vtype)
+        elif op is Op.IF_NOT and isinstance(arg1, Const):
+            if truth(arg1.value):
+                continue
+            quad = Quad(Op.GOTO, quad.result)
+        elif op in BRANCH_COMPARISONS and isinstance(arg1, Const) and isinstance(arg2, Const):
+            try:
+                taken = evaluate(BRANCH_COMPARISONS[op], arg1.value, arg2.value)
+            except TypeError:
+                quad = Quad(op, quad.result, arg1, arg2)
+            else:
+                if not taken:
+                    continue
+                quad = Quad(Op.GOTO, quad.result)
+        elif arg1 is not quad.arg1 or arg2 is not quad.arg2:
+            quad = Quad(op, quad.result, arg1, arg2, quad.vtype)
+        optimized.append(quad)
+
+        if quad.op in DEFINING_OPS:
+            if quad.op is Op.ASSIGN and isinstance(quad.arg1, Const):
+                known[quad.result] = Const(coerce(quad.arg1.value, types.get(quad.result)))
+            else:
+                known.pop(quad.result, None)
+    return optimized
+
+
+def labels_after(code, i):
+    """Labels directly after position i; they all name the same instruction."""
+    names = set()
+    i += 1
+    while i < len(code) and code[i].op is Op.LABEL:
+        names.add(code[i].result)
+        i += 1
+    return names
+
+
+def negate_branch(quad, label):
+    """A conditional jump to label taken exactly when quad is not."""
+    if quad.op is Op.IF_NOT:
+        return Quad(Op.IF_NE, label, quad.arg1, Const(0))
+    negated = NEGATED_COMPARISONS[BRANCH_COMPARISONS[quad.op]]
+    return Quad(BRANCH_OPS[negated], label, quad.arg1, quad.arg2)
+
+
+def remove_unreachable_code(code):
+    """Drop blocks no path from the entry reaches, then the jumps and labels left useless.
+
+    A jump to the label that immediately follows it is removed, a
+    conditional jump over a goto becomes one negated jump, and every label
+    no jump refers to goes too, which merges the blocks around it.
+    """
+    code = flatten(reachable(build_cfg(code)))
+    while True:
+        cleaned = []
+        skip = False
+        for i, quad in enumerate(code):
+            if skip:
+                skip = False
+                continue
+            if quad.op in JUMP_OPS:
+                if quad.result in labels_after(code, i):
+                    continue
+                if (quad.op is not Op.GOTO and i + 1 < len(code) and code[i + 1].op is Op.GOTO
+                        and quad.result in labels_after(code, i + 1)):
+                    cleaned.append(negate_branch(quad, code[i + 1].result))
+                    skip = True
+                    continue
+            cleaned.append(quad)
+        targets = {quad.result for quad in cleaned if quad.op in JUMP_OPS}
+        cleaned = [quad for quad in cleaned if quad.op is not Op.LABEL or quad.result in targets]
+        if len(cleaned) == len(code):
+            return cleaned
+        code = cleaned
+
+
+def has_side_effects(quad):
+    if quad.op is Op.INPUT:
+        return True
+    if quad.op is Op.DIV:
+        return not (isinstance(quad.arg2, Const) and quad.arg2.value)
+    return False
+
+
+def eliminate_dead_code(code):
+    """Remove assignments whose value is never read afterwards.
+
+    Runs liveness to a fixed point, since removing a use can make the
+    definitions feeding it dead too. Nothing is live when the program
+    ends. Input is kept even when its value is unused, as it consumes a
+    line of input, and so is a division that may fault.
+    """
+    while True:
+        blocks = build_cfg(code)
+        live_in, live_out = liveness(blocks)
+        removed = 0
+        for block in blocks:
+            live = set(live_out[block.index])
+            kept = []
+            for quad in reversed(block.quads):
+                name = definition(quad)
+                if name is not None and name not in live and not has_side_effects(quad):
+                    removed += 1
+                    continue
+                if name is not None:
+                    live.discard(name)
+                live.update(uses(quad))
+                kept.append(quad)
+            kept.reverse()
+            block.quads = kept
+        code = flatten(blocks)
+        if not removed:
+            return code
+
+
+PASSES = (fold_constants, remove_unreachable_code, eliminate_dead_code)
+# Later passes expose work for earlier ones (merged blocks reveal constants,
+# folded branches leave unreachable code), so the sequence repeats while
+# the code keeps shrinking, up to this many rounds
+MAX_ROUNDS = 4
+
+
+def optimize(code, stats=None):
+    """Run the optimization passes over a list of Quads and return the new list.
+
+    When stats is a list, (pass name, instructions before, instructions
+    after) is appended to it for every pass run.
+    """
+    for _ in range(MAX_ROUNDS):
+        start = len(code)
+        for optimization in PASSES:
+            before = len(code)
+            code = optimization(code)
+            logger.debug("%s: %d -> %d instructions", optimization.__name__, before, len(code))
+            if stats is not None:
+                stats.append((optimization.__name__, before, len(code)))
+        if len(code) == start:
+            break
+    return code
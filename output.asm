@@ -1,53 +1,75 @@
 section .data
-    x: dd 0
-    y: dd 0
-    t0: dd 0
-    str_0: db 'x', 10
-    len_str_0: equ $-str_0
-    str_1: db 'y', 10
-    len_str_1: equ $-str_1
+    str_0: db 0
+    newline: db 10
+
+section .bss
+    print_buf: resb 32
 
 section .text
     global _start
 
 _start:
-    ; x = 3
-    mov dword [x], 3
-    ; y = 5
-    mov dword [y], 5
-    ; t0 = x > y
-    mov eax, [x]
-    cmp eax, 0
-    setg al
-    movzx eax, al
-    mov [t0], eax
-    ; if not t0 goto L0
-    jmp L0
     ; param 
     ; call print 
-    ; param x
-    ; call print x
+    mov ecx, str_0
+    call print_str
+    ; param 5
+    ; call print 5
+    mov eax, 5
+    call print_int
+
+    mov eax, 1
+    mov ebx, 0
+    int 80h
+
+print_str:                  ; prints the NUL-terminated string at ecx and a newline
+    pushad
+    mov edx, ecx
+.length:
+    cmp byte [edx], 0
+    je .write
+    inc edx
+    jmp .length
+.write:
+    sub edx, ecx
     mov eax, 4
     mov ebx, 1
-    mov ecx, str_1
-    mov edx, len_str_1
     int 80h
-    ; goto L1
-    jmp L1
-    ; label L0
-L0:
-    ; param 
-    ; call print 
-    ; param y
-    ; call print y
     mov eax, 4
     mov ebx, 1
-    mov ecx, str_1
-    mov edx, len_str_1
+    mov ecx, newline
+    mov edx, 1
     int 80h
-    ; label L1
-L1:
+    popad
+    ret
 
-    mov eax, 1
-    mov ebx, 0
-    int 80h
\ No newline at end of file
+print_int:                  ; prints eax as a signed decimal and a newline
+    pushad
+    mov edi, print_buf + 31
+    mov byte [edi], 10
+    mov esi, eax
+    mov ebx, 10
+    test eax, eax
+    jns .digit
+    neg eax
+.digit:
+    xor edx, edx
+    div ebx
+    add dl, '0'
+    dec edi
+    mov [edi], dl
+    test eax, eax
+    jnz .digit
+    test esi, esi
+    jns .write
+    dec edi
+    mov byte [edi], '-'
+.write:
+    mov ecx, edi
+    mov edx, print_buf + 32
+    sub edx, edi
+    mov eax, 4
+    mov ebx, 1
+    int 80h
+    popad
+    ret
\ No newline at end of file
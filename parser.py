@@ -1,48 +1,129 @@
+import functools
+import importlib.util
+import io
+import json
+import logging
+import os
 import sys
 
 from ply import yacc
 
 from lexer import Scanner
 
+logger = logging.getLogger(__name__)
+
+# Frozen LALR tables, regenerated by a non-production build of the Parser
+TABLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'parsetab.py')
+
+
+# Shared by every leaf so leaves do not each allocate an empty list.
+# Nodes with a fixed number of children hold them in a tuple; only
+# Statements (appended to while parsing) and the lists built from
+# id_list / expression_list keep a list.
+NO_CHILDREN = ()
 
 # Node class for AST
 class Node:
+    __slots__ = ('type', 'children', 'value')
+
     def __init__(self, type, children=None, value=None):
         self.type = type
-        self.children = children if children else []
+        self.children = children if children is not None else NO_CHILDREN
         self.value = value
 
-    def __str__(self, level=0):
+    def __str__(self):
+        buffer = io.StringIO()
+        write_ast(self, buffer)
+        return buffer.getvalue()
+
+def _child_nodes(node):
+    # Children are nodes, possibly nested one level in a list; None is skipped
+    for child in node.children:
+        if child is None:
+            continue
+        if isinstance(child, list):
+            yield from child
+        else:
+            yield child
+
+def write_ast(root, stream):
+    """Write the indented text form of the AST to stream, without recursion."""
+    write = stream.write
+    # Entries are (node, level) or (text, None) for text still to be written
+    stack = [(root, 0)]
+    while stack:
+        node, level = stack.pop()
+        if level is None:
+            write(node)
+            continue
         indent = '  ' * level
-        result = f"{indent}({self.type}"
-        
-        if self.value is not None:
-            result += f" {self.value}"
-            
-        if self.children:
-            result += "\n"
-            for child in self.children:
-                if child is not None:  # Evita erros com nós None
-                    if isinstance(child, list):
-                        for item in child:  
-                            result += f"{item.__str__(level + 1)}\n"
-                    else:
-                        result += f"{child.__str__(level + 1)}\n"
-            result += f"{indent})"
+        if node.value is not None:
+            write(f"{indent}({node.type} {node.value}")
         else:
-            result += ")"
-            
-        return result.rstrip()  # Remove trailing whitespace
+            write(f"{indent}({node.type}")
+        if not node.children:
+            write(")")
+            continue
+        write("\n")
+        stack.append((indent + ")", None))
+        for child in reversed(list(_child_nodes(node))):
+            stack.append(("\n", None))
+            stack.append((child, level + 1))
+
+def write_ast_jsonl(root, stream):
+    """Write the AST as JSON lines: one node per line, in preorder.
+
+    Each record holds the node type, its value and how many children
+    follow it, which is enough to rebuild the tree with read_ast_jsonl.
+    """
+    write = stream.write
+    dumps = json.dumps
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        children = list(_child_nodes(node))
+        write(dumps({'type': node.type, 'value': node.value, 'children': len(children)}))
+        write("\n")
+        stack.extend(reversed(children))
+
+def read_ast_jsonl(stream):
+    """Rebuild an AST written by write_ast_jsonl."""
+    root = None
+    # Open parents as [node, children still to read]
+    parents = []
+    for line in stream:
+        record = json.loads(line)
+        count = record['children']
+        node = Node(record['type'], [] if count else None, record['value'])
+        if parents:
+            parent = parents[-1]
+            parent[0].children.append(node)
+            parent[1] -= 1
+            if not parent[1]:
+                parents.pop()
+        else:
+            root = node
+        if count:
+            parents.append([node, count])
+    return root
     
 # Parser class
 class Parser:
-    def __init__(self):
+    def __init__(self, production=False, debug=False):
         self.scanner = None
         self.parser = None
         self.errors = []
-        self.debug = True  # Toggle for debug messages
-        
-    tokens = [name for name, pattern in Scanner("").token_specs]
+        # Writes parser.out when the tables are (re)built; diagnostics are
+        # emitted through the 'parser' logger at DEBUG level
+        self.debug = debug
+        # Production builds load parsetab.py as-is: no grammar analysis,
+        # no parser.out and no table files written
+        self.production = production
+
+    # Names the trees this parser builds, for compilation cache keys
+    mode = 'ply'
+
+    tokens = [name for name, pattern in Scanner.token_specs]
     
     precedence = (
         ('left', 'OP_COMP'),
@@ -52,19 +133,17 @@ class Parser:
 
     def p_program(self, p):
         '''program : PROGRAM ID LBRACE statements RBRACE'''
-        p[0] = Node('Program', [p[4]], p[2])
-        if self.debug:
-            print(f"DEBUG: Processed program rule with ID: {p[2]}")
+        p[0] = Node('Program', (p[4],), p[2])
+        logger.debug("Processed program rule with ID: %s", p[2])
 
     def p_statements(self, p):
-        '''statements : statement statements
+        '''statements : statements statement
                      | empty'''
+        # Left recursion keeps the LR stack shallow and lets each statement
+        # be appended to the list instead of inserted at its front
         if len(p) == 3:
-            if p[2].type == 'Statements':
-                p[2].children.insert(0, p[1])
-                p[0] = p[2]
-            else:
-                p[0] = Node('Statements', [p[1]])
+            p[1].children.append(p[2])
+            p[0] = p[1]
         else:
             p[0] = Node('Statements', [])
 
@@ -85,7 +164,7 @@ class Parser:
 
     def p_const_decl(self, p):
         '''const_decl : CONST ID ASSIGN constant SEMICOLON'''
-        p[0] = Node('ConstDecl', [Node('ID', [], p[2]), p[4]])
+        p[0] = Node('ConstDecl', (Node('ID', value=p[2]), p[4]))
 
     def p_var_decl(self, p):
         '''var_decl : type id_list SEMICOLON'''
@@ -93,21 +172,22 @@ class Parser:
 
     def p_type(self, p):
         '''type : TYPE'''
-        p[0] = Node('Type', [], p[1])
+        p[0] = Node('Type', value=p[1])
 
     def p_id_list(self, p):
         '''id_list : ID
-                  | ID COMMA id_list'''
+                  | id_list COMMA ID'''
         if len(p) == 2:
-            p[0] = [Node('ID', [], p[1])]
+            p[0] = [Node('ID', value=p[1])]
         else:
-            p[0] = [Node('ID', [], p[1])] + p[3]
+            p[1].append(Node('ID', value=p[3]))
+            p[0] = p[1]
 
     def p_constant(self, p):
         '''constant : NUMBER
                    | STRING
                    | BOOL_VAL'''
-        p[0] = Node('Constant', [], p[1])
+        p[0] = Node('Constant', value=p[1])
 
     def p_break_statement(self, p):
         '''break_statement : BREAK SEMICOLON'''
@@ -115,19 +195,19 @@ class Parser:
 
     def p_assignment(self, p):
         '''assignment : ID ASSIGN expression SEMICOLON'''
-        p[0] = Node('Assignment', [Node('ID', [], p[1]), p[3]])
+        p[0] = Node('Assignment', (Node('ID', value=p[1]), p[3]))
 
     def p_if_statement(self, p):
         '''if_statement : IF LPAREN expression RPAREN LBRACE statements RBRACE
                        | IF LPAREN expression RPAREN LBRACE statements RBRACE ELSE LBRACE statements RBRACE'''
         if len(p) == 8:
-            p[0] = Node('If', [p[3], p[6]])
+            p[0] = Node('If', (p[3], p[6]))
         else:
-            p[0] = Node('IfElse', [p[3], p[6], p[10]])
+            p[0] = Node('IfElse', (p[3], p[6], p[10]))
 
     def p_while_statement(self, p):
         '''while_statement : WHILE LPAREN expression RPAREN LBRACE statements RBRACE'''
-        p[0] = Node('While', [p[3], p[6]])
+        p[0] = Node('While', (p[3], p[6]))
 
     def p_print_statement(self, p):
         '''print_statement : PRINT LPAREN expression_list RPAREN SEMICOLON'''
@@ -139,11 +219,12 @@ class Parser:
 
     def p_expression_list(self, p):
         '''expression_list : expression
-                         | expression COMMA expression_list'''
+                         | expression_list COMMA expression'''
         if len(p) == 2:
             p[0] = [p[1]]
         else:
-            p[0] = [p[1]] + p[3]
+            p[1].append(p[3])
+            p[0] = p[1]
 
     def p_expression(self, p):
         '''expression : term
@@ -153,9 +234,9 @@ class Parser:
         if len(p) == 2:
             p[0] = p[1]
         elif len(p) == 3:
-            p[0] = Node('UnaryOp', [p[2]], p[1])
+            p[0] = Node('UnaryOp', (p[2],), p[1])
         else:
-            p[0] = Node('BinaryOp', [p[1], p[3]], p[2])
+            p[0] = Node('BinaryOp', (p[1], p[3]), p[2])
 
     def p_term(self, p):
         '''term : ID
@@ -165,7 +246,7 @@ class Parser:
             if isinstance(p[1], Node):
                 p[0] = p[1]
             else:
-                p[0] = Node('ID', [], p[1])
+                p[0] = Node('ID', value=p[1])
         else:
             p[0] = p[2]
 
@@ -175,38 +256,79 @@ class Parser:
 
     def p_error(self, p):
         if p:
-            error_msg = f"Erro de sintaxe na linha {p.lineno}, posição {p.lexpos}: Token inesperado '{p.value}'"
+            error_msg = f"Erro de sintaxe na linha {p.lineno}, coluna {p.column}: Token inesperado '{p.value}'"
             self.errors.append(error_msg)
-            if self.debug:
-                print(f"DEBUG: {error_msg}")
-                print(f"DEBUG: Estado atual do parser: {self.parser.state}")
+            logger.debug("%s", error_msg)
+            logger.debug("Estado atual do parser: %s", self.parser.state)
         else:
             error_msg = "Erro de sintaxe: Fim inesperado do arquivo"
             self.errors.append(error_msg)
-            if self.debug:
-                print(f"DEBUG: {error_msg}")
+            logger.debug("%s", error_msg)
 
     def build(self):
         if not self.parser:
-            self.parser = yacc.yacc(module=self, debug=self.debug)
+            if self.production:
+                self.parser = self.load_tables()
+            else:
+                self.parser = yacc.yacc(module=self, debug=self.debug)
+
+    def load_tables(self):
+        """Bind the frozen tables in parsetab.py to this parser instance."""
+        lr = yacc.LRTable()
+        try:
+            signature = lr.read_table(_load_parsetab())
+        except (OSError, ImportError, yacc.VersionError):
+            signature = None
+        if signature != self.grammar_signature():
+            # Missing or stale tables: build them in memory, never on disk
+            return yacc.yacc(module=self, debug=False, write_tables=False,
+                             errorlog=yacc.NullLogger())
+        lr.bind_callables({prod.func: getattr(self, prod.func)
+                           for prod in lr.lr_productions if prod.func})
+        return yacc.LRParser(lr, self.p_error)
+
+    @classmethod
+    def grammar_signature(cls):
+        """The grammar signature PLY stores in parsetab.py, without reflection."""
+        rules = sorted((func.__code__.co_firstlineno, name, func.__doc__)
+                       for name, func in vars(cls).items()
+                       if name.startswith('p_') and name != 'p_error')
+        return (''.join(''.join(level) for level in cls.precedence)
+                + ' '.join(sorted(cls.tokens))
+                + ''.join(doc for line, name, doc in rules if doc))
 
     def parse(self, source_code):
-        self.scanner = Scanner(source_code)
+        """Parse a source string or a text file object, which is streamed."""
+        if self.scanner is None:
+            self.scanner = Scanner(source_code)
+        else:
+            self.scanner.reset(source_code)
+        return self.parse_scanner(self.scanner)
+
+    def parse_scanner(self, scanner):
+        """Parse the tokens of scanner, which may have been tokenized beforehand."""
+        self.errors = []
         self.build()
+        scanner.rewind()
         try:
-            result = self.parser.parse(lexer=self.scanner)
-            if self.debug:
-                print("DEBUG: Parsing completed")
-                if result:
-                    print(f"DEBUG: AST root: {result}")
+            result = self.parser.parse(lexer=scanner)
+            logger.debug("Parsing completed")
+            if result and logger.isEnabledFor(logging.DEBUG):
+                logger.debug("AST root: %s", result)
             return result, self.errors
         except Exception as e:
             error_msg = f"Erro durante o parsing: {str(e)}"
             self.errors.append(error_msg)
-            if self.debug:
-                print(f"DEBUG: {error_msg}")
+            logger.debug("%s", error_msg)
             return None, self.errors
 
+@functools.lru_cache(maxsize=None)
+def _load_parsetab():
+    spec = importlib.util.spec_from_file_location('parsetab', TABLE_FILE)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
 def write_output(ast, errors, filename='parser_out.txt'):
     try:
         with open(filename, 'w', encoding='utf-8') as f:
@@ -215,8 +337,7 @@ def write_output(ast, errors, filename='parser_out.txt'):
                     f.write(f"{error}\n")
             else:
                 f.write("Representação da AST:\n")
-                # Use a nova função str melhorada
-                f.write(str(ast))
+                write_ast(ast, f)
                 f.write("\n")
                 
                 # Adiciona informação de debug para verificar a estrutura
@@ -230,25 +351,29 @@ def write_output(ast, errors, filename='parser_out.txt'):
         print(f"Erro ao escrever arquivo de saída: {str(e)}")
 
 def main():
-    if len(sys.argv) < 2:
+    flags = {arg for arg in sys.argv[1:] if arg.startswith('-')}
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('-')]
+    if not args:
         print("Erro: Você precisa especificar o nome do arquivo de entrada.")
-        print("Uso: python parser.py <nome_do_arquivo>")
+        print("Uso: python parser.py [-v] [--jsonl] <nome_do_arquivo>")
         sys.exit(1)
 
-    input_file_name = sys.argv[1]
+    input_file_name = args[0]
+    if flags & {'-v', '--verbose'}:
+        logging.basicConfig(level=logging.DEBUG, format="%(levelname)s: %(message)s")
 
     try:
-        # Read from input file
+        # Pass -v to enable debug messages
+        parser = Parser(production=True)
+        # The scanner streams the file, so it is never read into memory whole
         with open(input_file_name, 'r', encoding='utf-8') as file:
-            source_code = file.read()
-
-        parser = Parser()
-        # Uncomment the next line to enable debug messages
-        # parser.debug = True
-        ast, errors = parser.parse(source_code)
+            ast, errors = parser.parse(file)
         
         # Write results to parser_out.txt
         write_output(ast, errors)
+        if '--jsonl' in flags and not errors:
+            with open('parser_out.jsonl', 'w', encoding='utf-8') as f:
+                write_ast_jsonl(ast, f)
         
         # Print confirmation message to console
         if errors:
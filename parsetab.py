@@ -6,9 +6,9 @@ _tabversion = '3.10'
 
 _lr_method = 'LALR'
 
-_lr_signature = 'leftOP_COMPleftOP_ARITrightOP_LOGASSIGN BOOL_VAL BREAK COMMA COMMENT CONST ELSE ID IF INPUT LBRACE LPAREN NUMBER OP_ARIT OP_COMP OP_LOG PRINT PROGRAM RBRACE RPAREN SEMICOLON STRING TYPE WHILE WHITESPACEprogram : PROGRAM ID LBRACE statements RBRACEstatements : statement statements\n                     | emptystatement : assignment\n                    | declaration\n                    | if_statement\n                    | while_statement\n                    | print_statement\n                    | input_statement\n                    | break_statementdeclaration : const_decl\n                      | var_declconst_decl : CONST ID ASSIGN constant SEMICOLONvar_decl : type id_list SEMICOLONtype : TYPEid_list : ID\n                  | ID COMMA id_listconstant : NUMBER\n                   | STRING\n                   | BOOL_VALbreak_statement : BREAK SEMICOLONassignment : ID ASSIGN expression SEMICOLONif_statement : IF LPAREN expression RPAREN LBRACE statements RBRACE\n                       | IF LPAREN expression RPAREN LBRACE statements RBRACE ELSE LBRACE statements RBRACEwhile_statement : WHILE LPAREN expression RPAREN LBRACE statements RBRACEprint_statement : PRINT LPAREN expression_list RPAREN SEMICOLONinput_statement : INPUT LPAREN id_list RPAREN SEMICOLONexpression_list : expression\n                         | expression COMMA expression_listexpression : term\n                     | expression OP_ARIT term\n                     | expression OP_COMP term\n                     | OP_LOG termterm : ID\n                | constant\n                | LPAREN expression RPARENempty :'
+_lr_signature = 'leftOP_COMPleftOP_ARITrightOP_LOGASSIGN BOOL_VAL BREAK COMMA COMMENT CONST ELSE ID IF INPUT LBRACE LPAREN NUMBER OP_ARIT OP_COMP OP_LOG PRINT PROGRAM RBRACE RPAREN SEMICOLON STRING TYPE WHILE WHITESPACEprogram : PROGRAM ID LBRACE statements RBRACEstatements : statements statement\n                     | emptystatement : assignment\n                    | declaration\n                    | if_statement\n                    | while_statement\n                    | print_statement\n                    | input_statement\n                    | break_statementdeclaration : const_decl\n                      | var_declconst_decl : CONST ID ASSIGN constant SEMICOLONvar_decl : type id_list SEMICOLONtype : TYPEid_list : ID\n                  | id_list COMMA IDconstant : NUMBER\n                   | STRING\n                   | BOOL_VALbreak_statement : BREAK SEMICOLONassignment : ID ASSIGN expression SEMICOLONif_statement : IF LPAREN expression RPAREN LBRACE statements RBRACE\n                       | IF LPAREN expression RPAREN LBRACE statements RBRACE ELSE LBRACE statements RBRACEwhile_statement : WHILE LPAREN expression RPAREN LBRACE statements RBRACEprint_statement : PRINT LPAREN expression_list RPAREN SEMICOLONinput_statement : INPUT LPAREN id_list RPAREN SEMICOLONexpression_list : expression\n                         | expression_list COMMA expressionexpression : term\n                     | expression OP_ARIT term\n                     | expression OP_COMP term\n                     | OP_LOG termterm : ID\n                | constant\n                | LPAREN expression RPARENempty :'
     
-_lr_action_items = {'PROGRAM':([0,],[2,]),'$end':([1,27,],[0,-1,]),'ID':([2,4,7,9,10,11,12,13,14,15,16,17,23,24,25,26,29,30,31,32,33,40,42,52,53,54,55,56,62,69,70,71,73,74,77,78,80,82,],[3,5,5,-4,-5,-6,-7,-8,-9,-10,-11,-12,34,36,-15,37,37,37,37,36,-21,37,37,-14,36,-22,37,37,37,5,5,-26,-27,-13,-23,-25,5,-24,]),'LBRACE':([3,59,60,79,],[4,69,70,80,]),'RBRACE':([4,6,7,8,9,10,11,12,13,14,15,16,17,28,33,52,54,69,70,71,73,74,75,76,77,78,80,81,82,],[-37,27,-37,-3,-4,-5,-6,-7,-8,-9,-10,-11,-12,-2,-21,-14,-22,-37,-37,-26,-27,-13,77,78,-23,-25,-37,82,-24,]),'IF':([4,7,9,10,11,12,13,14,15,16,17,33,52,54,69,70,71,73,74,77,78,80,82,],[18,18,-4,-5,-6,-7,-8,-9,-10,-11,-12,-21,-14,-22,18,18,-26,-27,-13,-23,-25,18,-24,]),'WHILE':([4,7,9,10,11,12,13,14,15,16,17,33,52,54,69,70,71,73,74,77,78,80,82,],[19,19,-4,-5,-6,-7,-8,-9,-10,-11,-12,-21,-14,-22,19,19,-26,-27,-13,-23,-25,19,-24,]),'PRINT':([4,7,9,10,11,12,13,14,15,16,17,33,52,54,69,70,71,73,74,77,78,80,82,],[20,20,-4,-5,-6,-7,-8,-9,-10,-11,-12,-21,-14,-22,20,20,-26,-27,-13,-23,-25,20,-24,]),'INPUT':([4,7,9,10,11,12,13,14,15,16,17,33,52,54,69,70,71,73,74,77,78,80,82,],[21,21,-4,-5,-6,-7,-8,-9,-10,-11,-12,-21,-14,-22,21,21,-26,-27,-13,-23,-25,21,-24,]),'BREAK':([4,7,9,10,11,12,13,14,15,16,17,33,52,54,69,70,71,73,74,77,78,80,82,],[22,22,-4,-5,-6,-7,-8,-9,-10,-11,-12,-21,-14,-22,22,22,-26,-27,-13,-23,-25,22,-24,]),'CONST':([4,7,9,10,11,12,13,14,15,16,17,33,52,54,69,70,71,73,74,77,78,80,82,],[23,23,-4,-5,-6,-7,-8,-9,-10,-11,-12,-21,-14,-22,23,23,-26,-27,-13,-23,-25,23,-24,]),'TYPE':([4,7,9,10,11,12,13,14,15,16,17,33,52,54,69,70,71,73,74,77,78,80,82,],[25,25,-4,-5,-6,-7,-8,-9,-10,-11,-12,-21,-14,-22,25,25,-26,-27,-13,-23,-25,25,-24,]),'ASSIGN':([5,34,],[26,51,]),'LPAREN':([18,19,20,21,26,29,30,31,40,42,55,56,62,],[29,30,31,32,42,42,42,42,42,42,42,42,42,]),'SEMICOLON':([22,35,36,37,38,39,41,43,44,45,57,61,63,64,65,66,67,68,],[33,52,-16,-34,54,-30,-35,-18,-19,-20,-33,71,73,74,-17,-31,-32,-36,]),'OP_LOG':([26,29,30,31,42,62,],[40,40,40,40,40,40,]),'NUMBER':([26,29,30,31,40,42,51,55,56,62,],[43,43,43,43,43,43,43,43,43,43,]),'STRING':([26,29,30,31,40,42,51,55,56,62,],[44,44,44,44,44,44,44,44,44,44,]),'BOOL_VAL':([26,29,30,31,40,42,51,55,56,62,],[45,45,45,45,45,45,45,45,45,45,]),'RPAREN':([36,37,39,41,43,44,45,46,47,48,49,50,57,58,65,66,67,68,72,],[-16,-34,-30,-35,-18,-19,-20,59,60,61,-28,63,-33,68,-17,-31,-32,-36,-29,]),'COMMA':([36,37,39,41,43,44,45,49,57,66,67,68,],[53,-34,-30,-35,-18,-19,-20,62,-33,-31,-32,-36,]),'OP_ARIT':([37,38,39,41,43,44,45,46,47,49,57,58,66,67,68,],[-34,55,-30,-35,-18,-19,-20,55,55,55,-33,55,-31,-32,-36,]),'OP_COMP':([37,38,39,41,43,44,45,46,47,49,57,58,66,67,68,],[-34,56,-30,-35,-18,-19,-20,56,56,56,-33,56,-31,-32,-36,]),'ELSE':([77,],[79,]),}
+_lr_action_items = {'PROGRAM':([0,],[2,]),'$end':([1,8,],[0,-1,]),'ID':([2,4,5,6,9,10,11,12,13,14,15,16,17,18,24,25,26,27,28,29,30,31,32,39,41,51,52,53,54,55,61,68,69,70,72,73,74,75,76,77,79,80,81,],[3,-37,7,-3,-2,-4,-5,-6,-7,-8,-9,-10,-11,-12,33,35,-15,36,36,36,36,35,-21,36,36,-14,64,-22,36,36,36,-37,-37,-26,-27,-13,7,7,-23,-25,-37,7,-24,]),'LBRACE':([3,58,59,78,],[4,68,69,79,]),'RBRACE':([4,5,6,9,10,11,12,13,14,15,16,17,18,32,51,53,68,69,70,72,73,74,75,76,77,79,80,81,],[-37,8,-3,-2,-4,-5,-6,-7,-8,-9,-10,-11,-12,-21,-14,-22,-37,-37,-26,-27,-13,76,77,-23,-25,-37,81,-24,]),'IF':([4,5,6,9,10,11,12,13,14,15,16,17,18,32,51,53,68,69,70,72,73,74,75,76,77,79,80,81,],[-37,19,-3,-2,-4,-5,-6,-7,-8,-9,-10,-11,-12,-21,-14,-22,-37,-37,-26,-27,-13,19,19,-23,-25,-37,19,-24,]),'WHILE':([4,5,6,9,10,11,12,13,14,15,16,17,18,32,51,53,68,69,70,72,73,74,75,76,77,79,80,81,],[-37,20,-3,-2,-4,-5,-6,-7,-8,-9,-10,-11,-12,-21,-14,-22,-37,-37,-26,-27,-13,20,20,-23,-25,-37,20,-24,]),'PRINT':([4,5,6,9,10,11,12,13,14,15,16,17,18,32,51,53,68,69,70,72,73,74,75,76,77,79,80,81,],[-37,21,-3,-2,-4,-5,-6,-7,-8,-9,-10,-11,-12,-21,-14,-22,-37,-37,-26,-27,-13,21,21,-23,-25,-37,21,-24,]),'INPUT':([4,5,6,9,10,11,12,13,14,15,16,17,18,32,51,53,68,69,70,72,73,74,75,76,77,79,80,81,],[-37,22,-3,-2,-4,-5,-6,-7,-8,-9,-10,-11,-12,-21,-14,-22,-37,-37,-26,-27,-13,22,22,-23,-25,-37,22,-24,]),'BREAK':([4,5,6,9,10,11,12,13,14,15,16,17,18,32,51,53,68,69,70,72,73,74,75,76,77,79,80,81,],[-37,23,-3,-2,-4,-5,-6,-7,-8,-9,-10,-11,-12,-21,-14,-22,-37,-37,-26,-27,-13,23,23,-23,-25,-37,23,-24,]),'CONST':([4,5,6,9,10,11,12,13,14,15,16,17,18,32,51,53,68,69,70,72,73,74,75,76,77,79,80,81,],[-37,24,-3,-2,-4,-5,-6,-7,-8,-9,-10,-11,-12,-21,-14,-22,-37,-37,-26,-27,-13,24,24,-23,-25,-37,24,-24,]),'TYPE':([4,5,6,9,10,11,12,13,14,15,16,17,18,32,51,53,68,69,70,72,73,74,75,76,77,79,80,81,],[-37,26,-3,-2,-4,-5,-6,-7,-8,-9,-10,-11,-12,-21,-14,-22,-37,-37,-26,-27,-13,26,26,-23,-25,-37,26,-24,]),'ASSIGN':([7,33,],[27,50,]),'LPAREN':([19,20,21,22,27,28,29,30,39,41,54,55,61,],[28,29,30,31,41,41,41,41,41,41,41,41,41,]),'SEMICOLON':([23,34,35,36,37,38,40,42,43,44,56,60,62,63,64,65,66,67,],[32,51,-16,-34,53,-30,-35,-18,-19,-20,-33,70,72,73,-17,-31,-32,-36,]),'OP_LOG':([27,28,29,30,41,61,],[39,39,39,39,39,39,]),'NUMBER':([27,28,29,30,39,41,50,54,55,61,],[42,42,42,42,42,42,42,42,42,42,]),'STRING':([27,28,29,30,39,41,50,54,55,61,],[43,43,43,43,43,43,43,43,43,43,]),'BOOL_VAL':([27,28,29,30,39,41,50,54,55,61,],[44,44,44,44,44,44,44,44,44,44,]),'COMMA':([34,35,36,38,40,42,43,44,47,48,49,56,64,65,66,67,71,],[52,-16,-34,-30,-35,-18,-19,-20,61,-28,52,-33,-17,-31,-32,-36,-29,]),'RPAREN':([35,36,38,40,42,43,44,45,46,47,48,49,56,57,64,65,66,67,71,],[-16,-34,-30,-35,-18,-19,-20,58,59,60,-28,62,-33,67,-17,-31,-32,-36,-29,]),'OP_ARIT':([36,37,38,40,42,43,44,45,46,48,56,57,65,66,67,71,],[-34,54,-30,-35,-18,-19,-20,54,54,54,-33,54,-31,-32,-36,54,]),'OP_COMP':([36,37,38,40,42,43,44,45,46,48,56,57,65,66,67,71,],[-34,55,-30,-35,-18,-19,-20,55,55,55,-33,55,-31,-32,-36,55,]),'ELSE':([76,],[78,]),}
 
 _lr_action = {}
 for _k, _v in _lr_action_items.items():
@@ -17,7 +17,7 @@ for _k, _v in _lr_action_items.items():
       _lr_action[_x][_k] = _y
 del _lr_action_items
 
-_lr_goto_items = {'program':([0,],[1,]),'statements':([4,7,69,70,80,],[6,28,75,76,81,]),'statement':([4,7,69,70,80,],[7,7,7,7,7,]),'empty':([4,7,69,70,80,],[8,8,8,8,8,]),'assignment':([4,7,69,70,80,],[9,9,9,9,9,]),'declaration':([4,7,69,70,80,],[10,10,10,10,10,]),'if_statement':([4,7,69,70,80,],[11,11,11,11,11,]),'while_statement':([4,7,69,70,80,],[12,12,12,12,12,]),'print_statement':([4,7,69,70,80,],[13,13,13,13,13,]),'input_statement':([4,7,69,70,80,],[14,14,14,14,14,]),'break_statement':([4,7,69,70,80,],[15,15,15,15,15,]),'const_decl':([4,7,69,70,80,],[16,16,16,16,16,]),'var_decl':([4,7,69,70,80,],[17,17,17,17,17,]),'type':([4,7,69,70,80,],[24,24,24,24,24,]),'id_list':([24,32,53,],[35,50,65,]),'expression':([26,29,30,31,42,62,],[38,46,47,49,58,49,]),'term':([26,29,30,31,40,42,55,56,62,],[39,39,39,39,57,39,66,67,39,]),'constant':([26,29,30,31,40,42,51,55,56,62,],[41,41,41,41,41,41,64,41,41,41,]),'expression_list':([31,62,],[48,72,]),}
+_lr_goto_items = {'program':([0,],[1,]),'statements':([4,68,69,79,],[5,74,75,80,]),'empty':([4,68,69,79,],[6,6,6,6,]),'statement':([5,74,75,80,],[9,9,9,9,]),'assignment':([5,74,75,80,],[10,10,10,10,]),'declaration':([5,74,75,80,],[11,11,11,11,]),'if_statement':([5,74,75,80,],[12,12,12,12,]),'while_statement':([5,74,75,80,],[13,13,13,13,]),'print_statement':([5,74,75,80,],[14,14,14,14,]),'input_statement':([5,74,75,80,],[15,15,15,15,]),'break_statement':([5,74,75,80,],[16,16,16,16,]),'const_decl':([5,74,75,80,],[17,17,17,17,]),'var_decl':([5,74,75,80,],[18,18,18,18,]),'type':([5,74,75,80,],[25,25,25,25,]),'id_list':([25,31,],[34,49,]),'expression':([27,28,29,30,41,61,],[37,45,46,48,57,71,]),'term':([27,28,29,30,39,41,54,55,61,],[38,38,38,38,56,38,65,66,38,]),'constant':([27,28,29,30,39,41,50,54,55,61,],[40,40,40,40,40,40,63,40,40,40,]),'expression_list':([30,],[47,]),}
 
 _lr_goto = {}
 for _k, _v in _lr_goto_items.items():
@@ -27,41 +27,41 @@ for _k, _v in _lr_goto_items.items():
 del _lr_goto_items
 _lr_productions = [
   ("S' -> program","S'",1,None,None,None),
-  ('program -> PROGRAM ID LBRACE statements RBRACE','program',5,'p_program','parser.py',54),
-  ('statements -> statement statements','statements',2,'p_statements','parser.py',60),
-  ('statements -> empty','statements',1,'p_statements','parser.py',61),
-  ('statement -> assignment','statement',1,'p_statement','parser.py',72),
-  ('statement -> declaration','statement',1,'p_statement','parser.py',73),
-  ('statement -> if_statement','statement',1,'p_statement','parser.py',74),
-  ('statement -> while_statement','statement',1,'p_statement','parser.py',75),
-  ('statement -> print_statement','statement',1,'p_statement','parser.py',76),
-  ('statement -> input_statement','statement',1,'p_statement','parser.py',77),
-  ('statement -> break_statement','statement',1,'p_statement','parser.py',78),
-  ('declaration -> const_decl','declaration',1,'p_declaration','parser.py',82),
-  ('declaration -> var_decl','declaration',1,'p_declaration','parser.py',83),
-  ('const_decl -> CONST ID ASSIGN constant SEMICOLON','const_decl',5,'p_const_decl','parser.py',87),
-  ('var_decl -> type id_list SEMICOLON','var_decl',3,'p_var_decl','parser.py',91),
-  ('type -> TYPE','type',1,'p_type','parser.py',95),
-  ('id_list -> ID','id_list',1,'p_id_list','parser.py',99),
-  ('id_list -> ID COMMA id_list','id_list',3,'p_id_list','parser.py',100),
-  ('constant -> NUMBER','constant',1,'p_constant','parser.py',107),
-  ('constant -> STRING','constant',1,'p_constant','parser.py',108),
-  ('constant -> BOOL_VAL','constant',1,'p_constant','parser.py',109),
-  ('break_statement -> BREAK SEMICOLON','break_statement',2,'p_break_statement','parser.py',113),
-  ('assignment -> ID ASSIGN expression SEMICOLON','assignment',4,'p_assignment','parser.py',117),
-  ('if_statement -> IF LPAREN expression RPAREN LBRACE statements RBRACE','if_statement',7,'p_if_statement','parser.py',121),
-  ('if_statement -> IF LPAREN expression RPAREN LBRACE statements RBRACE ELSE LBRACE statements RBRACE','if_statement',11,'p_if_statement','parser.py',122),
-  ('while_statement -> WHILE LPAREN expression RPAREN LBRACE statements RBRACE','while_statement',7,'p_while_statement','parser.py',129),
-  ('print_statement -> PRINT LPAREN expression_list RPAREN SEMICOLON','print_statement',5,'p_print_statement','parser.py',133),
-  ('input_statement -> INPUT LPAREN id_list RPAREN SEMICOLON','input_statement',5,'p_input_statement','parser.py',137),
-  ('expression_list -> expression','expression_list',1,'p_expression_list','parser.py',141),
-  ('expression_list -> expression COMMA expression_list','expression_list',3,'p_expression_list','parser.py',142),
-  ('expression -> term','expression',1,'p_expression','parser.py',149),
-  ('expression -> expression OP_ARIT term','expression',3,'p_expression','parser.py',150),
-  ('expression -> expression OP_COMP term','expression',3,'p_expression','parser.py',151),
-  ('expression -> OP_LOG term','expression',2,'p_expression','parser.py',152),
-  ('term -> ID','term',1,'p_term','parser.py',161),
-  ('term -> constant','term',1,'p_term','parser.py',162),
-  ('term -> LPAREN expression RPAREN','term',3,'p_term','parser.py',163),
-  ('empty -> <empty>','empty',0,'p_empty','parser.py',173),
+  ('program -> PROGRAM ID LBRACE statements RBRACE','program',5,'p_program','parser.py',68),
+  ('statements -> statements statement','statements',2,'p_statements','parser.py',73),
+  ('statements -> empty','statements',1,'p_statements','parser.py',74),
+  ('statement -> assignment','statement',1,'p_statement','parser.py',84),
+  ('statement -> declaration','statement',1,'p_statement','parser.py',85),
+  ('statement -> if_statement','statement',1,'p_statement','parser.py',86),
+  ('statement -> while_statement','statement',1,'p_statement','parser.py',87),
+  ('statement -> print_statement','statement',1,'p_statement','parser.py',88),
+  ('statement -> input_statement','statement',1,'p_statement','parser.py',89),
+  ('statement -> break_statement','statement',1,'p_statement','parser.py',90),
+  ('declaration -> const_decl','declaration',1,'p_declaration','parser.py',94),
+  ('declaration -> var_decl','declaration',1,'p_declaration','parser.py',95),
+  ('const_decl -> CONST ID ASSIGN constant SEMICOLON','const_decl',5,'p_const_decl','parser.py',99),
+  ('var_decl -> type id_list SEMICOLON','var_decl',3,'p_var_decl','parser.py',103),
+  ('type -> TYPE','type',1,'p_type','parser.py',107),
+  ('id_list -> ID','id_list',1,'p_id_list','parser.py',111),
+  ('id_list -> id_list COMMA ID','id_list',3,'p_id_list','parser.py',112),
+  ('constant -> NUMBER','constant',1,'p_constant','parser.py',120),
+  ('constant -> STRING','constant',1,'p_constant','parser.py',121),
+  ('constant -> BOOL_VAL','constant',1,'p_constant','parser.py',122),
+  ('break_statement -> BREAK SEMICOLON','break_statement',2,'p_break_statement','parser.py',126),
+  ('assignment -> ID ASSIGN expression SEMICOLON','assignment',4,'p_assignment','parser.py',130),
+  ('if_statement -> IF LPAREN expression RPAREN LBRACE statements RBRACE','if_statement',7,'p_if_statement','parser.py',134),
+  ('if_statement -> IF LPAREN expression RPAREN LBRACE statements RBRACE ELSE LBRACE statements RBRACE','if_statement',11,'p_if_statement','parser.py',135),
+  ('while_statement -> WHILE LPAREN expression RPAREN LBRACE statements RBRACE','while_statement',7,'p_while_statement','parser.py',142),
+  ('print_statement -> PRINT LPAREN expression_list RPAREN SEMICOLON','print_statement',5,'p_print_statement','parser.py',146),
+  ('input_statement -> INPUT LPAREN id_list RPAREN SEMICOLON','input_statement',5,'p_input_statement','parser.py',150),
+  ('expression_list -> expression','expression_list',1,'p_expression_list','parser.py',154),
+  ('expression_list -> expression_list COMMA expression','expression_list',3,'p_expression_list','parser.py',155),
+  ('expression -> term','expression',1,'p_expression','parser.py',163),
+  ('expression -> expression OP_ARIT term','expression',3,'p_expression','parser.py',164),
+  ('expression -> expression OP_COMP term','expression',3,'p_expression','parser.py',165),
+  ('expression -> OP_LOG term','expression',2,'p_expression','parser.py',166),
+  ('term -> ID','term',1,'p_term','parser.py',175),
+  ('term -> constant','term',1,'p_term','parser.py',176),
+  ('term -> LPAREN expression RPAREN','term',3,'p_term','parser.py',177),
+  ('empty -> <empty>','empty',0,'p_empty','parser.py',187),
 ]
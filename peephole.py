@@ -0,0 +1,157 @@
+from collections import Counter
+
+# Condition code suffix -> the suffix of the opposite condition
+INVERSE_CONDITIONS = {
+    'e': 'ne', 'ne': 'e', 'z': 'nz', 'nz': 'z',
+    'l': 'ge', 'ge': 'l', 'le': 'g', 'g': 'le',
+    'b': 'ae', 'ae': 'b', 'be': 'a', 'a': 'be',
+}
+
+
+def instruction(line):
+    """Split an instruction line into (mnemonic, operands); None for labels, comments and blanks."""
+    code = line.split(';', 1)[0].strip()
+    if not code or code.endswith(':'):
+        return None
+    mnemonic, _, rest = code.partition(' ')
+    return mnemonic, [operand.strip() for operand in rest.split(',')] if rest.strip() else []
+
+
+def label(line):
+    code = line.split(';', 1)[0].strip()
+    return code[:-1] if code.endswith(':') else None
+
+
+def significant(lines):
+    """Indices of the instructions and labels; comments and blank lines are transparent."""
+    return [i for i, line in enumerate(lines) if instruction(line) or label(line)]
+
+
+def conditional_jump(parsed):
+    """Condition suffix of a jcc instruction, or None."""
+    if parsed and parsed[0].startswith('j') and parsed[0][1:] in INVERSE_CONDITIONS:
+        return parsed[0][1:]
+    return None
+
+
+def labels_after(lines, sig, k):
+    """Labels that directly follow significant position k, all naming the same address."""
+    names = set()
+    k += 1
+    while k < len(sig):
+        name = label(lines[sig[k]])
+        if name is None:
+            break
+        names.add(name)
+        k += 1
+    return names
+
+
+def remove_redundant_loads(lines):
+    """`mov A, B` right after `mov B, A` copies a value that is already there."""
+    sig = significant(lines)
+    drop = set()
+    for first, second in zip(sig, sig[1:]):
+        stored, loaded = instruction(lines[first]), instruction(lines[second])
+        if (first not in drop and stored and loaded and stored[0] == loaded[0] == 'mov'
+                and len(stored[1]) == 2 and loaded[1] == stored[1][::-1]):
+            drop.add(second)
+    return [line for i, line in enumerate(lines) if i not in drop], len(drop)
+
+
+def remove_jumps_to_next(lines):
+    sig = significant(lines)
+    drop = set()
+    for k, i in enumerate(sig):
+        parsed = instruction(lines[i])
+        if parsed and parsed[0] == 'jmp' and parsed[1][0] in labels_after(lines, sig, k):
+            drop.add(i)
+    return [line for i, line in enumerate(lines) if i not in drop], len(drop)
+
+
+def invert_branches_over_jumps(lines):
+    """`jcc L1; jmp L2; L1:` becomes `jncc L2; L1:`."""
+    sig = significant(lines)
+    lines = list(lines)
+    drop = set()
+    for k in range(len(sig) - 1):
+        i, j = sig[k], sig[k + 1]
+        if i in drop:
+            continue
+        branch, jump = instruction(lines[i]), instruction(lines[j])
+        condition = conditional_jump(branch)
+        if (condition and jump and jump[0] == 'jmp'
+                and branch[1][0] in labels_after(lines, sig, k + 1)):
+            lines[i] = f"    j{INVERSE_CONDITIONS[condition]} {jump[1][0]}"
+            drop.add(j)
+    return [line for i, line in enumerate(lines) if i not in drop], len(drop)
+
+
+def fuse_flag_tests(lines):
+    """Branch on the flags of the compare instead of testing the value setcc made from them.
+
+    In `setcc al; movzx R, al; [mov M, R;] test R, R; jz L` the moves leave
+    the flags alone, so the test goes and jz becomes the inverse jcc. The
+    0/1 value is still stored, as later code may read it.
+    """
+    sig = significant(lines)
+    lines = list(lines)
+    drop = set()
+    for k in range(len(sig) - 3):
+        setcc = instruction(lines[sig[k]])
+        if not (setcc and setcc[0].startswith('set') and setcc[0][3:] in INVERSE_CONDITIONS
+                and setcc[1] == ['al']):
+            continue
+        movzx = instruction(lines[sig[k + 1]])
+        if not (movzx and movzx[0] == 'movzx' and movzx[1][1] == 'al'):
+            continue
+        register = movzx[1][0]
+        position = k + 2
+        store = instruction(lines[sig[position]])
+        if store and store[0] == 'mov' and store[1][1] == register and store[1][0].startswith('['):
+            position += 1
+        if position + 1 >= len(sig):
+            continue
+        test = instruction(lines[sig[position]])
+        branch = instruction(lines[sig[position + 1]])
+        if test != ('test', [register, register]) or not branch or branch[0] not in ('jz', 'jnz'):
+            continue
+        condition = setcc[0][3:]
+        if branch[0] == 'jz':
+            condition = INVERSE_CONDITIONS[condition]
+        drop.add(sig[position])
+        lines[sig[position + 1]] = f"    j{condition} {branch[1][0]}"
+    return [line for i, line in enumerate(lines) if i not in drop], len(drop)
+
+
+RULES = (remove_redundant_loads, remove_jumps_to_next, invert_branches_over_jumps, fuse_flag_tests)
+
+
+def peephole(lines):
+    """Apply every rule to a list of assembly lines until none fires.
+
+    Returns the new lines and a Counter of instructions removed per rule.
+    """
+    stats = Counter()
+    while True:
+        changed = False
+        for rule in RULES:
+            lines, removed = rule(lines)
+            if removed:
+                stats[rule.__name__] += removed
+                changed = True
+        if not changed:
+            return lines, stats
+
+
+def count_instructions(lines):
+    """Number of instructions in the .text section of an assembly listing."""
+    count = 0
+    in_text = False
+    for line in lines:
+        code = line.strip()
+        if code.startswith('section '):
+            in_text = code == 'section .text'
+        elif in_text and not code.startswith('global ') and instruction(line):
+            count += 1
+    return count
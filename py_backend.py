@@ -0,0 +1,312 @@
+import argparse
+import functools
+import logging
+import sys
+import time
+
+from optimizer import optimize
+from rd_parser import RDParser
+from tac_generator import TACGenerator
+from tac_ir import ARITHMETIC_OPS, BINARY_OPS, SYMBOLS, Op, coerce, const_type, infer_types
+from tac_vm import STRING_INPUT_LIMIT, ExecutionError, VirtualMachine, format_float, parse_int
+
+logger = logging.getLogger(__name__)
+
+# Programs kept compiled by compile_program()
+CACHE_SIZE = 64
+
+_parser = None
+
+
+def truncated_division(x, y):
+    """Integer division rounding toward zero, as idiv and the TAC define it."""
+    quotient = x // y
+    if quotient < 0 and quotient * y != x:
+        quotient += 1
+    return quotient
+
+
+def variables(ast):
+    """Names of every identifier in the AST."""
+    names = set()
+    stack = [ast]
+    while stack:
+        node = stack.pop()
+        if node.type == 'ID':
+            names.add(node.value)
+        stack.extend(child for child in node.children if child is not None)
+    return names
+
+
+class PythonTranslator:
+    """Translates an LPMS AST into the source of one Python function.
+
+    Variables become locals named v_<name>, while loops native loops, and
+    conditions plain Python comparisons. Types come from the program's
+    TAC (infer_types), so conversions on assignment, integer division and
+    printing follow the TAC semantics exactly.
+    """
+
+    def __init__(self, types):
+        self.types = types
+        self.lines = []
+        self.depth = 1
+        self.loops = 0
+
+    def emit(self, line):
+        self.lines.append('    ' * self.depth + line)
+
+    def translate(self, ast):
+        self.lines = ["def program(_read, _write, _idiv, _format_float, _parse_int):"]
+        # Every variable starts as 0, like its .data slot
+        for name in sorted(variables(ast)):
+            self.emit(f"v_{name} = 0")
+        self.statement(ast)
+        self.emit("return None")
+        return '\n'.join(self.lines) + '\n'
+
+    def statement(self, node):
+        kind = node.type
+        if kind in ('Program', 'Statements'):
+            for child in node.children:
+                self.statement(child)
+        elif kind == 'ConstDecl':
+            id_node, value_node = node.children
+            self.emit(f"v_{id_node.value} = {self.assigned(id_node.value, value_node)}")
+        elif kind == 'VarDecl':
+            for id_node in node.children[1:]:
+                zero = coerce(0, self.types.get(id_node.value, 'int'))
+                self.emit(f"v_{id_node.value} = {zero!r}")
+        elif kind == 'Assignment':
+            id_node, expr = node.children
+            self.emit(f"v_{id_node.value} = {self.assigned(id_node.value, expr)}")
+        elif kind == 'If':
+            condition, body = node.children
+            self.emit(f"if {self.condition(condition)}:")
+            self.block(body)
+        elif kind == 'IfElse':
+            condition, if_body, else_body = node.children
+            self.emit(f"if {self.condition(condition)}:")
+            self.block(if_body)
+            self.emit("else:")
+            self.block(else_body)
+        elif kind == 'While':
+            condition, body = node.children
+            self.emit(f"while {self.condition(condition)}:")
+            self.loops += 1
+            self.block(body)
+            self.loops -= 1
+        elif kind == 'Break':
+            if not self.loops:
+                raise ValueError("'break' statement not inside a loop")
+            self.emit("break")
+        elif kind == 'Print':
+            for arg in node.children:
+                value = self.expression(arg)
+                arg_type = self.type_of(arg)
+                if arg_type == 'str':
+                    self.emit(f"_write({value})")
+                elif arg_type == 'float':
+                    self.emit(f"_write(_format_float({value}))")
+                else:
+                    self.emit(f"_write(str(int({value})))")
+        elif kind == 'Input':
+            for id_node in node.children:
+                var_type = self.types.get(id_node.value, 'int')
+                if var_type == 'str':
+                    self.emit(f"v_{id_node.value} = _read()[:{STRING_INPUT_LIMIT}]")
+                elif var_type == 'float':
+                    self.emit(f"v_{id_node.value} = float(_parse_int(_read()))")
+                else:
+                    self.emit(f"v_{id_node.value} = _parse_int(_read())")
+
+    def block(self, node):
+        self.depth += 1
+        start = len(self.lines)
+        self.statement(node)
+        if len(self.lines) == start:
+            self.emit("pass")
+        self.depth -= 1
+
+    def assigned(self, name, expr):
+        """The expression for expr converted to the declared type of name."""
+        dest_type = self.types.get(name, 'int')
+        if expr.type == 'Constant':
+            return repr(coerce(expr.value, dest_type))
+        value = self.expression(expr)
+        source_type = self.type_of(expr)
+        if dest_type == 'float' and source_type not in ('float', 'str'):
+            return f"float({value})"
+        if dest_type in ('int', 'bool') and source_type == 'float':
+            return f"int({value})"
+        if dest_type == 'str' and source_type != 'str':
+            # Assigning a number to a string variable leaves it empty
+            return repr('')
+        return value
+
+    def type_of(self, node):
+        """Static type of an expression, by the rules of infer_types."""
+        kind = node.type
+        if kind == 'ID':
+            return self.types.get(node.value, 'int')
+        if kind == 'Constant':
+            return const_type(node.value)
+        if kind == 'UnaryOp' or BINARY_OPS[node.value] not in ARITHMETIC_OPS:
+            return 'bool'
+        left, right = self.type_of(node.children[0]), self.type_of(node.children[1])
+        if node.value == '+' and 'str' in (left, right):
+            return 'str'
+        return 'float' if 'float' in (left, right) else 'int'
+
+    def expression(self, node):
+        kind = node.type
+        if kind == 'ID':
+            return f"v_{node.value}"
+        if kind == 'Constant':
+            return repr(node.value)
+        if kind == 'UnaryOp':
+            return f"(0 if {self.truth(node.children[0])} else 1)"
+        op = BINARY_OPS[node.value]
+        left = self.expression(node.children[0])
+        right = self.expression(node.children[1])
+        if op is Op.DIV and 'float' not in (self.type_of(node.children[0]),
+                                             self.type_of(node.children[1])):
+            return f"_idiv({left}, {right})"
+        if op in ARITHMETIC_OPS:
+            return f"({left} {SYMBOLS[op]} {right})"
+        return f"(1 if {left} {SYMBOLS[op]} {right} else 0)"
+
+    def condition(self, node):
+        """A Python test for node, skipping the 0/1 value where possible."""
+        if node.type == 'UnaryOp':
+            return f"not ({self.condition(node.children[0])})"
+        if node.type == 'BinaryOp' and BINARY_OPS[node.value] not in ARITHMETIC_OPS:
+            left = self.expression(node.children[0])
+            right = self.expression(node.children[1])
+            return f"{left} {node.value} {right}"
+        return self.truth(node)
+
+    def truth(self, node):
+        """A Python test for node as the TAC tests a value: strings are
+        always true, as the machine code tests their address, and numbers
+        when they are not zero."""
+        value = self.expression(node)
+        if self.type_of(node) != 'str':
+            return f"{value} != 0"
+        if node.type in ('ID', 'Constant'):
+            return "True"
+        # Still evaluated, for the errors it may raise
+        return f"{value} is not None"
+
+
+class CompiledProgram:
+    """An LPMS program compiled to a Python function, or to the TAC VM as a fallback."""
+    __slots__ = ('source', 'function', 'vm')
+
+    def __init__(self, source=None, function=None, vm=None):
+        self.source = source
+        self.function = function
+        self.vm = vm
+
+    def run(self, stdin=None, stdout=None):
+        stdin = stdin or sys.stdin
+        stdout = stdout or sys.stdout
+        if self.vm is not None:
+            self.vm.run(stdin, stdout)
+            return
+        output = []
+
+        def flush():
+            if output:
+                stdout.write('\n'.join(output) + '\n')
+                output.clear()
+            stdout.flush()
+
+        def read_line():
+            # Show pending output before waiting for the user
+            flush()
+            return stdin.readline().rstrip('\r\n')
+
+        try:
+            self.function(read_line, output.append, truncated_division, format_float, parse_int)
+        except ZeroDivisionError as error:
+            raise ExecutionError("divisão por zero") from error
+        except (TypeError, ValueError, OverflowError) as error:
+            raise ExecutionError(str(error)) from error
+        finally:
+            flush()
+
+
+def compile_ast(ast):
+    """Compile an AST; programs Python cannot compile (too deeply nested) run on the TAC VM."""
+    generator = TACGenerator()
+    generator.generate(ast)
+    types = infer_types(generator.tac)
+    try:
+        source = PythonTranslator(types).translate(ast)
+        namespace = {}
+        exec(compile(source, '<lpms>', 'exec'), namespace)
+    except (RecursionError, SyntaxError, MemoryError) as e:
+        logger.debug("Falling back to the TAC VM: %s", e)
+        return CompiledProgram(vm=VirtualMachine(optimize(generator.tac)))
+    return CompiledProgram(source, namespace['program'])
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def compile_program(source):
+    """Compile LPMS source text; repeated calls with the same text reuse the compiled program.
+
+    Raises ValueError with the parser messages if the source has errors.
+    """
+    global _parser
+    if _parser is None:
+        _parser = RDParser()
+    ast, errors = _parser.parse(source)
+    if errors:
+        raise ValueError("\n".join(errors))
+    return compile_ast(ast)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(
+        description="Executa um programa LPMS compilado para uma função Python")
+    arg_parser.add_argument('input_file', metavar='arquivo_entrada')
+    arg_parser.add_argument('--source', action='store_true',
+                            help="mostra o código Python gerado em vez de executá-lo")
+    arg_parser.add_argument('--stats', action='store_true',
+                            help="mostra em stderr os tempos de compilação e de execução")
+    args = arg_parser.parse_args()
+
+    try:
+        with open(args.input_file, 'r', encoding='utf-8') as file:
+            source = file.read()
+    except FileNotFoundError:
+        print(f"Erro: Arquivo '{args.input_file}' não encontrado")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    try:
+        program = compile_program(source)
+    except ValueError as e:
+        print("Erros durante o parsing:")
+        print(e)
+        sys.exit(1)
+    compiled = time.perf_counter()
+    if args.source:
+        print(program.source or "# programa executado pela máquina virtual do TAC")
+        return
+
+    try:
+        program.run()
+    except ExecutionError as e:
+        print(f"Erro de execução: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if args.stats:
+            backend = "máquina virtual do TAC" if program.vm is not None else "Python"
+            print(f"Compilação: {(compiled - start) * 1000:.1f} ms, execução ({backend}): "
+                  f"{(time.perf_counter() - compiled) * 1000:.1f} ms", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
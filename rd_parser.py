@@ -0,0 +1,391 @@
+import argparse
+import logging
+import random
+import sys
+
+from lexer import Scanner
+from parser import Node, Parser
+
+logger = logging.getLogger(__name__)
+
+# Binding power of each binary operator: the higher, the tighter it binds
+BINDING_POWERS = {
+    '*': 30, '/': 30,
+    '+': 20, '-': 20,
+    '<': 10, '<=': 10, '>': 10, '>=': 10, '==': 10, '!=': 10,
+}
+# Power of every operator when they share one level, as in the PLY grammar
+FLAT_BINDING_POWER = 10
+
+CONSTANT_TOKENS = frozenset(('NUMBER', 'STRING', 'BOOL_VAL'))
+OPERATOR_TOKENS = frozenset(('OP_ARIT', 'OP_COMP'))
+
+
+# Parsers selectable by name: 'rd' is the default, 'ply' the reference grammar;
+# both group operators the same way
+PARSER_NAMES = ('rd', 'ply')
+
+
+class ParseError(Exception):
+    """A syntax error, with the message Parser.p_error would report."""
+
+
+class RDParser:
+    """Recursive-descent parser for LPMS, with operator-precedence parsing for expressions.
+
+    Reads the tokens of a Scanner one at a time, with one token of
+    lookahead, and builds the same Node trees as the PLY grammar in
+    parser.py, which stays the reference. Parsing stops at
+    the first syntax error, reported with the message of Parser.p_error.
+    Nested blocks and parentheses are tracked on explicit stacks instead
+    of by recursion, so nesting depth is only bounded by memory, as with
+    the PLY parser.
+
+    By default every binary operator has the same precedence and groups
+    left to right, exactly as in the PLY grammar, so both parsers build
+    identical trees and compile a program the same way. With precedence,
+    * and / bind tighter than + and -, which bind tighter than the
+    comparisons, all left-associative.
+    """
+
+    def __init__(self, precedence=False):
+        self.precedence = precedence
+        self.scanner = None
+        self.errors = []
+        # The lookahead token, None at the end of input, and the call that reads the next one
+        self.current = None
+        self.next_token = None
+        self.statement_parsers = {
+            'ID': self.assignment,
+            'CONST': self.const_decl,
+            'TYPE': self.var_decl,
+            'PRINT': self.print_statement,
+            'INPUT': self.input_statement,
+            'BREAK': self.break_statement,
+        }
+
+    @property
+    def mode(self):
+        """Parser name and the option that shapes its trees, for cache keys."""
+        return 'rd' if self.precedence else 'rd-flat'
+
+    def build(self):
+        # Nothing to build: kept so RDParser can stand in for Parser
+        pass
+
+    def parse(self, source_code):
+        """Parse a source string or a text file object."""
+        if self.scanner is None:
+            self.scanner = Scanner(source_code)
+        else:
+            self.scanner.reset(source_code)
+        return self.parse_scanner(self.scanner)
+
+    def parse_scanner(self, scanner):
+        """Parse the tokens of scanner, which may have been tokenized beforehand."""
+        self.errors = []
+        scanner.rewind()
+        self.next_token = scanner.token
+        self.current = self.next_token()
+        try:
+            result = self.program()
+            logger.debug("Parsing completed")
+            return result, self.errors
+        except ParseError as e:
+            self.errors.append(str(e))
+            logger.debug("%s", e)
+            return None, self.errors
+        except Exception as e:
+            error_msg = f"Erro durante o parsing: {str(e)}"
+            self.errors.append(error_msg)
+            logger.debug("%s", error_msg)
+            return None, self.errors
+        finally:
+            self.current = self.next_token = None
+
+    def error(self, token):
+        if token is None:
+            return ParseError("Erro de sintaxe: Fim inesperado do arquivo")
+        return ParseError(f"Erro de sintaxe na linha {token.lineno}, coluna {token.column}: "
+                          f"Token inesperado '{token.value}'")
+
+    def skip(self):
+        self.current = self.next_token()
+
+    def advance(self):
+        token = self.current
+        if token is None:
+            raise self.error(None)
+        self.current = self.next_token()
+        return token
+
+    def expect(self, token_type):
+        token = self.current
+        if token is None or token.type != token_type:
+            raise self.error(token)
+        self.current = self.next_token()
+        return token
+
+    def at(self, token_type):
+        """Whether the lookahead token is of token_type."""
+        return self.current is not None and self.current.type == token_type
+
+    def program(self):
+        self.expect('PROGRAM')
+        name = self.expect('ID').value
+        self.expect('LBRACE')
+        statements = self.statements()
+        self.expect('RBRACE')
+        if self.current is not None:
+            raise self.error(self.current)
+        return Node('Program', (statements,), name)
+
+    def statements(self):
+        """Statements up to the first token that cannot start one.
+
+        An if or while pushes the block it opens on open_blocks, with the
+        statement list it belongs to, and the block's statements are read
+        by the same loop; the closing brace pops it.
+        """
+        parsers = self.statement_parsers
+        children = []
+        open_blocks = []
+        while True:
+            token = self.current
+            if token is not None and token.type in ('IF', 'WHILE'):
+                condition = self.condition()
+                self.expect('LBRACE')
+                open_blocks.append((token.type, condition, None, children))
+                children = []
+                continue
+            if token is not None and token.type in parsers:
+                children.append(parsers[token.type]())
+                continue
+
+            body = Node('Statements', children)
+            if not open_blocks:
+                return body
+            self.expect('RBRACE')
+            kind, condition, if_body, children = open_blocks.pop()
+            if kind == 'WHILE':
+                children.append(Node('While', (condition, body)))
+            elif kind == 'ELSE':
+                children.append(Node('IfElse', (condition, if_body, body)))
+            elif self.at('ELSE'):
+                self.skip()
+                self.expect('LBRACE')
+                open_blocks.append(('ELSE', condition, body, children))
+                children = []
+            else:
+                children.append(Node('If', (condition, body)))
+
+    def const_decl(self):
+        self.skip()
+        name = self.expect('ID').value
+        self.expect('ASSIGN')
+        token = self.advance()
+        if token.type not in CONSTANT_TOKENS:
+            raise self.error(token)
+        self.expect('SEMICOLON')
+        return Node('ConstDecl', (Node('ID', value=name), Node('Constant', value=token.value)))
+
+    def var_decl(self):
+        type_node = Node('Type', value=self.advance().value)
+        ids = self.id_list()
+        self.expect('SEMICOLON')
+        return Node('VarDecl', [type_node] + ids)
+
+    def id_list(self):
+        ids = [Node('ID', value=self.expect('ID').value)]
+        while self.at('COMMA'):
+            self.skip()
+            ids.append(Node('ID', value=self.expect('ID').value))
+        return ids
+
+    def break_statement(self):
+        self.skip()
+        self.expect('SEMICOLON')
+        return Node('Break')
+
+    def assignment(self):
+        name = self.advance().value
+        self.expect('ASSIGN')
+        value = self.expression()
+        self.expect('SEMICOLON')
+        return Node('Assignment', (Node('ID', value=name), value))
+
+    def condition(self):
+        self.skip()
+        self.expect('LPAREN')
+        condition = self.expression()
+        self.expect('RPAREN')
+        return condition
+
+    def print_statement(self):
+        self.skip()
+        self.expect('LPAREN')
+        values = [self.expression()]
+        while self.at('COMMA'):
+            self.skip()
+            values.append(self.expression())
+        self.expect('RPAREN')
+        self.expect('SEMICOLON')
+        return Node('Print', values)
+
+    def input_statement(self):
+        self.skip()
+        self.expect('LPAREN')
+        ids = self.id_list()
+        self.expect('RPAREN')
+        self.expect('SEMICOLON')
+        return Node('Input', ids)
+
+    def expression(self):
+        """Parse an expression by shunting operators, with a level per open parenthesis.
+
+        Each level has its operand and operator stacks and, as in the
+        grammar, a `!` that may only open the level and applies to its
+        first term. Operators leave the stack once one of the same or lower
+        binding power follows, so they group to the left.
+        """
+        powers = BINDING_POWERS if self.precedence else None
+        levels = []
+        operands, operators, negation = [], [], None
+        token = self.advance()
+        while True:
+            if token.type == 'OP_LOG' and not operands and negation is None:
+                negation = token
+                token = self.advance()
+                continue
+            if token.type == 'LPAREN':
+                levels.append((operands, operators, negation))
+                operands, operators, negation = [], [], None
+                token = self.advance()
+                continue
+            if token.type == 'ID':
+                term = Node('ID', value=token.value)
+            elif token.type in CONSTANT_TOKENS:
+                term = Node('Constant', value=token.value)
+            else:
+                raise self.error(token)
+
+            # A closing parenthesis makes the expression it ends a term of the
+            # enclosing level, which may be followed by an operator in turn
+            while True:
+                if negation is not None:
+                    term = Node('UnaryOp', (term,), negation.value)
+                    negation = None
+                operands.append(term)
+                token = self.current
+                if token is not None and token.type in OPERATOR_TOKENS:
+                    break
+                while operators:
+                    self.reduce(operands, operators)
+                if not levels:
+                    return operands[0]
+                self.expect('RPAREN')
+                term = operands[0]
+                operands, operators, negation = levels.pop()
+
+            self.skip()
+            power = powers[token.value] if powers else FLAT_BINDING_POWER
+            while operators and operators[-1][0] >= power:
+                self.reduce(operands, operators)
+            operators.append((power, token.value))
+            token = self.advance()
+
+    @staticmethod
+    def reduce(operands, operators):
+        """Replace the top two operands by the top operator applied to them."""
+        operator = operators.pop()[1]
+        right = operands.pop()
+        left = operands.pop()
+        operands.append(Node('BinaryOp', (left, right), operator))
+
+
+def make_parser(name='rd'):
+    """A parser by name, one of PARSER_NAMES."""
+    if name == 'ply':
+        parser = Parser(production=True)
+        parser.build()
+        return parser
+    if name == 'rd':
+        return RDParser()
+    raise ValueError(f"parser desconhecido: {name}")
+
+
+def same_tree(first, second):
+    """Whether two ASTs match node for node, including the types of values and child containers."""
+    stack = [(first, second)]
+    while stack:
+        a, b = stack.pop()
+        if a is None or b is None:
+            if a is not b:
+                return False
+            continue
+        if (a.type != b.type or type(a.value) is not type(b.value) or a.value != b.value
+                or type(a.children) is not type(b.children) or len(a.children) != len(b.children)):
+            return False
+        stack.extend(zip(a.children, b.children))
+    return True
+
+
+def differential_check(source, reference=None, precedence=False):
+    """Parse source with PLY and with RDParser; returns None when they agree, else what differs."""
+    reference = reference or Parser(production=True)
+    expected_ast, expected_errors = reference.parse(source)
+    expected_errors = list(expected_errors)
+    ast, errors = RDParser(precedence).parse(source)
+    # PLY carries on after the first error and may report more
+    if expected_errors[:1] != errors[:1]:
+        return f"erros diferentes: PLY {expected_errors[:1]}, RD {errors[:1]}"
+    if not expected_errors and not same_tree(expected_ast, ast):
+        return "ASTs diferentes"
+    return None
+
+
+def main():
+    from benchmark import ProgramGenerator
+
+    arg_parser = argparse.ArgumentParser(
+        description="Compara o parser descendente recursivo com o parser PLY de referência")
+    arg_parser.add_argument('inputs', nargs='*', metavar='arquivo_entrada')
+    arg_parser.add_argument('--synthetic', type=int, default=0, metavar='N',
+                            help="compara também N programas sintéticos e variações com um caractere removido")
+    arg_parser.add_argument('--seed', type=int, default=0, help="semente dos programas sintéticos")
+    args = arg_parser.parse_args()
+
+    reference = Parser(production=True)
+    cases = []
+    for path in args.inputs:
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                cases.append((path, file.read(), False))
+        except FileNotFoundError:
+            print(f"Erro: Arquivo '{path}' não encontrado")
+            sys.exit(1)
+    rng = random.Random(args.seed)
+    for i in range(args.synthetic):
+        source = ProgramGenerator(statements=rng.randint(1, 300), depth=rng.randint(0, 5),
+                                  declarations=rng.randint(1, 30), expression_depth=rng.randint(0, 5),
+                                  seed=args.seed + i).generate()
+        # Fully parenthesized, so operator precedence cannot change the tree
+        cases.append((f"sintético {i}", source, True))
+        for j in range(5):
+            cut = rng.randrange(len(source))
+            cases.append((f"sintético {i}, variação {j}", source[:cut] + source[cut + 1:], False))
+
+    differences = 0
+    for name, source, parenthesized in cases:
+        for precedence in ((False, True) if parenthesized else (False,)):
+            problem = differential_check(source, reference, precedence)
+            if problem:
+                differences += 1
+                print(f"{name}{' (com precedência)' if precedence else ''}: {problem}")
+    print(f"{len(cases)} programas comparados, {differences} divergências")
+    if differences:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
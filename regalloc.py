@@ -0,0 +1,117 @@
+from cfg import build_cfg, definition, liveness, uses
+from tac_ir import JUMP_OPS, Op
+
+# Registers the generated code never uses as scratch (that is eax, ecx and
+# edx) and the runtime routines preserve
+ALLOCATABLE_REGISTERS = ('ebx', 'esi', 'edi', 'ebp')
+
+# Each loop level multiplies the spill cost of an access by this much
+LOOP_WEIGHT = 10
+
+
+class Interval:
+    """The positions, in TAC order, over which a name must keep its value."""
+    __slots__ = ('name', 'start', 'end', 'weight', 'register')
+
+    def __init__(self, name, position):
+        self.name = name
+        self.start = position
+        self.end = position
+        self.weight = 0
+        self.register = None
+
+    def __repr__(self):
+        return f"Interval({self.name!r}, {self.start}, {self.end}, {self.register})"
+
+
+def loop_depths(code):
+    """Loop nesting depth of every instruction; a loop spans a label and a backward jump to it."""
+    labels = {quad.result: i for i, quad in enumerate(code) if quad.op is Op.LABEL}
+    delta = [0] * (len(code) + 1)
+    for i, quad in enumerate(code):
+        if quad.op in JUMP_OPS and labels[quad.result] < i:
+            delta[labels[quad.result]] += 1
+            delta[i + 1] -= 1
+    depths = []
+    depth = 0
+    for i in range(len(code)):
+        depth += delta[i]
+        depths.append(depth)
+    return depths
+
+
+def live_intervals(code, candidates):
+    """Intervals of the candidate names, widened by liveness to cover whole loops.
+
+    A name live into the entry block is read before any assignment and
+    keeps the zero of its memory slot, so it gets no interval.
+    """
+    blocks = build_cfg(code)
+    live_in, live_out = liveness(blocks)
+    depths = loop_depths(code)
+    intervals = {}
+
+    def extend(name, position):
+        interval = intervals.get(name)
+        if interval is None:
+            intervals[name] = interval = Interval(name, position)
+        else:
+            interval.start = min(interval.start, position)
+            interval.end = max(interval.end, position)
+        return interval
+
+    position = 0
+    for block in blocks:
+        first = position
+        for name in live_in[block.index]:
+            if name in candidates:
+                extend(name, first)
+        for quad in block.quads:
+            names = uses(quad)
+            name = definition(quad)
+            if name is not None:
+                names.append(name)
+            for name in names:
+                if name in candidates:
+                    extend(name, position).weight += LOOP_WEIGHT ** min(depths[position], 6)
+            position += 1
+        for name in live_out[block.index]:
+            if name in candidates:
+                extend(name, position - 1)
+
+    if blocks:
+        for name in live_in[0]:
+            intervals.pop(name, None)
+    return sorted(intervals.values(), key=lambda interval: (interval.start, interval.end))
+
+
+def linear_scan(intervals, registers=ALLOCATABLE_REGISTERS):
+    """Assign registers to intervals; returns {name: register} for those that got one.
+
+    When every register is taken, the interval with the lowest spill cost
+    (accesses weighted by loop depth) among the active ones and the new
+    one stays in memory.
+    """
+    free = list(reversed(registers))
+    active = []
+    for interval in intervals:
+        for old in [old for old in active if old.end < interval.start]:
+            active.remove(old)
+            free.append(old.register)
+        if free:
+            interval.register = free.pop()
+            active.append(interval)
+            continue
+        victim = min(active, key=lambda old: old.weight)
+        if victim.weight < interval.weight:
+            interval.register = victim.register
+            victim.register = None
+            active.remove(victim)
+            active.append(interval)
+    return {interval.name: interval.register for interval in intervals if interval.register}
+
+
+def allocate_registers(code, types, registers=ALLOCATABLE_REGISTERS):
+    """Registers for the integer, boolean and string names of code; floats stay in memory."""
+    candidates = {name for name, vtype in types.items() if vtype != 'float'}
+    return linear_scan(live_intervals(code, candidates), registers)
@@ -0,0 +1,208 @@
+import argparse
+import io
+import json
+import logging
+import os
+import socketserver
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from batch import compile_in_worker, init_worker
+from parser import write_ast_jsonl
+from rd_parser import PARSER_NAMES
+from tac_generator import TARGETS
+
+logger = logging.getLogger(__name__)
+
+# Parts of the result a request gets when it does not list them
+DEFAULT_OUTPUTS = ('tac', 'asm')
+
+
+def compile_request(request):
+    """Compile one request, in a worker set up by batch.init_worker, and return its response.
+
+    A request holds the program in `source` (or a file name in `path`);
+    `optimize` (default true), `target` (default 'x86') and `outputs`, a
+    subset of ast, tac and asm (default tac and asm), are optional. The
+    response echoes `id` and has `ok`, `errors`, `cached`, `seconds` and
+    the outputs asked for: the TAC as a list of lines, the assembly as a
+    string and the AST as JSON lines, as write_ast_jsonl writes them.
+    """
+    response = {'id': request.get('id'), 'ok': False, 'errors': []}
+    start = time.perf_counter()
+    try:
+        target = request.get('target', 'x86')
+        if target not in TARGETS:
+            raise ValueError(f"arquitetura desconhecida: {target}")
+        source = request.get('source')
+        if source is None:
+            with open(request['path'], 'r', encoding='utf-8') as file:
+                source = file.read()
+        result = compile_in_worker(source, request.get('optimize', True), target)
+    except KeyError:
+        response['errors'] = ["Requisição sem 'source' nem 'path'"]
+        return response
+    except Exception as e:
+        response['errors'] = [f"Erro durante a execução: {str(e)}"]
+        return response
+
+    outputs = request.get('outputs', DEFAULT_OUTPUTS)
+    response['ok'] = not result.errors
+    response['errors'] = result.errors
+    response['cached'] = result.cached
+    if not result.errors:
+        if 'tac' in outputs:
+            response['tac'] = [str(quad) for quad in result.tac]
+        if 'asm' in outputs:
+            response['asm'] = result.asm
+        if 'ast' in outputs:
+            buffer = io.StringIO()
+            write_ast_jsonl(result.ast, buffer)
+            response['ast'] = buffer.getvalue()
+    response['seconds'] = time.perf_counter() - start
+    return response
+
+
+class CompileServer:
+    """Answers compile requests, one JSON object per line, on a pool of warmed-up workers.
+
+    Responses are written as their compilations finish, so they may come
+    out of order; requests pair them up through `id`. Two commands are
+    answered without compiling: {"command": "ping"} and {"command":
+    "shutdown"}, which stops the server once running requests finish.
+    """
+
+    def __init__(self, jobs=None, cache_dir=None, cache_size=None, parser='rd'):
+        if jobs == 1:
+            # Compile in this process, on one thread so the parser is never shared
+            init_worker(cache_dir, cache_size, parser=parser)
+            self.executor = ThreadPoolExecutor(max_workers=1)
+        else:
+            self.executor = ProcessPoolExecutor(max_workers=jobs or os.cpu_count() or 1,
+                                                initializer=init_worker,
+                                                initargs=(cache_dir, cache_size, True, 'x86', parser))
+        self.stopping = threading.Event()
+        self.on_shutdown = None
+
+    def handle_line(self, line, respond):
+        """Start the request on line; respond(response) is called when it is done."""
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("a requisição deve ser um objeto JSON")
+        except ValueError as e:
+            respond({'id': None, 'ok': False, 'errors': [f"Requisição inválida: {e}"]})
+            return
+        command = request.get('command')
+        if command == 'ping':
+            respond({'id': request.get('id'), 'ok': True})
+        elif command == 'shutdown':
+            respond({'id': request.get('id'), 'ok': True})
+            self.stopping.set()
+            if self.on_shutdown is not None:
+                self.on_shutdown()
+        elif command is not None:
+            respond({'id': request.get('id'), 'ok': False, 'errors': [f"Comando desconhecido: {command}"]})
+        else:
+            logger.debug("Request %r", request.get('id'))
+            future = self.executor.submit(compile_request, request)
+            future.add_done_callback(lambda done: respond(self.response_of(done, request)))
+
+    @staticmethod
+    def response_of(future, request):
+        try:
+            return future.result()
+        except Exception as e:
+            # The worker itself failed, for instance killed
+            return {'id': request.get('id'), 'ok': False, 'errors': [f"Erro durante a execução: {str(e)}"]}
+
+    def serve_stream(self, input_stream, output_stream):
+        """Read requests from input_stream until it ends or a shutdown command, answering on output_stream."""
+        lock = threading.Lock()
+
+        def respond(response):
+            with lock:
+                output_stream.write(json.dumps(response) + "\n")
+                output_stream.flush()
+
+        for line in input_stream:
+            if line.strip():
+                self.handle_line(line, respond)
+            if self.stopping.is_set():
+                break
+        self.executor.shutdown(wait=True)
+
+    def serve_socket(self, path):
+        """Listen on a Unix socket at path; each connection may send any number of requests."""
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                lock = threading.Lock()
+                pending = threading.Semaphore(0)
+                started = 0
+
+                def respond(response):
+                    with lock:
+                        try:
+                            self.wfile.write((json.dumps(response) + "\n").encode('utf-8'))
+                            self.wfile.flush()
+                        except OSError:
+                            logger.debug("Client went away before response %r", response.get('id'))
+                    pending.release()
+
+                for line in self.rfile:
+                    if line.strip():
+                        started += 1
+                        server.handle_line(line.decode('utf-8'), respond)
+                # Keep the connection open until every answer is written
+                for _ in range(started):
+                    pending.acquire()
+
+        if os.path.exists(path):
+            os.unlink(path)
+        with socketserver.ThreadingUnixStreamServer(path, Handler) as unix_server:
+            unix_server.daemon_threads = True
+            # shutdown() waits for serve_forever, so it cannot run on the handler's thread
+            self.on_shutdown = lambda: threading.Thread(target=unix_server.shutdown).start()
+            try:
+                unix_server.serve_forever()
+            finally:
+                os.unlink(path)
+                self.executor.shutdown(wait=True)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(
+        description="Servidor de compilação LPMS: mantém o compilador carregado e responde a "
+                    "requisições JSON (uma por linha) pela entrada padrão ou por um socket Unix")
+    arg_parser.add_argument('--socket', metavar='CAMINHO',
+                            help="escuta no socket Unix CAMINHO em vez da entrada padrão")
+    arg_parser.add_argument('-j', '--jobs', type=int, default=None,
+                            help="número de processos de compilação (padrão: número de CPUs)")
+    arg_parser.add_argument('--parser', choices=PARSER_NAMES, default='rd',
+                            help="parser usado: rd ou ply (padrão: rd)")
+    arg_parser.add_argument('--cache-dir', metavar='DIR', help="usa o cache de compilação em DIR")
+    arg_parser.add_argument('--cache-size', type=int, default=256, metavar='MB',
+                            help="tamanho máximo do cache (padrão: 256 MB)")
+    arg_parser.add_argument('-v', '--verbose', action='store_true',
+                            help="exibe mensagens de depuração em stderr")
+    args = arg_parser.parse_args()
+    if args.verbose:
+        logging.basicConfig(level=logging.DEBUG, format="%(levelname)s: %(message)s")
+
+    server = CompileServer(args.jobs, args.cache_dir, args.cache_size * 1024 * 1024, args.parser)
+    if args.socket:
+        print(f"Servidor de compilação ouvindo em {args.socket}", file=sys.stderr)
+        try:
+            server.serve_socket(args.socket)
+        except KeyboardInterrupt:
+            pass
+    else:
+        server.serve_stream(sys.stdin, sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,52 @@
-from parser import Parser
+import argparse
+import logging
+
+from asm64_generator import ASM64Generator
+from asm_generator import ASMGenerator
+from optimizer import optimize as optimize_tac
+from rd_parser import PARSER_NAMES, RDParser, make_parser
+from tac_ir import BINARY_OPS, BRANCH_OPS, COMPARISON_OPS, NEGATED_COMPARISONS, Const, Op, Quad
+
+logger = logging.getLogger(__name__)
+
+# Assembly generator of each target architecture
+TARGETS = {'x86': ASMGenerator, 'x64': ASM64Generator}
 
 class TACGenerator:
+    """Translates an AST into TAC.
+
+    The tree is walked with an explicit work stack instead of recursion, so
+    nesting depth is only bounded by memory. Each gen_* method, found
+    through a dispatch table built once per generator, emits what it can
+    right away and pushes the rest as (handler, argument) work items, in
+    reverse order of execution. Expressions leave their result operand on
+    the value stack, where the handler that pushed them picks it up.
+    """
+
     def __init__(self):
         self.tac = []
         self.temp_count = 0
         self.label_count = 0
         self.loop_end_label = None
         self.symbol_table = {}
+        self.work = []
+        self.values = []
+        self.dispatch = {
+            'Program': self.gen_program,
+            'ConstDecl': self.gen_constdecl,
+            'VarDecl': self.gen_vardecl,
+            'Assignment': self.gen_assignment,
+            'BinaryOp': self.gen_binaryop,
+            'UnaryOp': self.gen_unaryop,
+            'Input': self.gen_input,
+            'Print': self.gen_print,
+            'IfElse': self.gen_ifelse,
+            'While': self.gen_while,
+            'If': self.gen_if,
+            'Constant': self.gen_constant,
+            'ID': self.gen_id,
+            'Break': self.gen_break,
+        }
 
     def new_temp(self):
         temp = f"t{self.temp_count}"
@@ -19,155 +59,363 @@ class TACGenerator:
         return label
 
     def generate(self, node):
-        method_name = f"gen_{node.type.lower()}"
-        method = getattr(self, method_name, self.gen_default)
-        return method(node)
+        """Generate the TAC of node; for an expression, returns the operand holding its value."""
+        work = self.work = [(self.handler(node), node)]
+        values = self.values = []
+        while work:
+            handler, argument = work.pop()
+            handler(argument)
+        return values.pop() if values else None
+
+    def handler(self, node):
+        return self.dispatch.get(node.type, self.gen_default)
+
+    def push_statements(self, nodes):
+        dispatch = self.dispatch
+        self.work.extend((dispatch.get(node.type, self.gen_default), node) for node in reversed(nodes))
 
     def gen_default(self, node):
-        for child in node.children:
-            self.generate(child)
+        self.push_statements(node.children)
 
     def gen_program(self, node):
-        for child in node.children:
-            self.generate(child)
+        self.work.append((self.log_program, node))
+        self.push_statements(node.children)
+
+    def log_program(self, node):
+        logger.debug("Generated %d TAC instructions for program %s", len(self.tac), node.value)
+
+    def emit(self, quad):
+        self.tac.append(quad)
 
     def gen_constdecl(self, node):
         id_node, value_node = node.children
         self.symbol_table[id_node.value] = "const"
-        self.tac.append(f"{id_node.value} = {value_node.value}")
+        self.tac.append(Quad(Op.ASSIGN, id_node.value, Const(value_node.value)))
 
     def gen_vardecl(self, node):
         type_node = node.children[0]
         var_type = type_node.value
         for id_node in node.children[1:]:
             self.symbol_table[id_node.value] = var_type
-            self.tac.append(f"{id_node.value} = 0  # type: {var_type}")
+            self.tac.append(Quad(Op.ASSIGN, id_node.value, Const(0), vtype=var_type))
 
     def gen_assignment(self, node):
         id_node, expr_node = node.children
-        expr = self.generate(expr_node)
-        var_type = self.symbol_table.get(id_node.value, "unknown")
-        self.tac.append(f"{id_node.value} = {expr}  # type: {var_type}")
+        value = self.operand(expr_node)
+        if value is not None:
+            var_type = self.symbol_table.get(id_node.value, "unknown")
+            self.tac.append(Quad(Op.ASSIGN, id_node.value, value, vtype=var_type))
+            return
+        self.work.append((self.emit_assignment, id_node.value))
+        self.work.append((self.handler(expr_node), expr_node))
+
+    def emit_assignment(self, name):
+        var_type = self.symbol_table.get(name, "unknown")
+        self.tac.append(Quad(Op.ASSIGN, name, self.values.pop(), vtype=var_type))
+
+    def operand(self, node):
+        """The operand of an ID or constant node, which needs no work item; None for other nodes."""
+        if node.type == 'ID':
+            return node.value
+        if node.type == 'Constant':
+            return Const(node.value)
+        return None
 
     def gen_binaryop(self, node):
-        left = self.generate(node.children[0])
-        right = self.generate(node.children[1])
+        left, right = node.children
+        op = BINARY_OPS[node.value]
+        work = self.work
+        left_value = self.operand(left)
+        if left_value is None:
+            work.append((self.emit_binaryop, op))
+            work.append((self.handler(right), right))
+            work.append((self.handler(left), left))
+            return
+        right_value = self.operand(right)
+        if right_value is None:
+            # Nothing runs before the right operand, so the left one can go on the value stack now
+            self.values.append(left_value)
+            work.append((self.emit_binaryop, op))
+            work.append((self.handler(right), right))
+            return
         temp = self.new_temp()
-        self.tac.append(f"{temp} = {left} {node.value} {right}")
-        return temp
+        self.tac.append(Quad(op, temp, left_value, right_value))
+        self.values.append(temp)
+
+    def emit_binaryop(self, op):
+        values = self.values
+        right = values.pop()
+        left = values.pop()
+        temp = self.new_temp()
+        self.tac.append(Quad(op, temp, left, right))
+        values.append(temp)
+
+    def gen_unaryop(self, node):
+        operand = node.children[0]
+        self.work.append((self.emit_not, None))
+        self.work.append((self.handler(operand), operand))
+
+    def emit_not(self, _):
+        temp = self.new_temp()
+        self.tac.append(Quad(Op.NOT, temp, self.values.pop()))
+        self.values.append(temp)
 
     def gen_input(self, node):
         for id_node in node.children:
             var_type = self.symbol_table.get(id_node.value, "unknown")
-            self.tac.append(f"input {id_node.value}  # type: {var_type}")
+            self.tac.append(Quad(Op.INPUT, id_node.value, vtype=var_type))
 
     def gen_print(self, node):
-     for arg in node.children:
-        temp = self.generate(arg)
-        self.tac.append(f"param {temp}")
-        self.tac.append(f"call print {temp}")
+        work = self.work
+        for arg in reversed(node.children):
+            work.append((self.emit_print, None))
+            work.append((self.handler(arg), arg))
+
+    def emit_print(self, _):
+        temp = self.values.pop()
+        self.tac.append(Quad(Op.PARAM, arg1=temp))
+        self.tac.append(Quad(Op.PRINT, arg1=temp))
+
+    def gen_branch(self, branch):
+        """Jump to label when the condition node is true (jump_if) or false (not jump_if).
+
+        branch is a (node, label, jump_if) tuple. Comparisons become a
+        single compare-and-branch instead of a 0/1 temporary tested
+        afterwards, and `!` just flips the jump sense.
+        """
+        node, label, jump_if = branch
+        while node.type == 'UnaryOp':
+            node = node.children[0]
+            jump_if = not jump_if
+        work = self.work
+        if node.type == 'BinaryOp' and BINARY_OPS[node.value] in COMPARISON_OPS:
+            op = BINARY_OPS[node.value]
+            if not jump_if:
+                op = NEGATED_COMPARISONS[op]
+            left, right = node.children
+            work.append((self.emit_compare_branch, (BRANCH_OPS[op], label)))
+            work.append((self.handler(right), right))
+            work.append((self.handler(left), left))
+            return
+        work.append((self.emit_test_branch, (label, jump_if)))
+        work.append((self.handler(node), node))
+
+    def emit_compare_branch(self, branch):
+        op, label = branch
+        right = self.values.pop()
+        left = self.values.pop()
+        self.tac.append(Quad(op, label, left, right))
+
+    def emit_test_branch(self, branch):
+        label, jump_if = branch
+        value = self.values.pop()
+        if jump_if:
+            self.tac.append(Quad(Op.IF_NE, label, value, Const(0)))
+        else:
+            self.tac.append(Quad(Op.IF_NOT, label, value))
 
     def gen_ifelse(self, node):
         condition, if_body, else_body = node.children
-        cond = self.generate(condition)
         label_else = self.new_label()
         label_end = self.new_label()
-        self.tac.append(f"if not {cond} goto {label_else}")
-        self.generate(if_body)
-        self.tac.append(f"goto {label_end}")
-        self.tac.append(f"label {label_else}")
-        self.generate(else_body)
-        self.tac.append(f"label {label_end}")
+        self.work.extend((
+            (self.emit, Quad(Op.LABEL, label_end)),
+            (self.handler(else_body), else_body),
+            (self.emit, Quad(Op.LABEL, label_else)),
+            (self.emit, Quad(Op.GOTO, label_end)),
+            (self.handler(if_body), if_body),
+            (self.gen_branch, (condition, label_else, False)),
+        ))
 
     def gen_while(self, node):
+        # The guard sits after the body, so each iteration runs a single
+        # conditional jump back to the top
         condition, body = node.children
-        label_start = self.new_label()
+        label_body = self.new_label()
+        label_condition = self.new_label()
         label_end = self.new_label()
         prev_loop_end = self.loop_end_label
         self.loop_end_label = label_end
 
-        self.tac.append(f"label {label_start}")
-        cond = self.generate(condition)
-        self.tac.append(f"if not {cond} goto {label_end}")
-        self.generate(body)
-        self.tac.append(f"goto {label_start}")
-        self.tac.append(f"label {label_end}")
-
+        self.tac.append(Quad(Op.GOTO, label_condition))
+        self.tac.append(Quad(Op.LABEL, label_body))
+        self.work.extend((
+            (self.end_loop, prev_loop_end),
+            (self.emit, Quad(Op.LABEL, label_end)),
+            (self.gen_branch, (condition, label_body, True)),
+            (self.emit, Quad(Op.LABEL, label_condition)),
+            (self.handler(body), body),
+        ))
+
+    def end_loop(self, prev_loop_end):
         self.loop_end_label = prev_loop_end
 
     def gen_if(self, node):
         condition, if_body = node.children
-        cond = self.generate(condition)
         label_end = self.new_label()
-        self.tac.append(f"if not {cond} goto {label_end}")
-        self.generate(if_body)
-        self.tac.append(f"label {label_end}")
+        self.work.extend((
+            (self.emit, Quad(Op.LABEL, label_end)),
+            (self.handler(if_body), if_body),
+            (self.gen_branch, (condition, label_end, False)),
+        ))
 
     def gen_constant(self, node):
-        return str(node.value)
+        self.values.append(Const(node.value))
 
     def gen_id(self, node):
-        return node.value
+        self.values.append(node.value)
 
     def gen_break(self, node):
         if self.loop_end_label:
-            self.tac.append(f"goto {self.loop_end_label}")
+            self.tac.append(Quad(Op.GOTO, self.loop_end_label))
         else:
             raise ValueError("'break' statement not inside a loop")
 
     def save_tac(self, filename='intermediate.tac'):
         """Salva o código TAC em um arquivo"""
-        with open(filename, 'w') as file:
-            for line in self.tac:
-                file.write(line + '\n')
-        return filename
-
-def main():
-    import sys
+        return write_tac(self.tac, filename)
+
+def write_tac(tac, filename='intermediate.tac'):
+    with open(filename, 'w') as file:
+        for quad in tac:
+            file.write(f"{quad}\n")
+    return filename
+
+class CompileResult:
+    """Output of compile_source(). The AST of a cache hit is decoded on first access."""
+    __slots__ = ('tac', 'asm', 'errors', 'cached', '_ast', '_ast_loader')
+
+    def __init__(self, ast, tac, asm, errors, cached=False, ast_loader=None):
+        self._ast = ast
+        self._ast_loader = ast_loader
+        self.tac = tac
+        self.asm = asm
+        self.errors = errors
+        self.cached = cached
+
+    @property
+    def ast(self):
+        if self._ast_loader is not None:
+            self._ast = self._ast_loader()
+            self._ast_loader = None
+        return self._ast
+
+def compile_source(source, parser=None, cache=None, optimize=True, pass_stats=None, target='x86'):
+    """Parse a source string or text file and generate its TAC and assembly.
+
+    With optimize the TAC goes through the optimizer passes before code
+    generation; pass_stats, if a list, receives the instruction counts
+    before and after each pass. target names the assembly generator in
+    TARGETS. parser defaults to an RDParser; its mode is part of the cache
+    key, as parsers may group operators differently. With a
+    CompilationCache, a hit returns the stored result without running the
+    parser or either generator.
+    """
+    generator_class = TARGETS[target]
+    if parser is None:
+        parser = RDParser()
+    if cache is not None:
+        key = cache.key(source, {'optimize': optimize, 'target': target, 'parser': parser.mode})
+        entry = cache.get(key)
+        if entry is not None:
+            ast_loader, tac, asm_code, errors = entry
+            return CompileResult(None, tac, asm_code, errors, cached=True, ast_loader=ast_loader)
+
+    ast, errors = parser.parse(source)
+    errors = list(errors)
+    tac = []
+    asm_code = None
+    if not errors:
+        generator = TACGenerator()
+        generator.generate(ast)
+        tac = generator.tac
+        if optimize:
+            tac = optimize_tac(tac, pass_stats)
+        asm_code = generator_class(allocate_registers=optimize, optimize_peephole=optimize).generate_asm(tac)
 
-    if len(sys.argv) < 2:
-        print("Uso: python script.py <arquivo_entrada>")
-        return
+    if cache is not None:
+        cache.put(key, ast, tac, asm_code, errors)
+    return CompileResult(ast, tac, asm_code, errors)
 
-    input_file = sys.argv[1]
+def main():
+    arg_parser = argparse.ArgumentParser(
+        description="Gera o TAC (intermediate.tac) e o Assembly (output.asm) de um programa LPMS")
+    arg_parser.add_argument('input_file', metavar='arquivo_entrada')
+    arg_parser.add_argument('-v', '--verbose', action='store_true',
+                            help="exibe mensagens de depuração e o TAC gerado")
+    arg_parser.add_argument('-O', dest='opt_level', type=int, choices=(0, 1), default=1,
+                            help="nível de otimização do TAC (0 desativa; padrão: 1)")
+    arg_parser.add_argument('--pass-stats', action='store_true',
+                            help="mostra o número de instruções TAC antes e depois de cada passe")
+    arg_parser.add_argument('--target', choices=sorted(TARGETS), default='x86',
+                            help="arquitetura do Assembly: x86 (32 bits) ou x64 (64 bits); padrão: x86")
+    arg_parser.add_argument('--parser', choices=PARSER_NAMES, default='rd',
+                            help="parser usado: rd (descendente recursivo) ou ply (gramática de "
+                                 "referência), que geram a mesma AST; padrão: rd")
+    arg_parser.add_argument('--stats', action='store_true',
+                            help="mostra tempo, pico de memória e tamanho do resultado de cada etapa "
+                                 "(sem usar o cache)")
+    arg_parser.add_argument('--profile', action='store_true',
+                            help="como --stats, e mostra as funções mais custosas de cada etapa (cProfile)")
+    arg_parser.add_argument('--cache-dir', metavar='DIR',
+                            help="reaproveita AST, TAC e Assembly de compilações anteriores")
+    arg_parser.add_argument('--cache-size', type=int, default=256, metavar='MB',
+                            help="tamanho máximo do cache (padrão: 256 MB)")
+    args = arg_parser.parse_args()
+    input_file = args.input_file
+    if args.verbose:
+        logging.basicConfig(level=logging.DEBUG, format="%(levelname)s: %(message)s")
 
     try:
-        # Lê o código fonte
-        with open(input_file, "r") as file:
-            source_code = file.read()
+        cache = None
+        if args.cache_dir:
+            from compile_cache import CompilationCache
+            cache = CompilationCache(args.cache_dir, args.cache_size * 1024 * 1024)
 
-        # Faz o parsing
-        parser = Parser()
-        ast, errors = parser.parse(source_code)
+        parser = make_parser(args.parser)
 
-        if errors:
+        # Faz o parsing e gera TAC e Assembly
+        with open(input_file, "r") as file:
+            pass_stats = [] if args.pass_stats else None
+            stats = None
+            if args.stats or args.profile:
+                from instrumentation import instrumented_compile
+                result, stats = instrumented_compile(file, parser=parser, optimize=args.opt_level > 0, target=args.target,
+                                                     pass_stats=pass_stats, profile=args.profile)
+            else:
+                result = compile_source(file, parser=parser, cache=cache, optimize=args.opt_level > 0,
+                                        pass_stats=pass_stats, target=args.target)
+
+        if stats is not None:
+            print("Estatísticas por etapa:")
+            print(stats.report())
+            if args.profile:
+                print()
+                print(stats.profile_report())
+
+        if result.errors:
             print("Erros durante o parsing:")
-            print("\n".join(errors))
+            print("\n".join(result.errors))
             return
+        if result.cached:
+            print("Resultado obtido do cache de compilação")
 
-        # Gera o código TAC
-        generator = TACGenerator()
-        generator.generate(ast)
+        if pass_stats:
+            print("\nInstruções TAC por passe de otimização:")
+            for name, before, after in pass_stats:
+                print(f"  {name:<26} {before:>6} -> {after:>6}")
 
         # Salva o TAC em um arquivo
-        tac_filename = generator.save_tac()
+        tac_filename = write_tac(result.tac)
         print(f"\nCódigo intermediário (TAC) gerado em {tac_filename}")
 
-        # Mostra o TAC no console
-        print("\nCódigo Intermediário (TAC):")
-        for line in generator.tac:
-            print(line)
-
-        # Importa e usa o ASMGenerator
-        from asm_generator import ASMGenerator
-
-        # Gera o código Assembly
-        asm_generator = ASMGenerator()
-        asm_code = asm_generator.generate_asm(generator.tac)
+        # Mostra o TAC no console (apenas com -v)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Código Intermediário (TAC):\n%s", "\n".join(map(str, result.tac)))
 
         # Salva o código Assembly
         with open('output.asm', 'w') as file:
-            file.write(asm_code)
+            file.write(result.asm)
         print("\nCódigo Assembly gerado em output.asm")
 
     except FileNotFoundError:
@@ -0,0 +1,230 @@
+from enum import IntEnum
+
+
+class Op(IntEnum):
+    """Opcodes of the three-address code shared by the generators."""
+    ASSIGN = 0      # result = arg1
+    ADD = 1         # result = arg1 + arg2
+    SUB = 2
+    MUL = 3
+    DIV = 4
+    LT = 5          # result = arg1 < arg2  (1 or 0)
+    LE = 6
+    GT = 7
+    GE = 8
+    EQ = 9
+    NE = 10
+    NOT = 11        # result = !arg1
+    IF_NOT = 12     # if not arg1 goto result
+    GOTO = 13       # goto result
+    LABEL = 14      # label result
+    PARAM = 15      # param arg1
+    PRINT = 16      # call print arg1
+    INPUT = 17      # input result
+    IF_LT = 18      # if arg1 < arg2 goto result
+    IF_LE = 19
+    IF_GT = 20
+    IF_GE = 21
+    IF_EQ = 22
+    IF_NE = 23
+
+
+BINARY_OPS = {
+    '+': Op.ADD, '-': Op.SUB, '*': Op.MUL, '/': Op.DIV,
+    '<': Op.LT, '<=': Op.LE, '>': Op.GT, '>=': Op.GE, '==': Op.EQ, '!=': Op.NE,
+}
+SYMBOLS = {op: symbol for symbol, op in BINARY_OPS.items()}
+ARITHMETIC_OPS = frozenset((Op.ADD, Op.SUB, Op.MUL, Op.DIV))
+COMPARISON_OPS = frozenset((Op.LT, Op.LE, Op.GT, Op.GE, Op.EQ, Op.NE))
+# Instructions that write the name in `result`
+DEFINING_OPS = ARITHMETIC_OPS | COMPARISON_OPS | {Op.ASSIGN, Op.NOT, Op.INPUT}
+# Compare-and-branch opcode of each comparison, and back
+BRANCH_OPS = {Op.LT: Op.IF_LT, Op.LE: Op.IF_LE, Op.GT: Op.IF_GT,
+              Op.GE: Op.IF_GE, Op.EQ: Op.IF_EQ, Op.NE: Op.IF_NE}
+BRANCH_COMPARISONS = {branch: op for op, branch in BRANCH_OPS.items()}
+# The comparison that holds exactly when the key does not
+NEGATED_COMPARISONS = {Op.LT: Op.GE, Op.LE: Op.GT, Op.GT: Op.LE,
+                       Op.GE: Op.LT, Op.EQ: Op.NE, Op.NE: Op.EQ}
+# Instructions that may transfer control to the label in `result`
+JUMP_OPS = frozenset((Op.GOTO, Op.IF_NOT, *BRANCH_COMPARISONS))
+
+
+class Const:
+    """A literal operand. Plain strings are variable or temporary names."""
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __str__(self):
+        return str(self.value)
+
+    def __repr__(self):
+        return f"Const({self.value!r})"
+
+    def __eq__(self, other):
+        return (isinstance(other, Const) and type(self.value) is type(other.value)
+                and self.value == other.value)
+
+    def __hash__(self):
+        return hash((type(self.value), self.value))
+
+    def __getstate__(self):
+        return self.value
+
+    def __setstate__(self, value):
+        self.value = value
+
+
+class Quad:
+    """One TAC instruction: opcode, result, two arguments and the declared type.
+
+    For jumps and labels `result` holds the label name.
+    """
+    __slots__ = ('op', 'result', 'arg1', 'arg2', 'vtype')
+
+    def __init__(self, op, result=None, arg1=None, arg2=None, vtype=None):
+        self.op = op
+        self.result = result
+        self.arg1 = arg1
+        self.arg2 = arg2
+        self.vtype = vtype
+
+    def __getstate__(self):
+        return (self.op, self.result, self.arg1, self.arg2, self.vtype)
+
+    def __setstate__(self, state):
+        self.op, self.result, self.arg1, self.arg2, self.vtype = state
+
+    def __repr__(self):
+        return f"Quad({self.op.name}, {self.result!r}, {self.arg1!r}, {self.arg2!r}, {self.vtype!r})"
+
+    def __str__(self):
+        """The textual TAC form, as written by save_tac()."""
+        op = self.op
+        if op is Op.ASSIGN:
+            text = f"{self.result} = {self.arg1}"
+        elif op in SYMBOLS:
+            text = f"{self.result} = {self.arg1} {SYMBOLS[op]} {self.arg2}"
+        elif op is Op.NOT:
+            text = f"{self.result} = !{self.arg1}"
+        elif op is Op.IF_NOT:
+            return f"if not {self.arg1} goto {self.result}"
+        elif op in BRANCH_COMPARISONS:
+            return f"if {self.arg1} {SYMBOLS[BRANCH_COMPARISONS[op]]} {self.arg2} goto {self.result}"
+        elif op is Op.GOTO:
+            return f"goto {self.result}"
+        elif op is Op.LABEL:
+            return f"label {self.result}"
+        elif op is Op.PARAM:
+            return f"param {self.arg1}"
+        elif op is Op.PRINT:
+            return f"call print {self.arg1}"
+        else:
+            text = f"input {self.result}"
+        if self.vtype:
+            text += f"  # type: {self.vtype}"
+        return text
+
+
+def const_type(value):
+    if isinstance(value, bool):
+        return 'bool'
+    if isinstance(value, int):
+        return 'int'
+    if isinstance(value, float):
+        return 'float'
+    return 'str'
+
+
+def truth(value):
+    """Whether a constant counts as true in a condition.
+
+    Strings always do, as the machine code tests their address; numbers
+    when they are not zero.
+    """
+    return isinstance(value, str) or value != 0
+
+
+def evaluate(op, left, right=None):
+    """Compute an arithmetic, comparison or NOT instruction on Python values.
+
+    Integer division truncates toward zero and comparisons yield 1 or 0,
+    matching the generated machine code.
+    """
+    if op is Op.ADD:
+        return left + right
+    if op is Op.SUB:
+        return left - right
+    if op is Op.MUL:
+        return left * right
+    if op is Op.DIV:
+        if isinstance(left, int) and isinstance(right, int):
+            quotient = abs(left) // abs(right)
+            return quotient if (left < 0) == (right < 0) else -quotient
+        return left / right
+    if op is Op.LT:
+        return int(left < right)
+    if op is Op.LE:
+        return int(left <= right)
+    if op is Op.GT:
+        return int(left > right)
+    if op is Op.GE:
+        return int(left >= right)
+    if op is Op.EQ:
+        return int(left == right)
+    if op is Op.NE:
+        return int(left != right)
+    if op is Op.NOT:
+        return int(not truth(left))
+    raise ValueError(f"{op.name} is not an expression opcode")
+
+
+def coerce(value, vtype):
+    """The value a variable of type vtype holds after being assigned value."""
+    if vtype == 'float' and not isinstance(value, str):
+        return float(value)
+    if vtype in ('int', 'bool') and isinstance(value, float):
+        return int(value)
+    if vtype == 'str' and not isinstance(value, str):
+        return ''
+    return value
+
+
+def infer_types(code):
+    """Map every name defined in code to 'int', 'float', 'str' or 'bool'.
+
+    Declared types (the `# type:` annotation) win; other names, temporaries
+    included, take the type of the value assigned to them.
+    """
+    types = {}
+    for quad in code:
+        if quad.vtype and quad.vtype != 'unknown' and quad.result not in types:
+            types[quad.result] = quad.vtype
+    declared = set(types)
+
+    def operand_type(arg):
+        if isinstance(arg, Const):
+            return const_type(arg.value)
+        return types.get(arg, 'int')
+
+    for quad in code:
+        op = quad.op
+        name = quad.result
+        if name in declared:
+            continue
+        if op is Op.ASSIGN:
+            types[name] = operand_type(quad.arg1)
+        elif op in ARITHMETIC_OPS:
+            left, right = operand_type(quad.arg1), operand_type(quad.arg2)
+            if op is Op.ADD and 'str' in (left, right):
+                types[name] = 'str'
+            elif 'float' in (left, right):
+                types[name] = 'float'
+            else:
+                types[name] = 'int'
+        elif op in COMPARISON_OPS or op is Op.NOT:
+            types[name] = 'bool'
+        elif op is Op.INPUT:
+            types.setdefault(name, 'int')
+    return types
@@ -0,0 +1,367 @@
+import argparse
+import re
+import sys
+import time
+
+from tac_ir import ARITHMETIC_OPS, BRANCH_COMPARISONS, COMPARISON_OPS, Const, Op, coerce, const_type, infer_types
+
+# Longest line a string input keeps, as with the assembly buffers
+STRING_INPUT_LIMIT = 255
+
+INTEGER = re.compile(r'-?\d*')
+
+
+class ExecutionError(Exception):
+    """Run-time fault of an LPMS program, such as a division by zero."""
+
+
+def format_float(value):
+    """Three truncated decimals, as print_float writes them."""
+    whole = int(value)
+    thousandths = int((value - whole) * 1000)
+    sign = '-' if whole < 0 or thousandths < 0 else ''
+    return f"{sign}{abs(whole)}.{abs(thousandths):03d}"
+
+
+def parse_int(line):
+    """Optional minus sign and leading digits of line, as read_int parses them; 0 if none."""
+    text = INTEGER.match(line).group()
+    return int(text) if text not in ('', '-') else 0
+
+
+class VirtualMachine:
+    """Executes a list of Quads without going through assembly.
+
+    Loading resolves every name and constant to an index in one slot
+    array, labels to instruction offsets, and each quad, through a table
+    keyed by opcode, to a closure bound to its operands that performs the
+    instruction and returns the offset of the next one. run() then only
+    calls closures in a loop. Labels and params produce no instruction.
+    """
+
+    def __init__(self, code):
+        self.code = code
+        self.types = infer_types(code)
+        self.slot_of = {}
+        self.initial_slots = []
+        self.slots = []
+        self.output = []
+        self.stdin = None
+        self.stdout = None
+        self.steps = 0
+        self.elapsed = 0.0
+        self.factories = {
+            Op.ASSIGN: self.make_assign,
+            Op.NOT: self.make_not,
+            Op.IF_NOT: self.make_if_not,
+            Op.GOTO: self.make_goto,
+            Op.PRINT: self.make_print,
+            Op.INPUT: self.make_input,
+        }
+        for op in ARITHMETIC_OPS:
+            self.factories[op] = self.make_arithmetic
+        for op in COMPARISON_OPS:
+            self.factories[op] = self.make_comparison
+        for op in BRANCH_COMPARISONS:
+            self.factories[op] = self.make_branch
+
+        # Offsets first, so forward jumps resolve
+        self.labels = {}
+        self.quads = []
+        for quad in code:
+            if quad.op is Op.LABEL:
+                self.labels[quad.result] = len(self.quads)
+            elif quad.op is not Op.PARAM:
+                self.quads.append(quad)
+        self.handlers = [self.factories[quad.op](quad, offset + 1)
+                         for offset, quad in enumerate(self.quads)]
+
+    def slot(self, arg):
+        """Slot index of a name or a constant; equal constants share a slot."""
+        key = (const_type(arg.value), arg.value) if isinstance(arg, Const) else arg
+        index = self.slot_of.get(key)
+        if index is None:
+            index = self.slot_of[key] = len(self.initial_slots)
+            self.initial_slots.append(arg.value if isinstance(arg, Const) else 0)
+            self.slots.append(0)
+        return index
+
+    def type_of(self, arg):
+        if isinstance(arg, Const):
+            return const_type(arg.value)
+        return self.types.get(arg, 'int')
+
+    def make_assign(self, quad, following):
+        slots = self.slots
+        dest = self.slot(quad.result)
+        dest_type = self.type_of(quad.result)
+        if isinstance(quad.arg1, Const):
+            source = self.slot(Const(coerce(quad.arg1.value, dest_type)))
+            convert = None
+        else:
+            source = self.slot(quad.arg1)
+            source_type = self.type_of(quad.arg1)
+            convert = None
+            if dest_type == 'float' and source_type not in ('float', 'str'):
+                convert = float
+            elif dest_type in ('int', 'bool') and source_type == 'float':
+                convert = int
+            elif dest_type == 'str' and source_type != 'str':
+                # Assigning a number to a string variable leaves it empty
+                source = self.slot(Const(''))
+
+        if convert is None:
+            def assign():
+                slots[dest] = slots[source]
+                return following
+        else:
+            def assign():
+                slots[dest] = convert(slots[source])
+                return following
+        return assign
+
+    def make_arithmetic(self, quad, following):
+        slots = self.slots
+        dest, left, right = self.slot(quad.result), self.slot(quad.arg1), self.slot(quad.arg2)
+        op = quad.op
+        if op is Op.ADD:
+            def add():
+                slots[dest] = slots[left] + slots[right]
+                return following
+            return add
+        if op is Op.SUB:
+            def sub():
+                slots[dest] = slots[left] - slots[right]
+                return following
+            return sub
+        if op is Op.MUL:
+            def mul():
+                slots[dest] = slots[left] * slots[right]
+                return following
+            return mul
+        if 'float' in (self.type_of(quad.arg1), self.type_of(quad.arg2)):
+            def divide():
+                slots[dest] = slots[left] / slots[right]
+                return following
+            return divide
+
+        def divide_int():
+            # Truncate toward zero like idiv, not toward minus infinity
+            x, y = slots[left], slots[right]
+            quotient = x // y
+            if quotient < 0 and quotient * y != x:
+                quotient += 1
+            slots[dest] = quotient
+            return following
+        return divide_int
+
+    def make_comparison(self, quad, following):
+        slots = self.slots
+        dest, left, right = self.slot(quad.result), self.slot(quad.arg1), self.slot(quad.arg2)
+        op = quad.op
+        if op is Op.LT:
+            def compare():
+                slots[dest] = 1 if slots[left] < slots[right] else 0
+                return following
+        elif op is Op.LE:
+            def compare():
+                slots[dest] = 1 if slots[left] <= slots[right] else 0
+                return following
+        elif op is Op.GT:
+            def compare():
+                slots[dest] = 1 if slots[left] > slots[right] else 0
+                return following
+        elif op is Op.GE:
+            def compare():
+                slots[dest] = 1 if slots[left] >= slots[right] else 0
+                return following
+        elif op is Op.EQ:
+            def compare():
+                slots[dest] = 1 if slots[left] == slots[right] else 0
+                return following
+        else:
+            def compare():
+                slots[dest] = 1 if slots[left] != slots[right] else 0
+                return following
+        return compare
+
+    def make_not(self, quad, following):
+        slots = self.slots
+        dest, source = self.slot(quad.result), self.slot(quad.arg1)
+        if self.type_of(quad.arg1) == 'str':
+            # The machine code tests a string's address, which is never 0,
+            # so even an empty string is true
+            def negate():
+                slots[dest] = 0
+                return following
+            return negate
+
+        def negate():
+            slots[dest] = 0 if slots[source] else 1
+            return following
+        return negate
+
+    def make_branch(self, quad, following):
+        slots = self.slots
+        target = self.labels[quad.result]
+        left, right = self.slot(quad.arg1), self.slot(quad.arg2)
+        op = BRANCH_COMPARISONS[quad.op]
+        if op is Op.LT:
+            def branch():
+                return target if slots[left] < slots[right] else following
+        elif op is Op.LE:
+            def branch():
+                return target if slots[left] <= slots[right] else following
+        elif op is Op.GT:
+            def branch():
+                return target if slots[left] > slots[right] else following
+        elif op is Op.GE:
+            def branch():
+                return target if slots[left] >= slots[right] else following
+        elif op is Op.EQ:
+            def branch():
+                return target if slots[left] == slots[right] else following
+        else:
+            def branch():
+                return target if slots[left] != slots[right] else following
+        return branch
+
+    def make_if_not(self, quad, following):
+        slots = self.slots
+        target = self.labels[quad.result]
+        condition = self.slot(quad.arg1)
+        if self.type_of(quad.arg1) == 'str':
+            # Strings are always true, as in make_not
+            def if_not():
+                return following
+            return if_not
+
+        def if_not():
+            return following if slots[condition] else target
+        return if_not
+
+    def make_goto(self, quad, following):
+        target = self.labels[quad.result]
+
+        def goto():
+            return target
+        return goto
+
+    def make_print(self, quad, following):
+        slots = self.slots
+        output = self.output
+        source = self.slot(quad.arg1)
+        arg_type = self.type_of(quad.arg1)
+        if arg_type == 'str':
+            def print_value():
+                output.append(slots[source])
+                return following
+        elif arg_type == 'float':
+            def print_value():
+                output.append(format_float(slots[source]))
+                return following
+        else:
+            def print_value():
+                output.append(str(int(slots[source])))
+                return following
+        return print_value
+
+    def make_input(self, quad, following):
+        slots = self.slots
+        dest = self.slot(quad.result)
+        var_type = self.type_of(quad.result)
+        read_line = self.read_line
+        if var_type == 'str':
+            def read():
+                slots[dest] = read_line()[:STRING_INPUT_LIMIT]
+                return following
+        elif var_type == 'float':
+            # Float input reads an integer and converts it
+            def read():
+                slots[dest] = float(parse_int(read_line()))
+                return following
+        else:
+            def read():
+                slots[dest] = parse_int(read_line())
+                return following
+        return read
+
+    def read_line(self):
+        # Show pending output before waiting for the user
+        self.flush()
+        return self.stdin.readline().rstrip('\r\n')
+
+    def flush(self):
+        if self.output:
+            self.stdout.write('\n'.join(self.output) + '\n')
+            self.output.clear()
+        self.stdout.flush()
+
+    def run(self, stdin=None, stdout=None):
+        """Execute the program once; returns the number of instructions executed."""
+        self.stdin = stdin or sys.stdin
+        self.stdout = stdout or sys.stdout
+        self.slots[:] = self.initial_slots
+        handlers = self.handlers
+        end = len(handlers)
+        pc = 0
+        steps = 0
+        start = time.perf_counter()
+        try:
+            while pc < end:
+                pc = handlers[pc]()
+                steps += 1
+        except ZeroDivisionError as error:
+            raise ExecutionError(f"divisão por zero em '{self.quads[pc]}'") from error
+        except (TypeError, ValueError, OverflowError) as error:
+            raise ExecutionError(f"{error} em '{self.quads[pc]}'") from error
+        finally:
+            self.elapsed = time.perf_counter() - start
+            self.steps = steps
+            self.flush()
+        return steps
+
+
+def main():
+    from optimizer import optimize
+    from rd_parser import RDParser
+    from tac_generator import TACGenerator
+
+    arg_parser = argparse.ArgumentParser(
+        description="Executa um programa LPMS interpretando seu TAC, sem gerar Assembly")
+    arg_parser.add_argument('input_file', metavar='arquivo_entrada')
+    arg_parser.add_argument('-O', dest='opt_level', type=int, choices=(0, 1), default=1,
+                            help="nível de otimização do TAC (0 desativa; padrão: 1)")
+    arg_parser.add_argument('--stats', action='store_true',
+                            help="mostra em stderr as instruções executadas por segundo")
+    args = arg_parser.parse_args()
+
+    try:
+        with open(args.input_file, 'r', encoding='utf-8') as file:
+            ast, errors = RDParser().parse(file)
+    except FileNotFoundError:
+        print(f"Erro: Arquivo '{args.input_file}' não encontrado")
+        sys.exit(1)
+    if errors:
+        print("Erros durante o parsing:")
+        print("\n".join(errors))
+        sys.exit(1)
+
+    generator = TACGenerator()
+    generator.generate(ast)
+    code = optimize(generator.tac) if args.opt_level > 0 else generator.tac
+    vm = VirtualMachine(code)
+    try:
+        vm.run()
+    except ExecutionError as e:
+        print(f"Erro de execução: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if args.stats:
+            rate = vm.steps / vm.elapsed if vm.elapsed else 0.0
+            print(f"{vm.steps} instruções executadas em {vm.elapsed:.3f} s "
+                  f"({rate:,.0f} instruções/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
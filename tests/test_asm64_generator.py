@@ -0,0 +1,60 @@
+import shutil
+
+import pytest
+
+from asm64_generator import is_immediate
+from peephole import instruction
+from tac_generator import compile_source
+from test_asm_generator import run_native
+from test_optimizer import run_on_vm
+from test_rd_parser import SAMPLES
+
+WIDE_CONSTANTS = """Program W {
+  int a, b;
+  input(a);
+  b = a + 5000000000;
+  print(b);
+  b = b * 3 - 3000000000;
+  print(b < 6000000000, b - 4294967296);
+  a = 7000000000;
+  print(a, a / 2147483648);
+  if (a > 6999999999) { print(1); }
+}"""
+
+
+def wide_immediates(asm):
+    """(mnemonic, operands) of the instructions with an integer operand outside imm32."""
+    found = []
+    for line in asm.split('\n'):
+        parsed = instruction(line)
+        if parsed and any(operand.lstrip('-').isdigit() and not is_immediate(int(operand))
+                          for operand in parsed[1]):
+            found.append(parsed)
+    return found
+
+
+@pytest.mark.parametrize('optimize', [False, True])
+@pytest.mark.parametrize('source', SAMPLES)
+def test_samples_generate_at_both_levels(source, optimize):
+    result = compile_source(source, optimize=optimize, target='x64')
+    assert result.errors == []
+    assert result.asm.startswith('bits 64')
+    assert 'syscall' in result.asm and 'int 0x80' not in result.asm
+    assert wide_immediates(result.asm) == []
+
+
+@pytest.mark.parametrize('optimize', [False, True])
+def test_wide_constants_go_through_a_register(optimize):
+    found = wide_immediates(compile_source(WIDE_CONSTANTS, optimize=optimize, target='x64').asm)
+    assert found
+    # Only mov takes a 64-bit immediate, and only into a register
+    for mnemonic, operands in found:
+        assert mnemonic == 'mov' and not operands[0].startswith(('[', 'qword'))
+
+
+@pytest.mark.skipif(not (shutil.which('nasm') and shutil.which('ld')), reason="requer nasm e ld")
+@pytest.mark.parametrize('optimize', [False, True])
+def test_wide_constants_match_the_vm(optimize, tmp_path):
+    expected = run_on_vm(WIDE_CONSTANTS, optimize, "3\n")
+    asm = compile_source(WIDE_CONSTANTS, optimize=optimize, target='x64').asm
+    assert run_native(asm, 'x64', "3\n", tmp_path) == expected
@@ -0,0 +1,63 @@
+import shutil
+import subprocess
+
+import pytest
+
+from tac_generator import compile_source
+from test_optimizer import run_on_vm
+
+# Fractional values truncate to 0 and -0.0 has its sign bit set, so neither
+# the truncated integer nor the raw bits tell whether a float is zero
+FLOAT_CONDITIONS = """Program F {
+  float f, g, z;
+  int n;
+  bool b;
+  n = 0;
+  input(f);
+  g = f / 4.0;
+  z = 0.0 - 0.0;
+  z = z * (0.0 - 1.0);
+  if (g) { n = n + 1; }
+  if (!g) { n = n + 10; }
+  while (g) { n = n + 100; break; }
+  b = !g;
+  print(n, b, !f, !z);
+  if (z) { print("z"); } else { print("zero"); }
+  if (!0.5) { print("bad"); }
+  print(!0.25);
+}"""
+
+BUILD = {
+    'x86': (['-f', 'elf32'], ['-m', 'elf_i386']),
+    'x64': (['-f', 'elf64'], []),
+}
+
+
+def run_native(asm, target, stdin, tmp_path):
+    nasm_flags, ld_flags = BUILD[target]
+    source, obj, program = tmp_path / 'output.asm', tmp_path / 'output.o', tmp_path / 'output'
+    source.write_text(asm)
+    subprocess.run(['nasm'] + nasm_flags + [str(source), '-o', str(obj)], check=True)
+    subprocess.run(['ld'] + ld_flags + [str(obj), '-o', str(program)], check=True)
+    return subprocess.run([str(program)], input=stdin, capture_output=True, text=True,
+                          check=True).stdout
+
+
+@pytest.mark.parametrize('target', ['x86', 'x64'])
+@pytest.mark.parametrize('optimize', [False, True])
+def test_float_conditions_compare_with_zero(target, optimize):
+    asm = compile_source(FLOAT_CONDITIONS, optimize=optimize, target=target).asm
+    compare = 'comiss' if target == 'x86' else 'comisd'
+    assert f"{compare} xmm0, xmm1" in asm
+    assert 'cvttss2si' not in asm and 'cvttsd2si' not in asm
+
+
+@pytest.mark.skipif(not (shutil.which('nasm') and shutil.which('ld')), reason="requer nasm e ld")
+@pytest.mark.parametrize('target', ['x86', 'x64'])
+@pytest.mark.parametrize('stdin', ['0\n', '1\n', '-3\n'])
+def test_float_conditions_match_the_vm_at_both_levels(target, stdin, tmp_path):
+    expected = run_on_vm(FLOAT_CONDITIONS, False, stdin)
+    assert run_on_vm(FLOAT_CONDITIONS, True, stdin) == expected
+    for optimize in (False, True):
+        asm = compile_source(FLOAT_CONDITIONS, optimize=optimize, target=target).asm
+        assert run_native(asm, target, stdin, tmp_path) == expected
@@ -0,0 +1,49 @@
+import os
+
+import pytest
+
+from batch import plan_outputs, run_batch
+
+
+def test_outputs_next_to_sources():
+    tasks = plan_outputs([('x/a.lpms', 'a.lpms'), ('x/b.txt', 'b.txt')], None)
+    assert tasks == [('x/a.lpms', 'x/a.tac', 'x/a.asm'), ('x/b.txt', 'x/b.tac', 'x/b.asm')]
+
+
+def test_output_dir_keeps_subdirectories():
+    tasks = plan_outputs([('src/x/p.lpms', os.path.join('x', 'p.lpms')),
+                          ('src/y/p.lpms', os.path.join('y', 'p.lpms'))], 'out')
+    assert [task[1] for task in tasks] == [os.path.join('out', 'x', 'p.tac'),
+                                           os.path.join('out', 'y', 'p.tac')]
+
+
+@pytest.mark.parametrize('sources, output_dir', [
+    ([('d/a.txt', 'a.txt'), ('d/a.lpms', 'a.lpms')], None),
+    ([('x/p.lpms', 'p.lpms'), ('y/p.lpms', 'p.lpms')], 'out'),
+])
+def test_shared_outputs_are_rejected(sources, output_dir):
+    with pytest.raises(ValueError) as error:
+        plan_outputs(sources, output_dir)
+    for path, relative in sources:
+        assert path in str(error.value)
+
+
+SOURCE = "Program {name} {{ int a; a = 2 + 3; print(a); }}"
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_run_batch_with_cache_dir_and_default_size(tmp_path, jobs):
+    sources = []
+    for name in ('a', 'b', 'c'):
+        path = tmp_path / f"{name}.lpms"
+        path.write_text(SOURCE.format(name=name.upper()))
+        sources.append((str(path), path.name))
+    tasks = plan_outputs(sources, str(tmp_path / 'out'))
+    cache_dir = str(tmp_path / 'cache')
+
+    first = run_batch(tasks, jobs=jobs, cache_dir=cache_dir)
+    assert [(errors, cached) for path, errors, cached in first] == [([], False)] * 3
+    second = run_batch(tasks, jobs=jobs, cache_dir=cache_dir)
+    assert [(errors, cached) for path, errors, cached in second] == [([], True)] * 3
+    for source, tac_path, asm_path in tasks:
+        assert os.path.exists(tac_path) and os.path.exists(asm_path)
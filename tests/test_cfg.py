@@ -0,0 +1,41 @@
+from cfg import build_cfg, liveness
+from tac_ir import Const, Op, Quad
+
+
+def test_liveness_carries_loop_variables_around_the_back_edge():
+    #    i = 0; s = 0
+    # L1:
+    #    if not (i < 10) goto L2    (t = i < 10)
+    #    s = s + i; i = i + 1; dead = i
+    #    goto L1
+    # L2:
+    #    print s
+    code = [
+        Quad(Op.ASSIGN, 'i', Const(0)),
+        Quad(Op.ASSIGN, 's', Const(0)),
+        Quad(Op.LABEL, 'L1'),
+        Quad(Op.LT, 't', 'i', Const(10)),
+        Quad(Op.IF_NOT, 'L2', 't'),
+        Quad(Op.ADD, 's', 's', 'i'),
+        Quad(Op.ADD, 'i', 'i', Const(1)),
+        Quad(Op.ASSIGN, 'dead', 'i'),
+        Quad(Op.GOTO, 'L1'),
+        Quad(Op.LABEL, 'L2'),
+        Quad(Op.PARAM, None, 's'),
+        Quad(Op.PRINT, None, Const(1)),
+    ]
+    blocks = build_cfg(code)
+    assert [block.label for block in blocks] == [None, 'L1', None, 'L2']
+    entry, header, body, exit_ = blocks
+    assert body.successors == [header]
+
+    live_in, live_out = liveness(blocks)
+    assert live_out[entry.index] == {'i', 's'}
+    # Both loop variables stay live across the back edge into the header
+    assert live_in[header.index] == {'i', 's'}
+    assert live_out[body.index] == {'i', 's'}
+    assert live_in[body.index] == {'i', 's'}
+    # Only s survives the loop; the condition temp and dead never leave their block
+    assert live_in[exit_.index] == {'s'}
+    assert live_out[exit_.index] == set()
+    assert all('dead' not in names and 't' not in names for names in live_in + live_out)
@@ -0,0 +1,33 @@
+import os
+
+from compile_cache import CompilationCache
+
+
+def directory_size(path):
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def test_running_total_matches_directory(tmp_path):
+    cache = CompilationCache(str(tmp_path), 1 << 30)
+    for i in range(20):
+        cache.put(f"k{i}", None, ['x'] * i, 'asm', [])
+    # Rewriting an entry replaces its size
+    cache.put("k3", None, [], 'asm', [])
+    assert cache.total_bytes == directory_size(tmp_path)
+
+
+def test_eviction_keeps_recent_entries_under_limit(tmp_path):
+    cache = CompilationCache(str(tmp_path), 20_000)
+    for i in range(500):
+        cache.put(f"k{i}", None, ['x' * 100], 'asm', [])
+    assert directory_size(tmp_path) <= 20_000
+    assert cache.total_bytes == directory_size(tmp_path)
+    assert cache.get("k0") is None
+    assert cache.get("k499") is not None
+
+
+def test_first_put_counts_existing_entries(tmp_path):
+    CompilationCache(str(tmp_path), 1 << 30).put("old", None, ['x'] * 100, 'asm', [])
+    cache = CompilationCache(str(tmp_path), 1 << 30)
+    cache.put("new", None, [], 'asm', [])
+    assert cache.total_bytes == directory_size(tmp_path)
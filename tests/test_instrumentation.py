@@ -0,0 +1,29 @@
+import tracemalloc
+
+import pytest
+
+from instrumentation import instrumented_compile
+
+SOURCE = "Program P { int a; a = 1 + 2; print(a); }"
+
+
+@pytest.mark.parametrize('outer_tracing', [False, True])
+def test_phases_without_reset_peak(monkeypatch, outer_tracing):
+    # Python 3.7 and 3.8 have no tracemalloc.reset_peak()
+    monkeypatch.delattr(tracemalloc, 'reset_peak', raising=False)
+    if outer_tracing:
+        tracemalloc.start()
+    try:
+        result, stats = instrumented_compile(SOURCE)
+    finally:
+        if outer_tracing:
+            tracemalloc.stop()
+    assert result.errors == []
+    assert [phase.name for phase in stats.phases] == ['scan', 'parse', 'tac', 'optimize', 'asm']
+    assert all(phase.peak_bytes is not None for phase in stats.phases)
+
+
+def test_phase_counts():
+    result, stats = instrumented_compile(SOURCE, trace_memory=False)
+    assert stats['parse'].count > 0
+    assert stats['asm'].peak_bytes is None
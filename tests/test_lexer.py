@@ -0,0 +1,101 @@
+import io
+
+import pytest
+
+from lexer import Scanner
+from parser import Parser
+
+SOURCE = """Program P {
+    int a;
+    a = 1 + 2;
+    print("a", a);
+}
+"""
+
+
+@pytest.fixture
+def scans(monkeypatch):
+    """Counts the calls to Scanner._scan, which produces every token stream."""
+    calls = []
+    scan = Scanner._scan
+
+    def counting_scan(self, chunks):
+        calls.append(self)
+        return scan(self, chunks)
+
+    monkeypatch.setattr(Scanner, '_scan', counting_scan)
+    return calls
+
+
+def drain(scanner):
+    return list(iter(scanner.token, None))
+
+
+def test_input_token_and_parse_share_one_scan(scans):
+    scanner = Scanner()
+    tokens = scanner.input(SOURCE)
+    assert [t.value for t in drain(scanner)] == [t.value for t in tokens]
+    assert scanner.tokenize() is tokens
+
+    ast, errors = Parser(production=True).parse_scanner(scanner)
+    assert errors == []
+    assert ast.value == 'P'
+    assert len(scans) == 1
+
+
+def test_input_twice_does_not_duplicate_tokens(scans):
+    scanner = Scanner()
+    first = [(t.type, t.value) for t in scanner.input(SOURCE)]
+    second = [(t.type, t.value) for t in scanner.input(SOURCE)]
+    assert first == second
+    assert len(scans) == 2
+
+
+def test_reused_scanner_scans_each_source_once(scans):
+    scanner = Scanner()
+    for name in ('A', 'B', 'C'):
+        scanner.reset(SOURCE.replace('P', name))
+        assert scanner.tokenize()[1].value == name
+        assert scanner.tokenize()[1].value == name
+    assert len(scans) == 3
+
+
+def test_parser_reuses_its_scanner(scans):
+    parser = Parser(production=True)
+    for source in (SOURCE, io.StringIO(SOURCE)):
+        ast, errors = parser.parse(source)
+        assert errors == []
+        assert ast.value == 'P'
+    assert len(scans) == 2
+    assert {id(scanner) for scanner in scans} == {id(parser.scanner)}
+
+
+CHUNKED_SOURCE = """Program Chunks {
+    // a comment with "quotes" and symbols <= != ;
+    int counter_1, b;
+    float ratio;
+    str texto;
+    bool flag;
+    const limite = 12345;
+    ratio = 3.14159 + .5;
+    texto = "olá, mundo { } ; // não é comentário";
+    flag = True;
+    if (counter_1 <= limite) { b = counter_1 >= 10; }
+    while (!flag) { break; }
+    print("ação", ratio != 2.0, b == 1, texto);
+}
+"""
+
+
+def token_tuples(tokens):
+    return [(t.type, t.value, t.lexpos, t.lineno, t.column) for t in tokens]
+
+
+@pytest.mark.parametrize('chunk_size', list(range(1, 41)) + [64, 4096])
+def test_tokens_split_across_chunks(chunk_size):
+    expected = token_tuples(Scanner(CHUNKED_SOURCE).tokenize())
+    text = Scanner(io.StringIO(CHUNKED_SOURCE), chunk_size=chunk_size).tokenize()
+    assert token_tuples(text) == expected
+    # Binary streams may also split a multi-byte character between reads
+    binary = Scanner(io.BytesIO(CHUNKED_SOURCE.encode('utf-8')), chunk_size=chunk_size).tokenize()
+    assert token_tuples(binary) == expected
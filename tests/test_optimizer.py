@@ -0,0 +1,78 @@
+import io
+
+import pytest
+
+from optimizer import eliminate_dead_code, optimize, remove_unreachable_code
+from rd_parser import RDParser
+from tac_generator import TACGenerator
+from tac_ir import Const, Op, Quad
+from tac_vm import VirtualMachine
+
+
+def run_on_vm(source, optimized, stdin=''):
+    ast, errors = RDParser().parse(source)
+    assert errors == []
+    generator = TACGenerator()
+    generator.generate(ast)
+    code = optimize(generator.tac) if optimized else generator.tac
+    stdout = io.StringIO()
+    VirtualMachine(code).run(io.StringIO(stdin), stdout)
+    return stdout.getvalue()
+
+
+@pytest.mark.parametrize('source', [
+    # Read before its only definition: the first print sees the initial 0
+    "Program P { print(c); const c = 7; print(c); while (c < 9) { print(c); break; } }",
+    "Program P { int a; a = c + 1; const c = 7; print(a, c); }",
+    "Program P { const x = 3; const y = 5; if (x > y) { print(x); } else { print(y); } }",
+])
+def test_optimized_program_prints_the_same(source):
+    assert run_on_vm(source, True) == run_on_vm(source, False)
+
+
+def test_constant_read_before_definition_is_not_propagated():
+    assert run_on_vm("Program P { print(c); const c = 7; print(c); }", True) == "0\n7\n"
+
+
+def test_dead_code_elimination_keeps_side_effects():
+    code = [
+        Quad(Op.INPUT, 'unused', vtype='int'),
+        Quad(Op.ASSIGN, 'zero', Const(0)),
+        Quad(Op.INPUT, 'n', vtype='int'),
+        Quad(Op.DIV, 'faults', Const(1), 'n'),
+        Quad(Op.DIV, 'safe', 'n', Const(2)),
+        Quad(Op.DIV, 'by_zero', 'n', Const(0)),
+        Quad(Op.ADD, 'sum', 'n', Const(1)),
+        Quad(Op.PARAM, None, 'n'),
+        Quad(Op.PRINT, None, Const(1)),
+    ]
+    kept = eliminate_dead_code(code)
+    # Input still consumes a line and a division by a variable or by zero
+    # may still fault; the other unused results go
+    assert [(quad.op, quad.result) for quad in kept] == [
+        (Op.INPUT, 'unused'), (Op.INPUT, 'n'), (Op.DIV, 'faults'), (Op.DIV, 'by_zero'),
+        (Op.PARAM, None), (Op.PRINT, None),
+    ]
+
+
+def test_dead_code_elimination_removes_chains_of_dead_definitions():
+    code = [
+        Quad(Op.ASSIGN, 'a', Const(1)),
+        Quad(Op.ADD, 'b', 'a', Const(2)),
+        Quad(Op.MUL, 'c', 'b', 'b'),
+        Quad(Op.PARAM, None, Const(5)),
+        Quad(Op.PRINT, None, Const(1)),
+    ]
+    assert [quad.op for quad in eliminate_dead_code(code)] == [Op.PARAM, Op.PRINT]
+
+
+def test_jump_to_the_label_run_that_follows_is_removed():
+    code = [
+        Quad(Op.INPUT, 'n', vtype='int'),
+        Quad(Op.IF_NOT, 'L2', 'n'),
+        Quad(Op.LABEL, 'L1'),
+        Quad(Op.LABEL, 'L2'),
+        Quad(Op.PARAM, None, 'n'),
+        Quad(Op.PRINT, None, Const(1)),
+    ]
+    assert [quad.op for quad in remove_unreachable_code(code)] == [Op.INPUT, Op.PARAM, Op.PRINT]
@@ -0,0 +1,141 @@
+import pytest
+
+from peephole import (fuse_flag_tests, invert_branches_over_jumps, labels_after, peephole,
+                      remove_jumps_to_next, remove_redundant_loads, significant)
+
+
+def listing(text):
+    return text.strip('\n').split('\n')
+
+
+@pytest.mark.parametrize('rule, before, after, removed', [
+    (remove_redundant_loads, """
+    mov [a], ebx
+    mov ebx, [a]
+    add ebx, 1
+""", """
+    mov [a], ebx
+    add ebx, 1
+""", 1),
+    # A comment between the two moves does not hide the pair
+    (remove_redundant_loads, """
+    mov eax, ebx
+    ; b = a
+    mov ebx, eax
+    mov eax, ebx
+""", """
+    mov eax, ebx
+    ; b = a
+    mov eax, ebx
+""", 1),
+    (remove_redundant_loads, """
+    mov [a], ebx
+    mov ecx, [a]
+""", """
+    mov [a], ebx
+    mov ecx, [a]
+""", 0),
+    (invert_branches_over_jumps, """
+    cmp ebx, 10
+    jl L1
+    jmp L2
+L1:
+    inc ebx
+L2:
+""", """
+    cmp ebx, 10
+    jge L2
+L1:
+    inc ebx
+L2:
+""", 1),
+    # Only when the branch target directly follows the jmp
+    (invert_branches_over_jumps, """
+    jl L1
+    jmp L2
+L3:
+    inc ebx
+L1:
+""", """
+    jl L1
+    jmp L2
+L3:
+    inc ebx
+L1:
+""", 0),
+    (fuse_flag_tests, """
+    cmp ebx, esi
+    setl al
+    movzx ecx, al
+    mov [t0], ecx
+    test ecx, ecx
+    jz L1
+""", """
+    cmp ebx, esi
+    setl al
+    movzx ecx, al
+    mov [t0], ecx
+    jge L1
+""", 1),
+    (fuse_flag_tests, """
+    comiss xmm0, xmm1
+    sete al
+    movzx eax, al
+    test eax, eax
+    jnz L2
+""", """
+    comiss xmm0, xmm1
+    sete al
+    movzx eax, al
+    je L2
+""", 1),
+    # Testing another register does not read the flags of the compare
+    (fuse_flag_tests, """
+    setl al
+    movzx ecx, al
+    test ebx, ebx
+    jz L1
+""", """
+    setl al
+    movzx ecx, al
+    test ebx, ebx
+    jz L1
+""", 0),
+])
+def test_rule(rule, before, after, removed):
+    assert rule(listing(before)) == (listing(after), removed)
+
+
+def test_labels_after_stops_at_the_first_instruction():
+    lines = listing("""
+    jmp L3
+L1:
+    ; comment
+L2:
+    nop
+L3:
+""")
+    sig = significant(lines)
+    assert labels_after(lines, sig, 0) == {'L1', 'L2'}
+    assert labels_after(lines, sig, 3) == {'L3'}
+    assert labels_after(lines, sig, len(sig) - 1) == set()
+
+
+def test_peephole_runs_rules_until_none_fires():
+    lines = listing("""
+    cmp ebx, 10
+    jl L1
+    jmp L2
+L1:
+    jmp L2
+L2:
+""")
+    result, stats = peephole(lines)
+    assert result == listing("""
+    cmp ebx, 10
+    jge L2
+L1:
+L2:
+""")
+    assert stats == {'invert_branches_over_jumps': 1, 'remove_jumps_to_next': 1}
+    assert remove_jumps_to_next(result) == (result, 0)
@@ -0,0 +1,47 @@
+import io
+
+import pytest
+
+from py_backend import compile_ast
+from rd_parser import RDParser
+from tac_generator import TACGenerator
+from tac_vm import VirtualMachine
+
+CONDITIONS = """Program C {
+    str s;
+    float f;
+    int n;
+    n = 0;
+    input(s, f);
+    while (s) { n = n + 1; break; }
+    if (s) { n = n + 10; }
+    if (!s) { n = n + 100; }
+    while (f) { n = n + 1000; break; }
+    if (!f) { n = n + 10000; }
+    if (s + "x") { n = n + 100000; }
+    print(n, !s, !f);
+}
+"""
+
+
+def run_both(source, stdin):
+    ast, errors = RDParser().parse(source)
+    assert errors == []
+    generator = TACGenerator()
+    generator.generate(ast)
+    vm_output = io.StringIO()
+    VirtualMachine(generator.tac).run(io.StringIO(stdin), vm_output)
+    py_output = io.StringIO()
+    compile_ast(ast).run(io.StringIO(stdin), py_output)
+    return vm_output.getvalue(), py_output.getvalue()
+
+
+@pytest.mark.parametrize('stdin', ["\n0\n", "abc\n0\n", "\n2\n", "abc\n-3\n"])
+def test_string_and_float_conditions_match_the_vm(stdin):
+    vm_output, py_output = run_both(CONDITIONS, stdin)
+    assert py_output == vm_output
+
+
+def test_empty_string_is_true():
+    vm_output, py_output = run_both(CONDITIONS, "\n0\n")
+    assert py_output.split('\n')[0] == '110011'
@@ -0,0 +1,176 @@
+import io
+import os
+import random
+
+import pytest
+
+from benchmark import ProgramGenerator
+from lexer import Scanner
+from parser import Parser
+from rd_parser import RDParser, differential_check, make_parser, same_tree
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+with open(os.path.join(HERE, '..', 'entrada.txt'), encoding='utf-8') as file:
+    ENTRADA = file.read()
+
+SAMPLES = [
+    ENTRADA,
+    """Program T {
+  int a, b, c;
+  float f;
+  str s;
+  bool ok;
+  const limit = 10;
+  input(a, b, s);
+  f = 2.5;
+  ok = true;
+  print("soma", a + b, f * 2);
+  while (a < limit) {
+    a = a + 1;
+    if (a == 5) { break; }
+  }
+  if (!ok) { c = a - b / 2; } else { c = (a - b) / 2; }
+  if (!(a < b)) { print(!a, s); }
+}
+""",
+    "Program Empty { }",
+    "Program N { int a; if (a) { } else { while (a) { } } }",
+    "Program E { int a; a = a + b * c - d / e < f + g == h; }",
+]
+
+MALFORMED = [
+    "",
+    "Program",
+    "Program P",
+    "Program P {",
+    "Program P { int a; }}",
+    "Program P { int a }",
+    "Program P { a = ; }",
+    "Program P { a = 1 + ; }",
+    "Program P { a = !!b; }",
+    "Program P { a = b + !c; }",
+    "Program P { a = (b; }",
+    "Program P { a = b); }",
+    "Program P { a = ((b + c) * ; }",
+    "Program P { const c = a; }",
+    "Program P { int a, ; }",
+    "Program P { if a { } }",
+    "Program P { if (a) b = 1; }",
+    "Program P { if (a) { } else a = 1; }",
+    "Program P { while (a) { break }",
+    "Program P { print(); }",
+    "Program P { print(a,); }",
+    "Program P { input(a + b); }",
+    "Program P { else { } }",
+    "program P { }",
+]
+
+
+@pytest.fixture(scope='module')
+def ply():
+    return Parser(production=True)
+
+
+def assert_agree(ply, source, precedence=False):
+    expected, expected_errors = ply.parse(source)
+    expected_errors = list(expected_errors)
+    ast, errors = RDParser(precedence).parse(source)
+    assert errors[:1] == expected_errors[:1]
+    if not expected_errors:
+        assert same_tree(ast, expected)
+
+
+@pytest.mark.parametrize('source', SAMPLES)
+def test_samples_match_ply(ply, source):
+    assert_agree(ply, source)
+
+
+@pytest.mark.parametrize('source', MALFORMED)
+def test_malformed_input_reports_the_ply_error(ply, source):
+    assert RDParser().parse(source)[1]
+    assert_agree(ply, source)
+
+
+def expression_text(source, parser):
+    ast, errors = parser.parse(source)
+    assert errors == []
+
+    def text(node):
+        if node.type == 'BinaryOp':
+            return f"({text(node.children[0])} {node.value} {text(node.children[1])})"
+        if node.type == 'UnaryOp':
+            return f"!{text(node.children[0])}"
+        return str(node.value)
+
+    return text(ast.children[0].children[0].children[1])
+
+
+PRECEDENCE_SOURCE = "Program P { a = !a * 2 + b < c - d / e; }"
+
+
+def test_operator_precedence():
+    assert (expression_text(PRECEDENCE_SOURCE, RDParser(precedence=True))
+            == "(((!a * 2) + b) < (c - (d / e)))")
+
+
+def test_default_parsers_group_operators_alike(ply):
+    # Both group left to right, so a program compiles the same with either
+    expected = "(((((!a * 2) + b) < c) - d) / e)"
+    assert expression_text(PRECEDENCE_SOURCE, RDParser()) == expected
+    assert expression_text(PRECEDENCE_SOURCE, ply) == expected
+    assert expression_text(PRECEDENCE_SOURCE, make_parser('rd')) == expected
+
+
+def test_deep_nesting(ply):
+    depth = 3000
+    source = ("Program P { int a; " + "while (a < 3) { if (a) { a = 1; } else { " * depth
+              + "a = " + "(" * depth + "a" + " + 1)" * depth + "; " + "} } " * depth + "}")
+    assert_agree(ply, source)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_synthetic_programs(ply, seed):
+    source = ProgramGenerator(statements=60, depth=4, declarations=10, expression_depth=4,
+                              seed=seed).generate()
+    # Fully parenthesized, so precedence does not change the tree
+    assert differential_check(source, ply, precedence=False) is None
+    assert differential_check(source, ply, precedence=True) is None
+    rng = random.Random(seed)
+    for _ in range(20):
+        cut = rng.randrange(len(source))
+        assert differential_check(source[:cut] + source[cut + 1:], ply) is None
+
+
+class CountingStream(io.StringIO):
+    def __init__(self, text):
+        super().__init__(text)
+        self.reads = 0
+
+    def read(self, size=-1):
+        self.reads += 1
+        return super().read(size)
+
+
+def test_tokens_are_streamed_from_the_scanner():
+    body = "a = a + 1;\n" * 2000
+    source = "Program P { int a; " + body + "}"
+    parser = RDParser()
+    ast, errors = parser.parse(CountingStream(source))
+    assert errors == [] and len(ast.children[0].children) == 2001
+    # The parser read the scanner's tokens lazily instead of building their list
+    assert not parser.scanner.tokenized and parser.scanner.tokens == []
+
+    # An error near the start stops reading the rest of the file
+    scanner = Scanner(CountingStream("Program P { int a; a = ; " + body + "}"), chunk_size=64)
+    ast, errors = parser.parse_scanner(scanner)
+    assert ast is None and "Token inesperado ';'" in errors[0]
+    assert scanner.source_code.reads < 5
+
+
+def test_tokenized_scanner_is_parsed_from_the_start():
+    scanner = Scanner(SAMPLES[1])
+    tokens = scanner.tokenize()
+    assert scanner.token() is tokens[0]
+    ast, errors = RDParser().parse_scanner(scanner)
+    assert errors == [] and same_tree(ast, RDParser().parse(SAMPLES[1])[0])
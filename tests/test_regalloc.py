@@ -0,0 +1,40 @@
+from regalloc import ALLOCATABLE_REGISTERS, Interval, allocate_registers, linear_scan
+from tac_ir import Const, Op, Quad
+
+
+def interval(name, start, end, weight):
+    result = Interval(name, start)
+    result.end = end
+    result.weight = weight
+    return result
+
+
+def test_linear_scan_spills_the_cheapest_interval_under_pressure():
+    # Six names live at once for four registers: the two lightest stay in memory
+    weights = {'a': 50, 'b': 1, 'c': 40, 'd': 30, 'e': 2, 'f': 60}
+    intervals = [interval(name, i, 10, weight) for i, (name, weight) in enumerate(weights.items())]
+    assigned = linear_scan(intervals)
+    assert set(assigned) == {'a', 'c', 'd', 'f'}
+    assert sorted(assigned.values()) == sorted(ALLOCATABLE_REGISTERS)
+
+
+def test_linear_scan_reuses_registers_of_expired_intervals():
+    intervals = [interval(f"v{i}", 2 * i, 2 * i + 1, 1) for i in range(10)]
+    assigned = linear_scan(intervals)
+    assert len(assigned) == 10
+    assert set(assigned.values()) == {ALLOCATABLE_REGISTERS[0]}
+
+
+def test_no_two_overlapping_names_share_a_register():
+    # n0..n7 are all read by the final sum, so they are live together
+    names = [f"n{i}" for i in range(8)]
+    code = [Quad(Op.INPUT, name, vtype='int') for name in names]
+    code.append(Quad(Op.ASSIGN, 's', Const(0), vtype='int'))
+    for name in names:
+        code.append(Quad(Op.ADD, 's', 's', name, vtype='int'))
+    code += [Quad(Op.PARAM, None, 's'), Quad(Op.PRINT, None, Const(1))]
+    types = dict.fromkeys(names + ['s'], 'int')
+
+    assigned = allocate_registers(code, types)
+    assert len(assigned) == len(ALLOCATABLE_REGISTERS)
+    assert len(set(assigned.values())) == len(assigned)
@@ -0,0 +1,88 @@
+import io
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from client import output_paths
+from server import CompileServer
+
+SOURCE = "Program P { int a; a = 2 + 3; print(a); }"
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def serve(lines, **options):
+    """Run a one-job server over lines; returns its responses keyed by id."""
+    output = io.StringIO()
+    CompileServer(jobs=1, **options).serve_stream(io.StringIO(''.join(line + '\n' for line in lines)), output)
+    responses = [json.loads(line) for line in output.getvalue().splitlines()]
+    return {response['id']: response for response in responses}
+
+
+def test_ping_and_unknown_command():
+    responses = serve([json.dumps({'id': 1, 'command': 'ping'}),
+                       json.dumps({'id': 2, 'command': 'reboot'})])
+    assert responses[1] == {'id': 1, 'ok': True}
+    assert responses[2]['ok'] is False
+    assert responses[2]['errors'] == ["Comando desconhecido: reboot"]
+
+
+@pytest.mark.parametrize('line', ['{"id": 1, "source": ', '[1, 2]', 'nada'])
+def test_malformed_request(line):
+    responses = serve([line, json.dumps({'id': 2, 'command': 'ping'})])
+    assert responses[None]['ok'] is False
+    assert responses[None]['errors'][0].startswith("Requisição inválida")
+    # The server keeps answering after a bad line
+    assert responses[2]['ok'] is True
+
+
+def test_missing_file_and_missing_source(tmp_path):
+    missing = str(tmp_path / 'nao_existe.lpms')
+    responses = serve([json.dumps({'id': 1, 'path': missing}), json.dumps({'id': 2})])
+    assert responses[1]['ok'] is False
+    assert missing in responses[1]['errors'][0]
+    assert responses[2]['errors'] == ["Requisição sem 'source' nem 'path'"]
+
+
+def test_compiles_with_a_cache_dir_and_default_size(tmp_path):
+    path = tmp_path / 'p.lpms'
+    path.write_text(SOURCE)
+    request = {'path': str(path), 'outputs': ['tac', 'asm', 'ast']}
+    responses = serve([json.dumps(dict(request, id=1)), json.dumps(dict(request, id=2))],
+                      cache_dir=str(tmp_path / 'cache'))
+    first, second = responses[1], responses[2]
+    assert first['ok'] and first['errors'] == [] and not first['cached']
+    assert second['cached'] and second['tac'] == first['tac'] and second['asm'] == first['asm']
+    assert first['tac'] and first['asm'].startswith('section .data')
+    assert json.loads(first['ast'].splitlines()[0])
+
+
+def test_shutdown_stops_reading():
+    responses = serve([json.dumps({'id': 1, 'command': 'shutdown'}),
+                       json.dumps({'id': 2, 'command': 'ping'})])
+    assert responses == {1: {'id': 1, 'ok': True}}
+
+
+def test_stdin_protocol_of_the_command_line():
+    lines = [json.dumps({'id': 1, 'command': 'ping'}), 'nada',
+             json.dumps({'id': 2, 'source': SOURCE, 'target': 'x64', 'outputs': ['tac']})]
+    process = subprocess.run([sys.executable, os.path.join(ROOT, 'server.py'), '-j', '1'],
+                             input=''.join(line + '\n' for line in lines), capture_output=True,
+                             text=True, timeout=60, check=True)
+    responses = {response['id']: response for response in map(json.loads, process.stdout.splitlines())}
+    assert responses[1] == {'id': 1, 'ok': True}
+    assert responses[None]['ok'] is False
+    assert responses[2]['ok'] and responses[2]['tac'] and 'asm' not in responses[2]
+
+
+@pytest.mark.parametrize('path, output_dir, single, expected', [
+    ('p.lpms', None, True, ('intermediate.tac', 'output.asm')),
+    (os.path.join('src', 'p.lpms'), None, False, (os.path.join('src', 'p.tac'), os.path.join('src', 'p.asm'))),
+    (os.path.join('src', 'p.lpms'), 'out', True, (os.path.join('out', 'p.tac'), os.path.join('out', 'p.asm'))),
+    (os.path.join('src', 'x', 'p.txt'), 'out', False, (os.path.join('out', 'p.tac'), os.path.join('out', 'p.asm'))),
+    ('p.tar.lpms', None, False, ('p.tar.tac', 'p.tar.asm')),
+])
+def test_output_paths(path, output_dir, single, expected):
+    assert output_paths(path, output_dir, single) == expected
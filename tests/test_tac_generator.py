@@ -0,0 +1,30 @@
+import sys
+
+import pytest
+
+from tac_generator import compile_source
+from tac_ir import Op
+from test_optimizer import run_on_vm
+
+DEPTH = 5000
+
+
+@pytest.mark.parametrize('optimize', [False, True])
+def test_deeply_nested_program_compiles(optimize):
+    # Nested blocks and parentheses, each far deeper than the recursion limit
+    assert DEPTH > sys.getrecursionlimit()
+    source = ("Program P { int a; input(a); "
+              + "if (a) { while (a < 3) { " * DEPTH
+              + "a = " + "(" * DEPTH + "a" + " + 1)" * DEPTH + "; print(a); "
+              + "} } " * DEPTH + "}")
+    result = compile_source(source, optimize=optimize)
+    assert result.errors == []
+    assert sum(quad.op is Op.LABEL for quad in result.tac) >= 2 * DEPTH
+    assert 'section .text' in result.asm
+    assert result.ast.type == 'Program'
+
+
+def test_deep_expression_evaluates():
+    source = "Program P { int a; a = " + "(" * DEPTH + "1" + " + 1)" * DEPTH + "; print(a); }"
+    assert compile_source(source).errors == []
+    assert run_on_vm(source, False) == f"{DEPTH + 1}\n"
@@ -0,0 +1,53 @@
+import io
+
+import pytest
+
+from rd_parser import RDParser
+from tac_generator import TACGenerator
+from tac_vm import STRING_INPUT_LIMIT, ExecutionError, VirtualMachine
+from test_optimizer import run_on_vm
+
+
+@pytest.mark.parametrize('optimized', [False, True])
+def test_division_by_zero_raises_execution_error(optimized):
+    source = "Program P { int a, b; input(a, b); print(a); print(a / b); }"
+    assert run_on_vm(source, optimized, "7\n2\n") == "7\n3\n"
+    with pytest.raises(ExecutionError, match="divisão por zero"):
+        run_on_vm(source, optimized, "7\n0\n")
+
+
+def test_output_before_the_error_is_written():
+    generator = TACGenerator()
+    generator.generate(RDParser().parse("Program P { int a, b; input(a, b); print(a); print(a / b); }")[0])
+    stdout = io.StringIO()
+    with pytest.raises(ExecutionError):
+        VirtualMachine(generator.tac).run(io.StringIO("7\n0\n"), stdout)
+    assert stdout.getvalue() == "7\n"
+
+
+@pytest.mark.parametrize('optimized', [False, True])
+def test_break_leaves_only_the_innermost_loop(optimized):
+    source = """Program P {
+      int i, j;
+      i = 0;
+      while (i < 3) {
+        j = 0;
+        while (1) {
+          if (j == 2) { break; }
+          print(i * 10 + j);
+          j = j + 1;
+        }
+        i = i + 1;
+        if (i == 2) { break; }
+      }
+      print(i);
+    }"""
+    assert run_on_vm(source, optimized) == "0\n1\n10\n11\n2\n"
+
+
+@pytest.mark.parametrize('length', [0, STRING_INPUT_LIMIT - 1, STRING_INPUT_LIMIT, STRING_INPUT_LIMIT + 1, 1000])
+def test_string_input_is_truncated(length):
+    source = "Program P { str s; int n; input(s, n); print(s); print(n); }"
+    line = ''.join(chr(ord('a') + i % 26) for i in range(length))
+    expected = line[:STRING_INPUT_LIMIT]
+    assert run_on_vm(source, False, f"{line}\n5\n") == f"{expected}\n5\n"